@@ -5,6 +5,13 @@ from datetime import datetime
 class Appointment(db.Model):
     """Appointment bookings."""
     __tablename__ = "appointments"
+    __table_args__ = (
+        db.Index("ix_appointments_doctor_date_start", "doctor_id", "date", "start_time"),
+        db.Index("ix_appointments_member_date_start", "member_id", "date", "start_time"),
+        db.Index("ix_appointments_date_start", "date", "start_time"),
+        db.Index("ix_appointments_availability", "availability_id"),
+        db.Index("ix_appointments_status_date", "status", "date"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     member_id = db.Column(
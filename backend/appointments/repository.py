@@ -1,7 +1,12 @@
 import logging
-from datetime import date, time
+from datetime import date, datetime, time
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.orm import joinedload
 from backend.appointments.models import Appointment
+from backend.auth.models import User
+from backend.doctors.models import Doctor
 from backend.common.db import db
+from backend.common.pagination import keyset_after
 
 logger = logging.getLogger(__name__)
 
@@ -41,9 +46,200 @@ class AppointmentRepository:
         """Get all appointments."""
         return Appointment.query.all()
 
+    def find_page(self, limit: int, after: tuple | None = None,
+                  member_id: int | None = None, doctor_id: int | None = None,
+                  date_from: date | None = None, date_to: date | None = None) -> list[Appointment]:
+        """
+        Find a page of appointments ordered by (date, start_time, id).
+
+        Member and doctor are joined in, so a page costs a single query.
+        """
+        query = Appointment.query.options(
+            joinedload(Appointment.member),
+            joinedload(Appointment.doctor)
+        )
+        if member_id is not None:
+            query = query.filter(Appointment.member_id == member_id)
+        if doctor_id is not None:
+            query = query.filter(Appointment.doctor_id == doctor_id)
+        if date_from is not None:
+            query = query.filter(Appointment.date >= date_from)
+        if date_to is not None:
+            query = query.filter(Appointment.date <= date_to)
+        if after:
+            query = query.filter(keyset_after(
+                [Appointment.date, Appointment.start_time, Appointment.id], after
+            ))
+        return query.order_by(
+            Appointment.date, Appointment.start_time, Appointment.id
+        ).limit(limit).all()
+
+    def find_busy_intervals(self, doctor_id: int, day: date) -> list[tuple[time, time]]:
+        """Find (start_time, end_time) of a doctor's non-cancelled appointments on one day."""
+        return [
+            tuple(row) for row in db.session.query(
+                Appointment.start_time, Appointment.end_time
+            ).filter(
+                Appointment.doctor_id == doctor_id,
+                Appointment.date == day,
+                Appointment.status != "CANCELLED"
+            )
+        ]
+
+    def has_member_conflict(self, member_id: int, date: date, start_time: time, end_time: time,
+                            exclude_id: int | None = None) -> bool:
+        """
+        Check whether a member has a SCHEDULED appointment overlapping a time range.
+
+        One probe of the (member_id, date, start_time) index.
+        """
+        query = db.session.query(Appointment.id).filter(
+            Appointment.member_id == member_id,
+            Appointment.date == date,
+            Appointment.start_time < end_time,
+            Appointment.end_time > start_time,
+            Appointment.status == "SCHEDULED"
+        )
+        if exclude_id is not None:
+            query = query.filter(Appointment.id != exclude_id)
+        return db.session.query(query.exists()).scalar()
+
+    def iter_export_rows(self, date_from: date | None = None, date_to: date | None = None,
+                         batch_size: int = 1000):
+        """
+        Stream appointments for export as flat rows, in (date, start_time, id) order.
+
+        Only the exported columns are selected, with member email and doctor
+        name joined in. Rows come from a server-side cursor in batches of
+        `batch_size`, so memory stays flat however many rows match.
+        """
+        query = select(
+            Appointment.id,
+            Appointment.date,
+            Appointment.start_time,
+            Appointment.end_time,
+            Appointment.status,
+            Appointment.member_id,
+            User.email.label("member_email"),
+            Appointment.doctor_id,
+            Doctor.name.label("doctor_name"),
+        ).join(
+            User, User.id == Appointment.member_id
+        ).join(
+            Doctor, Doctor.id == Appointment.doctor_id
+        )
+        if date_from is not None:
+            query = query.filter(Appointment.date >= date_from)
+        if date_to is not None:
+            query = query.filter(Appointment.date <= date_to)
+        query = query.order_by(Appointment.date, Appointment.start_time, Appointment.id)
+
+        result = db.session.execute(
+            query.execution_options(stream_results=True, yield_per=batch_size)
+        )
+        try:
+            yield from result
+        finally:
+            result.close()
+
+    def find_past_scheduled_keys(self, now: datetime, after: tuple | None,
+                                 limit: int) -> list[tuple[date, int, int]]:
+        """
+        Find (date, id, doctor_id) of SCHEDULED appointments that ended before `now`.
+
+        Ordered by (date, id) for keyset batching: pass the (date, id) of the
+        last key of the previous batch as `after`. Only these columns are
+        read, no ORM objects are loaded.
+        """
+        query = db.session.query(Appointment.date, Appointment.id, Appointment.doctor_id).filter(
+            Appointment.status == "SCHEDULED",
+            Appointment.date <= now.date(),
+            _ended_before(now)
+        )
+        if after:
+            query = query.filter(keyset_after([Appointment.date, Appointment.id], after))
+        return [
+            tuple(row) for row in query.order_by(Appointment.date, Appointment.id).limit(limit)
+        ]
+
+    def move(self, appointment_id: int, from_availability_id: int, slot) -> bool:
+        """
+        Atomically move a SCHEDULED appointment from one slot to another.
+
+        Returns False if the appointment is no longer SCHEDULED in `from_availability_id`.
+        """
+        result = db.session.execute(
+            update(Appointment)
+            .filter_by(id=appointment_id, availability_id=from_availability_id, status="SCHEDULED")
+            .values(
+                doctor_id=slot.doctor_id,
+                availability_id=slot.id,
+                date=slot.date,
+                start_time=slot.start_time,
+                end_time=slot.end_time
+            )
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount == 1
+
+    def complete(self, appointment_ids: list[int], now: datetime) -> int:
+        """Mark the given appointments COMPLETED if they are still SCHEDULED and over. Returns rows changed."""
+        result = db.session.execute(
+            update(Appointment)
+            .filter(
+                Appointment.id.in_(appointment_ids),
+                Appointment.status == "SCHEDULED",
+                _ended_before(now)
+            )
+            .values(status="COMPLETED")
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount
+
+    def find_scheduled_in_range(self, doctor_id: int, date_from: date, date_to: date) -> list[tuple]:
+        """
+        Find (id, member_id, availability_id, date) of a doctor's SCHEDULED appointments in a date range.
+
+        The rows are locked (FOR UPDATE) where the backend supports it, so
+        `cancel_in_range` later in the transaction cancels exactly these.
+        """
+        return [
+            tuple(row) for row in db.session.query(
+                Appointment.id, Appointment.member_id, Appointment.availability_id, Appointment.date
+            ).filter(
+                Appointment.doctor_id == doctor_id,
+                Appointment.date >= date_from,
+                Appointment.date <= date_to,
+                Appointment.status == "SCHEDULED"
+            ).order_by(Appointment.date, Appointment.start_time).with_for_update()
+        ]
+
+    def cancel_in_range(self, doctor_id: int, date_from: date, date_to: date) -> int:
+        """Cancel all SCHEDULED appointments of a doctor in a date range. Returns rows changed."""
+        result = db.session.execute(
+            update(Appointment)
+            .filter(
+                Appointment.doctor_id == doctor_id,
+                Appointment.date >= date_from,
+                Appointment.date <= date_to,
+                Appointment.status == "SCHEDULED"
+            )
+            .values(status="CANCELLED")
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount
+
     def find_by_availability_id(self, availability_id: int) -> Appointment | None:
         """Find appointment by availability slot."""
         return Appointment.query.filter_by(availability_id=availability_id).first()
 
 
+def _ended_before(now: datetime):
+    """Filter for appointments whose end lies before `now`."""
+    return or_(
+        Appointment.date < now.date(),
+        and_(Appointment.date == now.date(), Appointment.end_time <= now.time())
+    )
+
+
 appointment_repository = AppointmentRepository()
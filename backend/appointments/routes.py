@@ -1,17 +1,26 @@
 import logging
-from flask import Blueprint, request
+from flask import Blueprint, Response, request, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
 from marshmallow import ValidationError
 
 from backend.common.rbac import require_roles
 from backend.common.exceptions import AppException
-from backend.appointments.schemas import AppointmentCreateSchema
+from backend.appointments.schemas import (
+    AppointmentCreateSchema,
+    AppointmentBlockCreateSchema,
+    AppointmentRescheduleSchema,
+    AppointmentExportQuerySchema,
+    AppointmentListQuerySchema
+)
 from backend.appointments.service import (
     book_appointment,
+    book_block,
     get_member_appointments,
-    get_doctor_appointments,
+    get_my_doctor_appointments,
     get_all_appointments,
+    export_appointments,
     cancel_appointment,
+    reschedule_appointment,
     get_appointment_by_id
 )
 
@@ -37,7 +46,8 @@ def book_appointment_api():
 
     appointment = book_appointment(
         availability_id=data["availability_id"],
-        member_id=member_id
+        member_id=member_id,
+        hold_id=data["hold_id"]
     )
 
     logger.info(f"Appointment booked: {appointment.id}")
@@ -52,6 +62,34 @@ def book_appointment_api():
     }, 201
 
 
+@appointments_bp.route("/block", methods=["POST"])
+@require_roles("MEMBER")
+def book_block_api():
+    """Book consecutive slots of a doctor as one appointment. Only MEMBER can book."""
+    logger.info("Received request to book appointment block")
+
+    member_id = get_jwt_identity()
+
+    schema = AppointmentBlockCreateSchema()
+    try:
+        data = schema.load(request.get_json())
+    except ValidationError as err:
+        logger.warning(f"Validation error: {err.messages}")
+        raise AppException(str(err.messages))
+
+    appointment = book_block(member_id=member_id, **data)
+
+    return {
+        "id": appointment.id,
+        "doctor_id": appointment.doctor_id,
+        "date": str(appointment.date),
+        "start_time": str(appointment.start_time),
+        "end_time": str(appointment.end_time),
+        "status": appointment.status,
+        "message": "Appointment booked successfully"
+    }, 201
+
+
 @appointments_bp.route("", methods=["GET"])
 @jwt_required()
 def get_appointments_api():
@@ -60,6 +98,10 @@ def get_appointments_api():
     - ADMIN: See all appointments
     - DOCTOR: See own appointments (where they are the doctor)
     - MEMBER: See own appointments
+
+    Results are paged by (date, start_time, id): pass `limit` and the
+    `next_cursor` of the previous page as `cursor`. Optional `from`/`to`
+    dates restrict the range.
     """
     logger.info("Received request to get appointments")
 
@@ -67,29 +109,57 @@ def get_appointments_api():
     current_user_id = get_jwt_identity()
     current_user_role = claims.get("role")
 
+    try:
+        query = AppointmentListQuerySchema().load(request.args)
+    except ValidationError as err:
+        logger.warning(f"Validation error: {err.messages}")
+        raise AppException(str(err.messages))
+
     if current_user_role == "ADMIN":
-        appointments = get_all_appointments()
+        appointments, next_cursor = get_all_appointments(**query)
     elif current_user_role == "DOCTOR":
-        # For doctor, we need to find their doctor_id
-        # For now, return empty as doctors are separate from users
-        appointments = []
+        appointments, next_cursor = get_my_doctor_appointments(current_user_id, **query)
     else:  # MEMBER
-        appointments = get_member_appointments(current_user_id)
-
-    return [
-        {
-            "id": apt.id,
-            "member_id": apt.member_id,
-            "member_email": apt.member.email if apt.member else None,
-            "doctor_id": apt.doctor_id,
-            "doctor_name": apt.doctor.name if apt.doctor else None,
-            "date": str(apt.date),
-            "start_time": str(apt.start_time),
-            "end_time": str(apt.end_time),
-            "status": apt.status
-        }
-        for apt in appointments
-    ]
+        appointments, next_cursor = get_member_appointments(current_user_id, **query)
+
+    return {
+        "items": [
+            {
+                "id": apt.id,
+                "member_id": apt.member_id,
+                "member_email": apt.member.email if apt.member else None,
+                "doctor_id": apt.doctor_id,
+                "doctor_name": apt.doctor.name if apt.doctor else None,
+                "date": str(apt.date),
+                "start_time": str(apt.start_time),
+                "end_time": str(apt.end_time),
+                "status": apt.status
+            }
+            for apt in appointments
+        ],
+        "next_cursor": next_cursor
+    }
+
+
+@appointments_bp.route("/export", methods=["GET"])
+@require_roles("ADMIN")
+def export_appointments_api():
+    """Stream all appointments as NDJSON or CSV (admin only), optionally within `from`/`to`."""
+    logger.info("Received request to export appointments")
+
+    try:
+        query = AppointmentExportQuerySchema().load(request.args)
+    except ValidationError as err:
+        logger.warning(f"Validation error: {err.messages}")
+        raise AppException(str(err.messages))
+
+    fmt = query["fmt"]
+    mimetype = "text/csv" if fmt == "csv" else "application/x-ndjson"
+    return Response(
+        stream_with_context(export_appointments(**query)),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f"attachment; filename=appointments.{fmt}"}
+    )
 
 
 @appointments_bp.route("/<int:appointment_id>", methods=["GET"])
@@ -144,3 +214,38 @@ def cancel_appointment_api(appointment_id):
         "status": appointment.status,
         "message": "Appointment cancelled successfully"
     }
+
+
+@appointments_bp.route("/<int:appointment_id>/reschedule", methods=["PATCH"])
+@jwt_required()
+def reschedule_appointment_api(appointment_id):
+    """Move an appointment to another free slot, atomically."""
+    logger.info(f"Received request to reschedule appointment {appointment_id}")
+
+    claims = get_jwt()
+    current_user_id = get_jwt_identity()
+    current_user_role = claims.get("role")
+
+    schema = AppointmentRescheduleSchema()
+    try:
+        data = schema.load(request.get_json())
+    except ValidationError as err:
+        logger.warning(f"Validation error: {err.messages}")
+        raise AppException(str(err.messages))
+
+    appointment = reschedule_appointment(
+        appointment_id=appointment_id,
+        availability_id=data["availability_id"],
+        current_user_id=current_user_id,
+        current_user_role=current_user_role
+    )
+
+    return {
+        "id": appointment.id,
+        "doctor_id": appointment.doctor_id,
+        "date": str(appointment.date),
+        "start_time": str(appointment.start_time),
+        "end_time": str(appointment.end_time),
+        "status": appointment.status,
+        "message": "Appointment rescheduled successfully"
+    }
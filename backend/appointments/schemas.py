@@ -1,9 +1,39 @@
 from marshmallow import Schema, fields, validate
+from backend.common.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 
 
 class AppointmentCreateSchema(Schema):
-    """Schema for booking an appointment."""
+    """Schema for booking an appointment, optionally converting a hold on the slot."""
     availability_id = fields.Int(required=True)
+    hold_id = fields.Int(load_default=None)
+
+
+class AppointmentBlockCreateSchema(Schema):
+    """Schema for booking consecutive slots as one appointment."""
+    doctor_id = fields.Int(required=True)
+    date = fields.Date(required=True)
+    duration_minutes = fields.Int(required=True, validate=validate.Range(min=5, max=12 * 60))
+    start_time = fields.Time(load_default=None)
+
+
+class AppointmentRescheduleSchema(Schema):
+    """Schema for moving an appointment to another slot."""
+    availability_id = fields.Int(required=True)
+
+
+class AppointmentListQuerySchema(Schema):
+    """Schema for appointment list query parameters."""
+    limit = fields.Int(load_default=DEFAULT_PAGE_SIZE, validate=validate.Range(min=1, max=MAX_PAGE_SIZE))
+    cursor = fields.Str(load_default=None)
+    date_from = fields.Date(load_default=None, data_key="from")
+    date_to = fields.Date(load_default=None, data_key="to")
+
+
+class AppointmentExportQuerySchema(Schema):
+    """Schema for appointment export query parameters."""
+    fmt = fields.Str(load_default="ndjson", data_key="format", validate=validate.OneOf(["ndjson", "csv"]))
+    date_from = fields.Date(load_default=None, data_key="from")
+    date_to = fields.Date(load_default=None, data_key="to")
 
 
 class AppointmentResponseSchema(Schema):
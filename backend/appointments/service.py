@@ -1,15 +1,55 @@
+import csv
+import io
+import json
 import logging
+from datetime import date, datetime, time
+from flask import current_app
 from backend.appointments.models import Appointment
 from backend.appointments.repository import appointment_repository
+from backend.availability.cache import availability_cache
+from backend.availability.models import Availability
 from backend.availability.repository import availability_repository
 from backend.doctors.repository import doctor_repository
+from backend.doctors.directory import doctor_directory
+from backend.holds.repository import slot_hold_repository
+from backend.holds.service import get_active_hold
+from backend.waitlist.queue import waitlist_queue
+from backend.waitlist.service import drop_expired_holds, offer_slot
 from backend.common.exceptions import AppException, ForbiddenError
+from backend.common.locks import doctor_locks
+from backend.common.pagination import DEFAULT_PAGE_SIZE, decode_cursor, paginate
 from backend.common.db import db
 
 logger = logging.getLogger(__name__)
 
 
-def book_appointment(availability_id: int, member_id: int) -> Appointment:
+def book_appointment(availability_id: int, member_id: int, hold_id: int | None = None) -> Appointment:
+    """
+    Book an appointment using the configured booking strategy.
+
+    With a `hold_id` from POST /holds the slot was reserved while the member
+    confirmed; booking just converts the member's hold into the appointment.
+    """
+    if hold_id is not None and get_active_hold(hold_id, member_id).availability_id != availability_id:
+        raise AppException("Hold is for a different slot")
+
+    strategy = current_app.config.get("BOOKING_STRATEGY", "row_lock")
+    book = BOOKING_STRATEGIES.get(strategy)
+    if book is None:
+        raise ValueError(f"Unknown booking strategy: {strategy}")
+
+    if not doctor_locks.enabled:
+        return book(availability_id, member_id)
+
+    # No row locks on this backend: serialize on the slot's doctor instead
+    doctor_id = availability_repository.find_doctor_id(availability_id)
+    if doctor_id is None:
+        raise AppException("Availability slot not found")
+    with doctor_locks.lock(doctor_id):
+        return book(availability_id, member_id)
+
+
+def _book_with_row_lock(availability_id: int, member_id: int) -> Appointment:
     """Book an appointment with row lock to prevent double booking."""
     logger.info(f"Booking appointment for member {member_id} with availability {availability_id}")
 
@@ -23,17 +63,13 @@ def book_appointment(availability_id: int, member_id: int) -> Appointment:
         if availability.is_booked:
             raise AppException("This time slot is already booked")
 
-        appointment = appointment_repository.create(
-            member_id=member_id,
-            doctor_id=availability.doctor_id,
-            availability_id=availability.id,
-            date=availability.date,
-            start_time=availability.start_time,
-            end_time=availability.end_time
-        )
+        _check_member_free(member_id, availability.date, availability.start_time, availability.end_time)
+        _take_holds([availability_id], member_id)
+        appointment = _create_for_slot(availability, member_id)
 
         availability.is_booked = True
         db.session.commit()
+        availability_cache.invalidate(appointment.doctor_id)
 
         logger.info(f"Appointment booked: {appointment.id}")
         return appointment
@@ -44,22 +80,236 @@ def book_appointment(availability_id: int, member_id: int) -> Appointment:
         raise
 
 
-def get_member_appointments(member_id: int) -> list[Appointment]:
-    """Get all appointments for a member."""
+def _book_with_conditional_update(availability_id: int, member_id: int) -> Appointment:
+    """Book an appointment by claiming the slot with a single conditional UPDATE."""
+    logger.info(f"Booking appointment for member {member_id} with availability {availability_id}")
+
+    try:
+        if not availability_repository.claim(availability_id):
+            if not availability_repository.find_by_id(availability_id):
+                raise AppException("Availability slot not found")
+            raise AppException("This time slot is already booked")
+
+        availability = availability_repository.find_by_id(availability_id)
+        _check_member_free(member_id, availability.date, availability.start_time, availability.end_time)
+        _take_holds([availability_id], member_id)
+        appointment = _create_for_slot(availability, member_id)
+        db.session.commit()
+        availability_cache.invalidate(appointment.doctor_id)
+
+        logger.info(f"Appointment booked: {appointment.id}")
+        return appointment
+
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Failed to book appointment: {str(e)}")
+        raise
+
+
+def _check_member_free(member_id: int, day: date, start_time: time, end_time: time,
+                       exclude_id: int | None = None) -> None:
+    """Reject a booking that overlaps another SCHEDULED appointment of the same member."""
+    if appointment_repository.has_member_conflict(member_id, day, start_time, end_time, exclude_id):
+        raise AppException("You already have an appointment at this time")
+
+
+def _take_holds(availability_ids: list[int], member_id: int) -> None:
+    """Reject slots held for another member and consume the member's own holds on them."""
+    holds = slot_hold_repository.find_active_for_slots(availability_ids, datetime.utcnow())
+    if any(hold.member_id != member_id for hold in holds):
+        raise AppException("This time slot is held for another member")
+    if holds:
+        slot_hold_repository.delete_for_slots([hold.availability_id for hold in holds])
+
+
+def _create_for_slot(availability: Availability, member_id: int) -> Appointment:
+    """Create a SCHEDULED appointment covering the given slot."""
+    return appointment_repository.create(
+        member_id=member_id,
+        doctor_id=availability.doctor_id,
+        availability_id=availability.id,
+        date=availability.date,
+        start_time=availability.start_time,
+        end_time=availability.end_time
+    )
+
+
+BOOKING_STRATEGIES = {
+    "row_lock": _book_with_row_lock,
+    "conditional_update": _book_with_conditional_update,
+}
+
+
+def book_block(doctor_id: int, date: date, duration_minutes: int, member_id: int,
+               start_time: time | None = None) -> Appointment:
+    """
+    Book one appointment spanning consecutive free slots of a doctor.
+
+    The earliest run of back-to-back free slots covering `duration_minutes`
+    (starting exactly at `start_time` if given) is claimed with a single
+    conditional UPDATE, so either every slot is booked or none is.
+    """
+    logger.info(f"Booking {duration_minutes}-minute block for member {member_id} with doctor {doctor_id} on {date}")
+
+    if not doctor_repository.find_by_id(doctor_id):
+        raise AppException("Doctor not found")
+
+    with doctor_locks.lock(doctor_id):
+        try:
+            block = _find_block(
+                availability_repository.find_free_day_slots(doctor_id, date), duration_minutes, start_time
+            )
+            if not block:
+                raise AppException("No consecutive free slots cover the requested duration")
+
+            _check_member_free(member_id, date, block[0][1], block[-1][2])
+            _take_holds([slot_id for slot_id, _, _ in block], member_id)
+
+            if not availability_repository.claim_many([slot_id for slot_id, _, _ in block]):
+                raise AppException("This time slot is already booked")
+
+            appointment = appointment_repository.create(
+                member_id=member_id,
+                doctor_id=doctor_id,
+                availability_id=block[0][0],
+                date=date,
+                start_time=block[0][1],
+                end_time=block[-1][2]
+            )
+            db.session.commit()
+            availability_cache.invalidate(doctor_id)
+
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Failed to book block: {str(e)}")
+            raise
+
+    logger.info(f"Block appointment booked: {appointment.id} covering {len(block)} slots")
+    return appointment
+
+
+def _find_block(slots: list[tuple[int, time, time]], duration_minutes: int,
+                start_time: time | None) -> list[tuple[int, time, time]]:
+    """Return the first run of back-to-back slots lasting at least `duration_minutes`, or []."""
+    run = []
+    for slot in slots:
+        if run and slot[1] == run[-1][2]:
+            run.append(slot)
+        elif start_time is None or slot[1] == start_time:
+            run = [slot]
+        else:
+            run = []
+            continue
+
+        if _minutes_between(run[0][1], run[-1][2]) >= duration_minutes:
+            return run
+    return []
+
+
+def _minutes_between(start: time, end: time) -> float:
+    return (datetime.combine(date.min, end) - datetime.combine(date.min, start)).total_seconds() / 60
+
+
+def get_member_appointments(member_id: int, limit: int = DEFAULT_PAGE_SIZE, cursor: str | None = None,
+                            date_from: date | None = None,
+                            date_to: date | None = None) -> tuple[list[Appointment], str | None]:
+    """Get a page of appointments for a member."""
     logger.info(f"Getting appointments for member {member_id}")
-    return appointment_repository.find_by_member_id(member_id)
+    rows = appointment_repository.find_page(
+        limit + 1, after=_decode_appointment_cursor(cursor), member_id=member_id,
+        date_from=date_from, date_to=date_to
+    )
+    return paginate(rows, limit, _appointment_sort_key)
 
 
-def get_doctor_appointments(doctor_id: int) -> list[Appointment]:
-    """Get all appointments for a doctor."""
+def get_doctor_appointments(doctor_id: int, limit: int = DEFAULT_PAGE_SIZE, cursor: str | None = None,
+                            date_from: date | None = None,
+                            date_to: date | None = None) -> tuple[list[Appointment], str | None]:
+    """Get a page of appointments for a doctor."""
     logger.info(f"Getting appointments for doctor {doctor_id}")
-    return appointment_repository.find_by_doctor_id(doctor_id)
+    rows = appointment_repository.find_page(
+        limit + 1, after=_decode_appointment_cursor(cursor), doctor_id=doctor_id,
+        date_from=date_from, date_to=date_to
+    )
+    return paginate(rows, limit, _appointment_sort_key)
 
 
-def get_all_appointments() -> list[Appointment]:
-    """Get all appointments (admin only)."""
+def get_my_doctor_appointments(user_id: int, limit: int = DEFAULT_PAGE_SIZE, cursor: str | None = None,
+                               date_from: date | None = None,
+                               date_to: date | None = None) -> tuple[list[Appointment], str | None]:
+    """Get a page of appointments for the logged-in doctor."""
+    doctor_id = doctor_directory.doctor_id_for_user(user_id)
+    if doctor_id is None:
+        raise AppException("No doctor profile linked to your account")
+
+    return get_doctor_appointments(doctor_id, limit, cursor, date_from, date_to)
+
+
+def get_all_appointments(limit: int = DEFAULT_PAGE_SIZE, cursor: str | None = None,
+                         date_from: date | None = None,
+                         date_to: date | None = None) -> tuple[list[Appointment], str | None]:
+    """Get a page of all appointments (admin only)."""
     logger.info("Getting all appointments")
-    return appointment_repository.get_all()
+    rows = appointment_repository.find_page(
+        limit + 1, after=_decode_appointment_cursor(cursor),
+        date_from=date_from, date_to=date_to
+    )
+    return paginate(rows, limit, _appointment_sort_key)
+
+
+EXPORT_COLUMNS = [
+    "id", "date", "start_time", "end_time", "status",
+    "member_id", "member_email", "doctor_id", "doctor_name",
+]
+EXPORT_CHUNK_ROWS = 500
+
+
+def export_appointments(fmt: str = "ndjson", date_from: date | None = None,
+                        date_to: date | None = None):
+    """
+    Generate an export of all appointments as text chunks (admin only).
+
+    Rows are streamed from the database and written out EXPORT_CHUNK_ROWS
+    at a time, so memory use does not depend on the number of rows.
+
+    Args:
+        fmt: "ndjson" (one JSON object per line) or "csv" (with a header row)
+    """
+    logger.info(f"Exporting appointments as {fmt} from {date_from} to {date_to}")
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer) if fmt == "csv" else None
+    if writer:
+        writer.writerow(EXPORT_COLUMNS)
+
+    count = 0
+    for row in appointment_repository.iter_export_rows(date_from, date_to):
+        values = [value if isinstance(value, (int, str)) or value is None else str(value) for value in row]
+        if writer:
+            writer.writerow(values)
+        else:
+            buffer.write(json.dumps(dict(zip(EXPORT_COLUMNS, values))))
+            buffer.write("\n")
+
+        count += 1
+        if count % EXPORT_CHUNK_ROWS == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue()
+    logger.info(f"Exported {count} appointments")
+
+
+def _appointment_sort_key(appointment: Appointment) -> tuple:
+    return appointment.date, appointment.start_time, appointment.id
+
+
+def _decode_appointment_cursor(cursor: str | None) -> tuple | None:
+    if not cursor:
+        return None
+    return decode_cursor(cursor, date.fromisoformat, time.fromisoformat, int)
 
 
 def cancel_appointment(appointment_id: int, current_user_id: int, current_user_role: str) -> Appointment:
@@ -70,30 +320,191 @@ def cancel_appointment(appointment_id: int, current_user_id: int, current_user_r
     if not appointment:
         raise AppException("Appointment not found")
 
-    if appointment.status == "CANCELLED":
-        raise AppException("Appointment is already cancelled")
+    with doctor_locks.lock(appointment.doctor_id):
+        if appointment.status == "CANCELLED":
+            raise AppException("Appointment is already cancelled")
 
-    # Check authorization
-    if current_user_role == "MEMBER" and appointment.member_id != current_user_id:
-        raise ForbiddenError("You can only cancel your own appointments")
-    
-    if current_user_role == "DOCTOR":
-        doctor = doctor_repository.find_by_user_id(current_user_id)
-        if not doctor or appointment.doctor_id != doctor.id:
-            raise ForbiddenError("You can only cancel your own appointments")
+        _check_can_change(appointment, current_user_id, current_user_role, "cancel")
 
-    appointment.status = "CANCELLED"
+        appointment.status = "CANCELLED"
 
-    availability = availability_repository.find_by_id(appointment.availability_id)
-    if availability:
-        availability.is_booked = False
+        # Frees every slot the appointment spans, one for a single booking
+        availability_repository.release_range(
+            appointment.doctor_id, appointment.date, appointment.start_time, appointment.end_time
+        )
+        offer = offer_slot(
+            appointment.doctor_id, appointment.availability_id, appointment.date,
+            exclude_member_id=appointment.member_id
+        )
 
-    db.session.commit()
+        db.session.commit()
+        availability_cache.invalidate(appointment.doctor_id)
+        if offer:
+            waitlist_queue.remove(appointment.doctor_id, offer[0])
 
     logger.info(f"Appointment {appointment_id} cancelled")
     return appointment
 
 
+def reschedule_appointment(appointment_id: int, availability_id: int,
+                           current_user_id: int, current_user_role: str) -> Appointment:
+    """
+    Move an appointment to another free slot in one transaction.
+
+    The new slot is claimed and the old one released with one conditional
+    UPDATE each, issued in ascending slot id order (and under both doctors'
+    locks, taken in sorted order) so concurrent reschedules cannot deadlock.
+    If the new slot is taken, nothing changes and the member keeps the old one.
+    The appointment itself moves with a conditional UPDATE too, so where
+    doctor locks are off, a concurrent reschedule of it fails and rolls back.
+    """
+    logger.info(f"Rescheduling appointment {appointment_id} to availability {availability_id}")
+
+    appointment = appointment_repository.find_by_id(appointment_id)
+    if not appointment:
+        raise AppException("Appointment not found")
+
+    new_doctor_id = availability_repository.find_doctor_id(availability_id)
+    if new_doctor_id is None:
+        raise AppException("Availability slot not found")
+
+    with doctor_locks.lock(appointment.doctor_id, new_doctor_id):
+        old_doctor_id = appointment.doctor_id
+        old_availability_id = appointment.availability_id
+        try:
+            if appointment.status != "SCHEDULED":
+                raise AppException("Only scheduled appointments can be rescheduled")
+
+            _check_can_change(appointment, current_user_id, current_user_role, "reschedule")
+
+            if availability_id == old_availability_id:
+                raise AppException("Appointment is already in this slot")
+
+            old_slot = availability_repository.find_by_id(old_availability_id)
+            if old_slot and (old_slot.start_time, old_slot.end_time) != (appointment.start_time, appointment.end_time):
+                raise AppException("Appointments spanning several slots cannot be rescheduled")
+
+            # Touch both slots in ascending id order so concurrent swaps cannot deadlock
+            for slot_id in sorted([availability_id, old_availability_id]):
+                if slot_id == availability_id:
+                    if not availability_repository.claim(slot_id):
+                        raise AppException("This time slot is already booked")
+                elif not availability_repository.release(slot_id):
+                    raise AppException("Appointment was changed meanwhile, please retry")
+
+            new_slot = availability_repository.find_by_id(availability_id)
+            _check_member_free(
+                appointment.member_id, new_slot.date, new_slot.start_time, new_slot.end_time,
+                exclude_id=appointment.id
+            )
+            _take_holds([availability_id], appointment.member_id)
+
+            # Conditional, so of two concurrent reschedules only one can move it
+            if not appointment_repository.move(appointment.id, old_availability_id, new_slot):
+                raise AppException("Appointment was changed meanwhile, please retry")
+
+            offer = None
+            if old_slot:
+                offer = offer_slot(
+                    old_doctor_id, old_availability_id, old_slot.date,
+                    exclude_member_id=appointment.member_id
+                )
+
+            db.session.commit()
+            availability_cache.invalidate(old_doctor_id, new_doctor_id)
+            if offer:
+                waitlist_queue.remove(old_doctor_id, offer[0])
+
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Failed to reschedule appointment: {str(e)}")
+            raise
+
+    logger.info(f"Appointment {appointment_id} rescheduled to availability {availability_id}")
+    return appointment
+
+
+def _check_can_change(appointment: Appointment, current_user_id: int, current_user_role: str,
+                      action: str) -> None:
+    """Members may change their own appointments, doctors those with them, admins any."""
+    if current_user_role == "MEMBER" and appointment.member_id != current_user_id:
+        raise ForbiddenError(f"You can only {action} your own appointments")
+
+    if current_user_role == "DOCTOR":
+        if appointment.doctor_id != doctor_directory.doctor_id_for_user(current_user_id):
+            raise ForbiddenError(f"You can only {action} your own appointments")
+
+
+def cancel_doctor_days(doctor_id: int, date_from: date, date_to: date | None = None,
+                       slots: str = "free") -> dict:
+    """
+    Cancel all SCHEDULED appointments of a doctor in a date range, e.g. a sick day.
+
+    Runs a fixed number of set-based statements in one transaction, however
+    many appointments are affected. With slots="free" the slots of the
+    cancelled appointments (and no others) become bookable again, and each
+    is offered to the waitlist as `cancel_appointment` does. With
+    slots="delete" the doctor's slots in the range are removed, except
+    those still referenced by an appointment record, which stay blocked,
+    as do those under an unexpired hold.
+
+    Returns:
+        {"doctor_id", "cancelled", "slots_freed" | "slots_deleted", "member_ids"}
+    """
+    date_to = date_to or date_from
+    logger.info(f"Cancelling appointments of doctor {doctor_id} from {date_from} to {date_to}")
+
+    if date_to < date_from:
+        raise AppException("End date must not be before start date")
+    if date_from < date.today():
+        raise AppException("Cannot cancel days in the past")
+
+    if not doctor_repository.find_by_id(doctor_id):
+        raise AppException("Doctor not found")
+
+    with doctor_locks.lock(doctor_id):
+        offers = []
+        try:
+            appointments = appointment_repository.find_scheduled_in_range(doctor_id, date_from, date_to)
+            cancelled = appointment_repository.cancel_in_range(doctor_id, date_from, date_to)
+
+            if slots == "delete":
+                # Slots under a live hold stay, blocked like the referenced ones
+                drop_expired_holds(
+                    slot_hold_repository.find_in_range(doctor_id, date_from, date_to), datetime.utcnow()
+                )
+                slot_result = {
+                    "slots_deleted": availability_repository.delete_unreferenced_in_range(
+                        doctor_id, date_from, date_to
+                    )
+                }
+                availability_repository.set_booked_in_range(doctor_id, date_from, date_to, True)
+            else:
+                slot_result = {
+                    "slots_freed": availability_repository.release_for_appointments(
+                        doctor_id, date_from, date_to, [appointment_id for appointment_id, *_ in appointments]
+                    )
+                }
+                for _, member_id, availability_id, day in appointments:
+                    offer = offer_slot(doctor_id, availability_id, day, exclude_member_id=member_id)
+                    if offer:
+                        offers.append(offer[0])
+
+            db.session.commit()
+            availability_cache.invalidate(doctor_id)
+            for entry_id in offers:
+                waitlist_queue.remove(doctor_id, entry_id)
+
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Failed to cancel doctor days: {str(e)}")
+            raise
+
+    member_ids = sorted({member_id for _, member_id, *_ in appointments})
+    logger.info(f"Cancelled {cancelled} appointments of doctor {doctor_id}")
+    return {"doctor_id": doctor_id, "cancelled": cancelled, **slot_result, "member_ids": member_ids}
+
+
 def get_appointment_by_id(appointment_id: int) -> Appointment | None:
     """Get a single appointment by ID."""
     return appointment_repository.find_by_id(appointment_id)
@@ -0,0 +1,134 @@
+"""
+Completion sweeper: marks past SCHEDULED appointments as COMPLETED.
+
+Appointments are swept in keyset batches of ids read from the
+(status, date) index, each completed with one conditional UPDATE and
+committed on its own, so no batch holds locks for long. The UPDATE only
+touches rows still SCHEDULED, so a sweep can be interrupted and rerun at
+any time.
+
+Run it with `flask --app backend.main:create_app complete-appointments`,
+or set APPOINTMENT_SWEEP_INTERVAL_SECONDS to sweep from a background thread.
+"""
+import logging
+import threading
+import time
+from datetime import datetime
+
+import click
+
+from backend.appointments.repository import appointment_repository
+from backend.availability.cache import availability_cache
+from backend.common.db import db
+from backend.common.metrics import register_metrics
+from backend.waitlist.service import expire_offers
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 500
+
+
+class CompletionSweeper:
+    """Batched, resumable completion of past appointments."""
+
+    def __init__(self):
+        self.batch_size = DEFAULT_BATCH_SIZE
+        self.pause = 0.0
+        self.last_run = {}
+        self._thread = None
+        self._stop = threading.Event()
+
+    def init_app(self, app) -> None:
+        """Register the CLI command and start the background thread if an interval is configured."""
+        self.batch_size = app.config.get("APPOINTMENT_SWEEP_BATCH_SIZE", DEFAULT_BATCH_SIZE)
+        self.pause = app.config.get("APPOINTMENT_SWEEP_PAUSE_MS", 0) / 1000
+        register_metrics("appointment_sweeper", self.stats)
+
+        @app.cli.command("complete-appointments")
+        @click.option("--batch-size", type=int, default=None, help="Rows per UPDATE.")
+        @click.option("--pause-ms", type=int, default=None, help="Sleep between batches.")
+        def complete_appointments_command(batch_size, pause_ms):
+            """Mark past SCHEDULED appointments as COMPLETED."""
+            result = self.run(
+                batch_size=batch_size,
+                pause=pause_ms / 1000 if pause_ms is not None else None
+            )
+            click.echo(
+                f"Completed {result['completed']} appointments in {result['batches']} batches "
+                f"({result['rows_per_second']} rows/s)"
+            )
+
+        interval = app.config.get("APPOINTMENT_SWEEP_INTERVAL_SECONDS", 0)
+        if interval > 0 and self._thread is None:
+            self._thread = threading.Thread(
+                target=self._loop, args=(app, interval), name="appointment-sweeper", daemon=True
+            )
+            self._thread.start()
+            logger.info(f"Appointment sweeper started, every {interval}s")
+
+    def run(self, now: datetime | None = None, batch_size: int | None = None,
+            pause: float | None = None) -> dict:
+        """
+        Complete every appointment that ended before `now`.
+
+        Returns:
+            {"completed", "batches", "seconds", "rows_per_second"}
+        """
+        now = now or datetime.now()
+        batch_size = batch_size or self.batch_size
+        pause = self.pause if pause is None else pause
+
+        started = time.perf_counter()
+        completed = batches = 0
+        after = None
+        while True:
+            keys = appointment_repository.find_past_scheduled_keys(now, after, batch_size)
+            if not keys:
+                break
+            completed += appointment_repository.complete([key[1] for key in keys], now)
+            db.session.commit()
+            # Agenda ETags are built from the doctors' schedule versions
+            availability_cache.invalidate(*(key[2] for key in keys))
+            batches += 1
+            after = keys[-1][:2]
+            if len(keys) < batch_size:
+                break
+            if pause:
+                time.sleep(pause)
+
+        seconds = time.perf_counter() - started
+        self.last_run = {
+            "completed": completed,
+            "batches": batches,
+            "seconds": round(seconds, 3),
+            "rows_per_second": round(completed / seconds) if seconds else 0,
+        }
+        logger.info(
+            f"Appointment sweep completed {completed} rows in {batches} batches "
+            f"({self.last_run['rows_per_second']} rows/s)"
+        )
+        return self.last_run
+
+    def stop(self) -> None:
+        """Stop the background thread after its current sweep."""
+        self._stop.set()
+
+    def stats(self) -> dict:
+        """Return the result of the last sweep."""
+        return dict(self.last_run)
+
+    def _loop(self, app, interval: float) -> None:
+        while not self._stop.wait(interval):
+            with app.app_context():
+                try:
+                    self.run()
+                    # Pass expired waitlist offers on even when nobody creates holds
+                    expire_offers()
+                except Exception as e:
+                    db.session.rollback()
+                    logger.error(f"Appointment sweep failed: {str(e)}", exc_info=True)
+                finally:
+                    db.session.remove()
+
+
+completion_sweeper = CompletionSweeper()
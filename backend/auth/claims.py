@@ -0,0 +1,148 @@
+"""
+Claims minted into access and refresh tokens, and their invalidation.
+
+Besides the role, tokens carry the linked doctor profile (`doctor_id`)
+so doctor requests need no lookup, and the user's claims version (`cv`).
+Bumping a user's claims version rejects every token minted before with
+401. Linking a doctor profile, changing a role and logging out bump it.
+
+Every worker keeps the claims versions of all users that ever had one
+bumped in a dict, so checking a token is a dict lookup. The dict is
+loaded from `users` once, then kept current from the
+`claims_version_changes` feed:
+
+- Bumps made by a worker apply to its own dict at once.
+- Bumps also increment a counter on a shared VersionBoard. Other workers
+  on the host see it on their next check and read the new feed rows.
+- Every CLAIMS_VERSION_POLL_SECONDS the feed is read anyway, for workers
+  on other hosts.
+
+Feed ids do not commit in id order, so the feed is not read past an id
+watermark. Each read covers the rows created since the previous read
+minus CLAIMS_VERSION_FEED_MARGIN_SECONDS, which must exceed the longest
+transaction and the clock skew between hosts. Rows read twice are merged
+with max(), which makes re-reading harmless.
+
+Tokens without a `cv` claim are not checked.
+"""
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+
+from backend.auth.models import User
+from backend.auth.repository import user_repository
+from backend.common.enums import UserRole
+from backend.common.metrics import register_metrics
+from backend.common.versions import VersionBoard, default_board_path
+from backend.doctors.directory import doctor_directory
+
+logger = logging.getLogger(__name__)
+
+# Single counter on the board, bumped after any change
+FEED_KEY = 0
+
+
+def token_claims(user: User) -> dict:
+    """Additional claims for a user's tokens."""
+    claims = {"role": user.role, "cv": user.claims_version or 0}
+    if user.role == UserRole.DOCTOR.value:
+        doctor_id = doctor_directory.doctor_id_for_user(user.id)
+        if doctor_id is not None:
+            claims["doctor_id"] = doctor_id
+    return claims
+
+
+class ClaimsVersions:
+    """In-process claims versions of all users, refreshed from a change feed."""
+
+    def __init__(self):
+        self.versions = {}
+        self.board = VersionBoard()
+        self.poll_interval = 1.0
+        self.retention = timedelta(days=1)
+        self.margin = timedelta(seconds=60)
+        self.rejected = 0
+        self.polls = 0
+        self.reloads = 0
+        self._lock = threading.Lock()
+        self._last_id = 0
+        self._since = None
+        self._seen = None
+        self._polled_at = 0.0
+
+    def init_app(self, app, jwt) -> None:
+        """Attach the shared version file, start empty and check tokens on every request."""
+        path = app.config.get("CLAIMS_VERSION_FILE") or default_board_path(app, "claims-versions")
+        self.board.close()
+        self.board = VersionBoard(path, stripes=1)
+        self.poll_interval = app.config.get("CLAIMS_VERSION_POLL_SECONDS", 1.0)
+        self.margin = timedelta(seconds=app.config.get("CLAIMS_VERSION_FEED_MARGIN_SECONDS", 60))
+        # Refresh tokens outlive everything else a rejected token could be
+        self.retention = app.config.get("JWT_REFRESH_TOKEN_EXPIRES", timedelta(days=1))
+        self.versions = {}
+        self.rejected = self.polls = self.reloads = 0
+        self._last_id = 0
+        self._seen = None
+        jwt.token_in_blocklist_loader(self.is_stale)
+        register_metrics("claims_versions", self.stats)
+
+    def current(self, user_id: int) -> int:
+        """Current claims version of a user."""
+        self._refresh()
+        return self.versions.get(user_id, 0)
+
+    def bump(self, user: User) -> None:
+        """Invalidate a user's existing tokens. Commit, then call `invalidate`."""
+        user_repository.bump_claims_version(user)
+        user_repository.delete_claims_changes_before(datetime.utcnow() - self.retention)
+
+    def invalidate(self, user: User) -> None:
+        """Apply a committed bump to this worker and signal the other workers."""
+        with self._lock:
+            self.versions[user.id] = max(self.versions.get(user.id, 0), user.claims_version)
+        self.board.bump(FEED_KEY)
+
+    def is_stale(self, jwt_header: dict, jwt_payload: dict) -> bool:
+        """Token check for flask-jwt-extended: True rejects the token."""
+        if "cv" not in jwt_payload or jwt_payload["cv"] >= self.current(jwt_payload["sub"]):
+            return False
+        self.rejected += 1
+        logger.info(f"Rejected {jwt_payload.get('type')} token of user {jwt_payload['sub']}: outdated claims")
+        return True
+
+    def stats(self) -> dict:
+        """Return the number of tracked users, feed reads and rejected tokens."""
+        return {
+            "users": len(self.versions),
+            "last_change_id": self._last_id,
+            "polls": self.polls,
+            "reloads": self.reloads,
+            "rejected": self.rejected,
+        }
+
+    def _refresh(self) -> None:
+        seen = self.board.get(FEED_KEY)
+        now = time.monotonic()
+        if seen == self._seen and now - self._polled_at < self.poll_interval:
+            return
+
+        with self._lock:
+            if seen == self._seen and now - self._polled_at < self.poll_interval:
+                return
+            started = datetime.utcnow()
+            # Rows this worker has not read yet may have been pruned: start over
+            if self._seen is None or now - self._polled_at > self.retention.total_seconds():
+                self.versions = user_repository.find_claims_versions()
+                self._since = started - self.margin
+                self.reloads += 1
+            for change_id, user_id, version in user_repository.find_claims_changes(self._since):
+                self.versions[user_id] = max(self.versions.get(user_id, 0), version)
+                self._last_id = max(self._last_id, change_id)
+            self._since = started - self.margin
+            self.polls += 1
+            self._seen = seen
+            self._polled_at = now
+
+
+claims_versions = ClaimsVersions()
@@ -0,0 +1,207 @@
+"""
+Bulk user import from CSV.
+
+The CSV (columns `email` and `password`, header row required) is read as
+a stream, one chunk of rows at a time. Each chunk is deduplicated against
+existing users with one IN query, hashed across the bulk password
+hashing pool and inserted with one executemany INSERT, then committed. Imported
+users are always MEMBERs.
+
+Re-running an import is safe because existing emails are skipped, also
+those registered while the chunk was being hashed. Large
+files belong to the CLI, which writes a checkpoint after every committed
+chunk and resumes from it:
+
+    flask --app backend.main:create_app import-users members.csv --checkpoint members.ckpt
+
+The HTTP endpoint handles at most USER_IMPORT_MAX_ROWS_PER_REQUEST rows
+per request, so a request stays within worker timeouts.
+"""
+import csv
+import itertools
+import json
+import logging
+import os
+import time
+from typing import Callable, Iterator, TextIO
+
+import click
+from marshmallow import ValidationError
+from sqlalchemy.exc import IntegrityError
+
+from backend.auth.repository import user_repository
+from backend.auth.schemas import RegisterSchema
+from backend.common.db import db
+from backend.common.enums import UserRole
+from backend.common.exceptions import AppException
+from backend.common.metrics import register_metrics
+from backend.common.security import password_hasher
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 500
+REQUIRED_COLUMNS = {"email", "password"}
+
+
+class UserImporter:
+    """Chunked, resumable bulk creation of member accounts."""
+
+    def __init__(self):
+        self.chunk_size = DEFAULT_CHUNK_SIZE
+        self.last_run = {}
+
+    def init_app(self, app) -> None:
+        """Register the CLI command and the import metrics."""
+        self.chunk_size = app.config.get("USER_IMPORT_CHUNK_SIZE", DEFAULT_CHUNK_SIZE)
+        register_metrics("user_import", self.stats)
+
+        @app.cli.command("import-users")
+        @click.argument("csv_file", type=click.Path(exists=True, dir_okay=False))
+        @click.option("--chunk-size", type=int, default=None, help="Rows per INSERT.")
+        @click.option("--checkpoint", type=click.Path(dir_okay=False), default=None,
+                      help="File recording progress; an interrupted import resumes from it.")
+        def import_users_command(csv_file, chunk_size, checkpoint):
+            """Create MEMBER accounts from a CSV of email,password rows."""
+            skip = self._read_checkpoint(checkpoint, csv_file) if checkpoint else 0
+            if skip:
+                click.echo(f"Resuming after row {skip}")
+
+            def progress(result):
+                if checkpoint:
+                    self._write_checkpoint(checkpoint, csv_file, result["rows"])
+                click.echo(
+                    f"{result['rows']} rows: {result['created']} created, "
+                    f"{result['existing']} existing, {result['invalid']} invalid"
+                )
+
+            with open(csv_file, newline="", encoding="utf-8") as f:
+                result = self.run(f, skip=skip, chunk_size=chunk_size, on_chunk=progress)
+
+            if checkpoint and os.path.exists(checkpoint):
+                os.remove(checkpoint)
+            click.echo(
+                f"Imported {result['created']} users from {result['rows']} rows "
+                f"in {result['seconds']}s ({result['rows_per_second']} rows/s)"
+            )
+
+    def run(self, stream: TextIO, skip: int = 0, chunk_size: int | None = None,
+            on_chunk: Callable[[dict], None] | None = None, max_rows: int | None = None) -> dict:
+        """
+        Import users from a CSV text stream.
+
+        Args:
+            skip: data rows already imported by an earlier run
+            on_chunk: called with the running totals after each committed chunk
+            max_rows: stop after this many rows; "complete" tells whether any are left
+
+        Returns:
+            {"rows", "created", "existing", "invalid", "chunks", "complete", "seconds", "rows_per_second"}
+        """
+        chunk_size = chunk_size or self.chunk_size
+        reader = csv.DictReader(stream)
+        if not REQUIRED_COLUMNS.issubset(reader.fieldnames or []):
+            raise AppException(f"CSV must have the columns: {', '.join(sorted(REQUIRED_COLUMNS))}")
+
+        started = time.perf_counter()
+        result = {"rows": skip, "created": 0, "existing": 0, "invalid": 0, "chunks": 0}
+        rows = iter(reader)
+        for chunk in self._chunks(rows, skip, chunk_size, max_rows):
+            created, existing, invalid = self._import_chunk(chunk, result["rows"])
+            db.session.commit()
+
+            result["rows"] += len(chunk)
+            result["created"] += created
+            result["existing"] += existing
+            result["invalid"] += invalid
+            result["chunks"] += 1
+            logger.info(
+                f"User import: {result['rows']} rows, {result['created']} created, "
+                f"{result['existing']} existing, {result['invalid']} invalid"
+            )
+            if on_chunk:
+                on_chunk(result)
+
+        result["complete"] = next(rows, None) is None
+        seconds = time.perf_counter() - started
+        imported = result["rows"] - skip
+        result["seconds"] = round(seconds, 3)
+        result["rows_per_second"] = round(imported / seconds) if seconds else 0
+        self.last_run = dict(result)
+        logger.info(
+            f"User import finished: {result['created']} created from {imported} rows "
+            f"({result['rows_per_second']} rows/s)"
+        )
+        return result
+
+    def stats(self) -> dict:
+        """Return the result of the last import."""
+        return dict(self.last_run)
+
+    def _import_chunk(self, chunk: list[dict], offset: int) -> tuple[int, int, int]:
+        """Validate, dedupe, hash and insert one chunk. Returns (created, existing, invalid)."""
+        schema = RegisterSchema()
+        valid = {}
+        invalid = 0
+        for number, row in enumerate(chunk, start=offset + 1):
+            try:
+                data = schema.load({"email": row.get("email"), "password": row.get("password")})
+            except ValidationError as err:
+                invalid += 1
+                logger.warning(f"User import: skipping row {number}: {err.messages}")
+                continue
+            # A repeated email within the file keeps its first row
+            valid.setdefault(data["email"], data["password"])
+
+        existing = user_repository.find_existing_emails(list(valid))
+        new_users = [(email, password) for email, password in valid.items() if email not in existing]
+        hashes = password_hasher.hash_many([password for _, password in new_users])
+
+        rows = [
+            {"email": email, "password": hashed, "role": UserRole.MEMBER.value}
+            for (email, _), hashed in zip(new_users, hashes)
+        ]
+        while True:
+            try:
+                with db.session.begin_nested():
+                    created = user_repository.bulk_create(rows)
+                break
+            except IntegrityError:
+                # Emails registered since the lookup: skip them and insert the rest
+                taken = user_repository.find_existing_emails([row["email"] for row in rows])
+                if not taken:
+                    raise
+                logger.info(f"User import: {len(taken)} emails were registered meanwhile, skipping them")
+                rows = [row for row in rows if row["email"] not in taken]
+        return created, len(chunk) - invalid - created, invalid
+
+    @staticmethod
+    def _chunks(rows: Iterator[dict], skip: int, chunk_size: int, max_rows: int | None):
+        for _ in zip(range(skip), rows):
+            pass
+        remaining = max_rows if max_rows is not None else float("inf")
+        while remaining > 0:
+            chunk = list(itertools.islice(rows, min(chunk_size, remaining)))
+            if not chunk:
+                return
+            remaining -= len(chunk)
+            yield chunk
+
+    @staticmethod
+    def _read_checkpoint(path: str, source: str) -> int:
+        if not os.path.exists(path):
+            return 0
+        with open(path, encoding="utf-8") as f:
+            checkpoint = json.load(f)
+        if checkpoint.get("source") != os.path.abspath(source):
+            raise click.ClickException(f"Checkpoint {path} belongs to {checkpoint.get('source')}")
+        return checkpoint["rows"]
+
+    @staticmethod
+    def _write_checkpoint(path: str, source: str, rows: int) -> None:
+        # Write then rename, so an interrupted write never leaves a torn checkpoint
+        with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+            json.dump({"source": os.path.abspath(source), "rows": rows}, f)
+        os.replace(f"{path}.tmp", path)
+
+
+user_importer = UserImporter()
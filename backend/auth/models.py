@@ -1,3 +1,4 @@
+from datetime import datetime
 from backend.common.db import db
 
 
@@ -8,3 +9,15 @@ class User(db.Model):
     email = db.Column(db.String(120), unique=True, nullable=False)
     password = db.Column(db.String(255), nullable=False)
     role = db.Column(db.String(20), nullable=False)
+    # Bumped whenever claims minted into this user's tokens change
+    claims_version = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+
+
+class ClaimsVersionChange(db.Model):
+    """Change feed of users' claims versions, polled by every worker."""
+    __tablename__ = "claims_version_changes"
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+    claims_version = db.Column(db.Integer, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
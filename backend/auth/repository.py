@@ -1,5 +1,7 @@
 import logging
-from backend.auth.models import User
+from datetime import datetime
+from sqlalchemy import delete, func, insert, select
+from backend.auth.models import User, ClaimsVersionChange
 from backend.common.db import db
 
 logger = logging.getLogger(__name__)
@@ -19,10 +21,59 @@ class UserRepository:
         """Find user by email."""
         return User.query.filter_by(email=email).first()
 
+    def find_existing_emails(self, emails: list[str]) -> set[str]:
+        """Return which of the given emails are already registered, in one query."""
+        if not emails:
+            return set()
+        return set(db.session.scalars(select(User.email).where(User.email.in_(emails))))
+
+    def bulk_create(self, rows: list[dict]) -> int:
+        """
+        Insert many users with one executemany INSERT.
+
+        Args:
+            rows: dicts with "email", "password" (already hashed) and "role"
+        """
+        if not rows:
+            return 0
+        logger.debug(f"Bulk creating {len(rows)} users")
+        db.session.execute(insert(User), rows)
+        return len(rows)
+
     def find_by_id(self, user_id: int) -> User | None:
         """Find user by ID."""
         return db.session.get(User, user_id)
 
+    def find_claims_versions(self) -> dict[int, int]:
+        """Map every user whose claims version was ever bumped to that version."""
+        rows = db.session.execute(select(User.id, User.claims_version).where(User.claims_version > 0))
+        return {user_id: version for user_id, version in rows}
+
+    def bump_claims_version(self, user: User) -> User:
+        """Invalidate the user's existing tokens and record the change in the feed."""
+        user.claims_version = (user.claims_version or 0) + 1
+        db.session.add(ClaimsVersionChange(user_id=user.id, claims_version=user.claims_version))
+        return user
+
+    def find_claims_changes(self, created_since: datetime) -> list[tuple[int, int, int]]:
+        """Get (id, user_id, claims_version) of feed rows created at or after `created_since`."""
+        return db.session.execute(
+            select(ClaimsVersionChange.id, ClaimsVersionChange.user_id, ClaimsVersionChange.claims_version)
+            .where(ClaimsVersionChange.created_at >= created_since)
+            .order_by(ClaimsVersionChange.created_at)
+        ).all()
+
+    def find_last_claims_change_id(self) -> int:
+        """Get the id of the newest feed row, or 0."""
+        return db.session.scalar(select(func.max(ClaimsVersionChange.id))) or 0
+
+    def delete_claims_changes_before(self, created_before: datetime) -> int:
+        """Prune feed rows older than every worker still needs."""
+        result = db.session.execute(
+            delete(ClaimsVersionChange).where(ClaimsVersionChange.created_at < created_before)
+        )
+        return result.rowcount
+
     def get_all(self) -> list[User]:
         """Get all users."""
         return User.query.all()
@@ -1,5 +1,6 @@
+import io
 import logging
-from flask import Blueprint, request
+from flask import Blueprint, current_app, request
 from flask_jwt_extended import (
     create_access_token, 
     create_refresh_token,
@@ -8,10 +9,19 @@ from flask_jwt_extended import (
 )
 from marshmallow import ValidationError
 
-from backend.auth.service import register_user, authenticate_user, update_user_role, get_user_by_id
-from backend.auth.schemas import RegisterSchema, LoginSchema, RoleAssignmentSchema
+from backend.auth.service import (
+    register_user,
+    authenticate_user,
+    update_user_role,
+    logout_user,
+    get_user_by_id
+)
+from backend.auth.schemas import RegisterSchema, LoginSchema, RoleAssignmentSchema, UserImportQuerySchema
+from backend.auth.importer import user_importer
+from backend.auth.claims import token_claims
 from backend.common.exceptions import AppException
 from backend.common.rbac import require_roles
+from backend.common.throttle import throttle
 from backend.common.enums import UserRole
 
 logger = logging.getLogger(__name__)
@@ -23,6 +33,7 @@ auth_bp = Blueprint("auth", __name__, url_prefix="/auth")
 def register():
     """Register a new user (always as MEMBER)."""
     logger.info("Received registration request")
+    throttle.check("register_ip", request.remote_addr)
     
     schema = RegisterSchema()
     try:
@@ -45,6 +56,7 @@ def register():
 def login():
     """Login and get access + refresh tokens."""
     logger.info("Received login request")
+    throttle.check("login_ip", request.remote_addr)
     
     schema = LoginSchema()
     try:
@@ -53,15 +65,19 @@ def login():
         logger.warning(f"Validation error: {err.messages}")
         raise AppException(str(err.messages))
 
+    # Per account as well, so spreading an attack over many IPs does not help
+    throttle.check("login_email", data["email"].lower())
+
     user = authenticate_user(data["email"], data["password"])
+    claims = token_claims(user)
 
     access_token = create_access_token(
         identity=user.id,
-        additional_claims={"role": user.role}
+        additional_claims=claims
     )
     refresh_token = create_refresh_token(
         identity=user.id,
-        additional_claims={"role": user.role}
+        additional_claims=claims
     )
     
     logger.info(f"User logged in with id: {user.id}")
@@ -85,13 +101,26 @@ def refresh():
     
     access_token = create_access_token(
         identity=user.id,
-        additional_claims={"role": user.role}
+        additional_claims=token_claims(user)
     )
     
     logger.info(f"Token refreshed for user id: {user.id}")
     return {"access_token": access_token}
 
 
+@auth_bp.route("/logout", methods=["POST"])
+@jwt_required(verify_type=False)
+def logout():
+    """Log out everywhere: revoke all of the user's access and refresh tokens."""
+    logger.info("Received logout request")
+
+    user_id = get_jwt_identity()
+    logout_user(user_id)
+
+    logger.info(f"User logged out with id: {user_id}")
+    return {"message": "Logged out"}
+
+
 @auth_bp.route("/users/<int:user_id>/role", methods=["PATCH"])
 @require_roles("ADMIN")
 def assign_role(user_id):
@@ -120,6 +149,34 @@ def assign_role(user_id):
     }
 
 
+@auth_bp.route("/users/import", methods=["POST"])
+@require_roles("ADMIN")
+def import_users():
+    """
+    Create MEMBER accounts from a CSV request body (admin only).
+
+    The body is read as a stream, so uploads of any size are processed in
+    constant memory. At most USER_IMPORT_MAX_ROWS_PER_REQUEST rows are
+    handled per request: while the response says "complete": false, or
+    after an interruption, resend the file with `skip` set to the `rows`
+    of the last response or log line. Use the CLI for large files.
+    """
+    logger.info("Received bulk user import request")
+
+    try:
+        query = UserImportQuerySchema().load(request.args)
+    except ValidationError as err:
+        logger.warning(f"Validation error: {err.messages}")
+        raise AppException(str(err.messages))
+
+    stream = io.TextIOWrapper(request.stream, encoding="utf-8", newline="")
+    max_rows = current_app.config.get("USER_IMPORT_MAX_ROWS_PER_REQUEST", 300)
+    result = user_importer.run(stream, skip=query["skip"], max_rows=max_rows)
+
+    logger.info(f"Bulk import created {result['created']} users")
+    return result
+
+
 @auth_bp.route("/me", methods=["GET"])
 @require_roles("ADMIN", "DOCTOR", "MEMBER")
 def get_current_user():
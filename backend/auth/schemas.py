@@ -21,3 +21,8 @@ class RoleAssignmentSchema(Schema):
         required=True,
         validate=validate.OneOf([role.value for role in UserRole])
     )
+
+
+class UserImportQuerySchema(Schema):
+    """Query params for a bulk user import; `skip` resumes after rows already imported."""
+    skip = fields.Int(load_default=0, validate=validate.Range(min=0))
@@ -1,7 +1,8 @@
 import logging
 from backend.auth.models import User
 from backend.auth.repository import user_repository
-from backend.common.security import hash_password, verify_password
+from backend.auth.claims import claims_versions
+from backend.common.security import hash_password, verify_password, needs_rehash
 from backend.common.exceptions import UnauthorizedError, AppException
 from backend.common.db import db
 
@@ -33,6 +34,12 @@ def authenticate_user(email: str, password: str) -> User:
     if not user or not verify_password(password, user.password):
         logger.warning("Invalid credentials attempt")
         raise UnauthorizedError("Invalid credentials")
+
+    # Upgrade hashes made with older parameters while we have the plain password
+    if needs_rehash(user.password):
+        user.password = hash_password(password)
+        db.session.commit()
+        logger.info(f"Password hash upgraded for user {user.id}")
     
     logger.info(f"User authenticated with id: {user.id}")
     return user
@@ -47,12 +54,30 @@ def update_user_role(user_id: int, new_role: str) -> User:
         raise AppException("User not found")
     
     user = user_repository.update_role(user, new_role)
+    # Tokens claiming the old role stop working now, not when they expire
+    claims_versions.bump(user)
     db.session.commit()
+    claims_versions.invalidate(user)
     
     logger.info(f"Role updated for user {user_id}")
     return user
 
 
+def logout_user(user_id: int) -> None:
+    """Revoke all access and refresh tokens of a user, on every device."""
+    logger.info(f"Logging out user {user_id}")
+
+    user = user_repository.find_by_id(user_id)
+    if not user:
+        raise AppException("User not found")
+
+    claims_versions.bump(user)
+    db.session.commit()
+    claims_versions.invalidate(user)
+
+    logger.info(f"Tokens revoked for user {user_id}")
+
+
 def get_user_by_id(user_id: int) -> User | None:
     """Get a user by ID."""
     return user_repository.find_by_id(user_id)
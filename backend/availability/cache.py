@@ -0,0 +1,91 @@
+"""
+Read cache for GET /availability/doctor/<id>.
+
+Entries are keyed by doctor, date window and page and tagged with the doctor's
+version on the shared VersionBoard at the time the rows were read. Writers
+bump the version after committing, so an entry is served only while no
+worker has changed that doctor's slots since it was cached.
+"""
+import logging
+import threading
+from datetime import date
+
+from backend.common.cache import LRUCache
+from backend.common.metrics import register_metrics
+from backend.common.versions import VersionBoard, default_board_path
+
+logger = logging.getLogger(__name__)
+
+
+class AvailabilityCache:
+    """Bounded LRU of open-slot payloads with cross-worker invalidation."""
+
+    def __init__(self):
+        self.entries = LRUCache(0)
+        self.versions = VersionBoard()
+        self.stale = 0
+        self.invalidations = 0
+        self._lock = threading.Lock()
+
+    def init_app(self, app) -> None:
+        """Size the cache and attach the shared version file from the app config."""
+        path = app.config.get("AVAILABILITY_CACHE_VERSION_FILE") or default_board_path(
+            app, "availability-versions"
+        )
+        self.versions.close()
+        self.versions = VersionBoard(path)
+        self.entries = LRUCache(app.config.get("AVAILABILITY_CACHE_SIZE", 1024))
+        self.stale = 0
+        self.invalidations = 0
+        register_metrics("availability_cache", self.stats)
+
+    @property
+    def epoch(self) -> int:
+        """Random id of the version file; changes when its counters restart from 0."""
+        return self.versions.epoch
+
+    def version(self, doctor_id: int) -> int:
+        """Current version of a doctor's slots. Read it before querying the rows to cache."""
+        return self.versions.get(doctor_id)
+
+    def get(self, doctor_id: int, date_from: date, date_to: date | None, limit: int,
+            cursor: str | None = None) -> dict | None:
+        """Return the cached payload for a window page, or None if missing or stale."""
+        key = (doctor_id, date_from, date_to, limit, cursor)
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        version, payload = entry
+        if version != self.versions.get(doctor_id):
+            with self._lock:
+                self.stale += 1
+            self.entries.delete(key)
+            return None
+        return payload
+
+    def set(self, doctor_id: int, date_from: date, date_to: date | None, limit: int,
+            cursor: str | None, version: int, payload: dict) -> None:
+        """Cache a payload read while the doctor was at `version`."""
+        self.entries.set((doctor_id, date_from, date_to, limit, cursor), (version, payload))
+
+    def invalidate(self, *doctor_ids: int) -> None:
+        """Invalidate every cached window of the given doctors, in all workers. Call after commit."""
+        for doctor_id in set(doctor_ids):
+            self.versions.bump(doctor_id)
+            with self._lock:
+                self.invalidations += 1
+
+    def stats(self) -> dict:
+        """Return hit/miss/eviction counters plus stale reads and invalidations."""
+        stats = self.entries.stats()
+        with self._lock:
+            stale, invalidations = self.stale, self.invalidations
+        # A stale entry was found by the LRU but not served: count it as a miss
+        stats["hits"] -= stale
+        stats["misses"] += stale
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        return {**stats, "stale": stale, "invalidations": invalidations}
+
+
+availability_cache = AvailabilityCache()
@@ -0,0 +1,57 @@
+"""
+In-memory interval index for bulk slot validation.
+
+Slots of one doctor on one day never overlap, so kept sorted by start
+time their end times are sorted too. An overlap check is then a single
+bisect: only the last slot starting before the candidate ends can reach
+into it.
+"""
+from bisect import bisect_left
+from datetime import date, time
+
+from backend.availability.repository import availability_repository
+
+
+class SlotIntervalIndex:
+    """Sorted, non-overlapping [start, end) intervals per (doctor_id, date)."""
+
+    def __init__(self):
+        self._starts: dict[tuple[int, date], list[time]] = {}
+        self._ends: dict[tuple[int, date], list[time]] = {}
+
+    @classmethod
+    def load(cls, doctor_id: int, date_from: date, date_to: date) -> "SlotIntervalIndex":
+        """Build an index from a doctor's existing slots with one range query."""
+        index = cls()
+        for day, start, end in availability_repository.find_intervals_in_range(doctor_id, date_from, date_to):
+            index.add(doctor_id, day, start, end)
+        return index
+
+    def add(self, doctor_id: int, day: date, start: time, end: time) -> None:
+        """Add an interval. The caller guarantees it does not overlap existing ones."""
+        key = (doctor_id, day)
+        starts = self._starts.setdefault(key, [])
+        ends = self._ends.setdefault(key, [])
+        i = bisect_left(starts, start)
+        starts.insert(i, start)
+        ends.insert(i, end)
+
+    def overlaps(self, doctor_id: int, day: date, start: time, end: time) -> bool:
+        """Check whether [start, end) overlaps any indexed interval."""
+        key = (doctor_id, day)
+        starts = self._starts.get(key)
+        if not starts:
+            return False
+        # Intervals [0, i) start before `end`; the last of them ends latest
+        i = bisect_left(starts, end)
+        return i > 0 and self._ends[key][i - 1] > start
+
+    def try_add(self, doctor_id: int, day: date, start: time, end: time) -> bool:
+        """Add the interval unless it overlaps. Returns True if it was added."""
+        if self.overlaps(doctor_id, day, start, end):
+            return False
+        self.add(doctor_id, day, start, end)
+        return True
+
+    def __len__(self) -> int:
+        return sum(len(starts) for starts in self._starts.values())
@@ -4,6 +4,13 @@ from backend.common.db import db
 class Availability(db.Model):
     """Doctor availability slots."""
     __tablename__ = "availability"
+    __table_args__ = (
+        # Covers check_overlap and the per-doctor listings
+        db.Index("ix_availability_doctor_date_start_end", "doctor_id", "date", "start_time", "end_time"),
+        # Open-slot lookups: equality on (doctor_id, is_booked), then date order
+        db.Index("ix_availability_doctor_booked_date_start", "doctor_id", "is_booked", "date", "start_time"),
+        db.Index("ix_availability_date_start", "date", "start_time"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     doctor_id = db.Column(
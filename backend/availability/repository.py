@@ -1,10 +1,20 @@
 import logging
 from datetime import date, time
+from functools import lru_cache
+from sqlalchemy import bindparam, delete, exists, insert, select, union_all, update
+from sqlalchemy.orm import joinedload
 from backend.availability.models import Availability
+from backend.appointments.models import Appointment
+from backend.holds.models import SlotHold
+from backend.auth.models import User
 from backend.common.db import db
+from backend.common.pagination import keyset_after
 
 logger = logging.getLogger(__name__)
 
+# Doctors per UNION ALL statement; SQLite allows at most 500 compound SELECT terms
+OPEN_SLOTS_BATCH_SIZE = 200
+
 
 class AvailabilityRepository:
     """Repository for Availability database operations."""
@@ -22,6 +32,21 @@ class AvailabilityRepository:
         db.session.add(availability)
         return availability
 
+    def bulk_create(self, doctor_id: int, slots: list[tuple[date, time, time]]) -> int:
+        """Insert many slots for a doctor in one executemany statement."""
+        if not slots:
+            return 0
+        logger.debug(f"Bulk creating {len(slots)} availability slots for doctor {doctor_id}")
+        db.session.execute(
+            insert(Availability),
+            [
+                {"doctor_id": doctor_id, "date": day, "start_time": start,
+                 "end_time": end, "is_booked": False}
+                for day, start, end in slots
+            ]
+        )
+        return len(slots)
+
     def find_by_id(self, availability_id: int) -> Availability | None:
         """Find availability by ID."""
         return db.session.get(Availability, availability_id)
@@ -30,13 +55,221 @@ class AvailabilityRepository:
         """Find availability by ID with row lock (prevents double booking)."""
         return Availability.query.with_for_update().filter_by(id=availability_id).first()
 
-    def find_by_doctor_id(self, doctor_id: int) -> list[Availability]:
-        """Find all availability slots for a doctor."""
-        return Availability.query.filter_by(doctor_id=doctor_id).all()
+    def find_doctor_id(self, availability_id: int) -> int | None:
+        """Find the doctor owning a slot without loading the row."""
+        return db.session.query(Availability.doctor_id).filter_by(id=availability_id).scalar()
+
+    def claim(self, availability_id: int) -> bool:
+        """Atomically mark a free slot as booked. Returns False if it was missing or already booked."""
+        result = db.session.execute(
+            update(Availability)
+            .filter_by(id=availability_id, is_booked=False)
+            .values(is_booked=True)
+        )
+        return result.rowcount == 1
+
+    def release(self, availability_id: int) -> bool:
+        """Atomically mark a booked slot as free. Returns False if it was missing or not booked."""
+        result = db.session.execute(
+            update(Availability)
+            .filter_by(id=availability_id, is_booked=True)
+            .values(is_booked=False)
+        )
+        return result.rowcount == 1
+
+    def claim_many(self, availability_ids: list[int]) -> bool:
+        """
+        Atomically mark several free slots as booked with one conditional UPDATE.
+
+        Returns False if any of them was missing or already booked; the
+        caller must then roll back, as the others were claimed.
+        """
+        result = db.session.execute(
+            update(Availability)
+            .filter(Availability.id.in_(availability_ids))
+            .filter_by(is_booked=False)
+            .values(is_booked=True)
+        )
+        return result.rowcount == len(availability_ids)
+
+    def release_range(self, doctor_id: int, date: date, start_time: time, end_time: time) -> int:
+        """Mark every slot of a doctor within [start_time, end_time] on a date as free again."""
+        result = db.session.execute(
+            update(Availability)
+            .filter(
+                Availability.doctor_id == doctor_id,
+                Availability.date == date,
+                Availability.start_time >= start_time,
+                Availability.end_time <= end_time
+            )
+            .values(is_booked=False)
+        )
+        return result.rowcount
+
+    def set_booked_in_range(self, doctor_id: int, date_from: date, date_to: date, is_booked: bool) -> int:
+        """Set is_booked on every slot of a doctor in a date range. Returns rows changed."""
+        result = db.session.execute(
+            update(Availability)
+            .filter(
+                Availability.doctor_id == doctor_id,
+                Availability.date >= date_from,
+                Availability.date <= date_to
+            )
+            .values(is_booked=is_booked)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount
+
+    def release_for_appointments(self, doctor_id: int, date_from: date, date_to: date,
+                                 appointment_ids: list[int]) -> int:
+        """
+        Mark free the slots of a doctor's date range that lie within one of the given appointments.
+
+        One UPDATE, however many appointments; covers every slot a block
+        booking spans. Returns rows changed.
+        """
+        if not appointment_ids:
+            return 0
+        result = db.session.execute(
+            update(Availability)
+            .filter(
+                Availability.doctor_id == doctor_id,
+                Availability.date >= date_from,
+                Availability.date <= date_to,
+                Availability.is_booked == True,  # noqa: E712
+                exists().where(
+                    Appointment.id.in_(appointment_ids),
+                    Appointment.date == Availability.date,
+                    Appointment.start_time <= Availability.start_time,
+                    Appointment.end_time >= Availability.end_time
+                )
+            )
+            .values(is_booked=False)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount
+
+    def delete_unreferenced_in_range(self, doctor_id: int, date_from: date, date_to: date) -> int:
+        """Delete a doctor's slots in a date range that no appointment or hold points to. Returns rows deleted."""
+        result = db.session.execute(
+            delete(Availability)
+            .filter(
+                Availability.doctor_id == doctor_id,
+                Availability.date >= date_from,
+                Availability.date <= date_to,
+                ~exists().where(Appointment.availability_id == Availability.id),
+                ~exists().where(SlotHold.availability_id == Availability.id)
+            )
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount
+
+    def find_free_day_slots(self, doctor_id: int, day: date) -> list[tuple[int, time, time]]:
+        """Find (id, start_time, end_time) of a doctor's unbooked slots on one day, in time order."""
+        return [
+            tuple(row) for row in db.session.query(
+                Availability.id, Availability.start_time, Availability.end_time
+            ).filter_by(
+                doctor_id=doctor_id, is_booked=False, date=day
+            ).order_by(Availability.start_time)
+        ]
+
+    def find_by_doctor_id(self, doctor_id: int, date_from: date | None = None,
+                          date_to: date | None = None, limit: int | None = None,
+                          after: tuple | None = None) -> list[Availability]:
+        """Find a doctor's availability slots, optionally within a date range."""
+        query = Availability.query.filter_by(doctor_id=doctor_id)
+        return _in_date_order(query, date_from, date_to, limit, after)
+
+    def find_available_by_doctor_id(self, doctor_id: int, date_from: date | None = None,
+                                    date_to: date | None = None, limit: int | None = None,
+                                    after: tuple | None = None) -> list[Availability]:
+        """Find available (not booked) slots for a doctor, optionally within a date range."""
+        query = Availability.query.filter_by(doctor_id=doctor_id, is_booked=False)
+        return _in_date_order(query, date_from, date_to, limit, after)
+
+    def find_in_range(self, date_from: date | None = None, date_to: date | None = None,
+                      limit: int | None = None, after: tuple | None = None) -> list[Availability]:
+        """Find slots of all doctors within a date range, with the doctor joined in."""
+        query = Availability.query.options(joinedload(Availability.doctor))
+        return _in_date_order(query, date_from, date_to, limit, after)
+
+    def find_intervals_in_range(self, doctor_id: int, date_from: date,
+                                date_to: date) -> list[tuple[date, time, time]]:
+        """Find (date, start_time, end_time) of a doctor's slots in a date range, index-only."""
+        return [
+            tuple(row) for row in db.session.query(
+                Availability.date, Availability.start_time, Availability.end_time
+            ).filter(
+                Availability.doctor_id == doctor_id,
+                Availability.date >= date_from,
+                Availability.date <= date_to
+            ).order_by(Availability.date, Availability.start_time)
+        ]
+
+    def find_day_rows(self, doctor_id: int, day: date) -> list[tuple[time, time, bool]]:
+        """Find (start_time, end_time, is_booked) of a doctor's slots on one day, index-only."""
+        return [
+            tuple(row) for row in db.session.query(
+                Availability.start_time, Availability.end_time, Availability.is_booked
+            ).filter(
+                Availability.doctor_id == doctor_id,
+                Availability.date == day
+            )
+        ]
+
+    def find_agenda(self, doctor_id: int, day: date) -> list:
+        """
+        Find a doctor's slots on one day with the appointment booked in each, in one query.
+
+        Slots are LEFT JOINed to the non-cancelled appointment overlapping
+        them (so an appointment spanning several slots shows in each) and to
+        the booking member. Rows are ordered by start_time.
+        """
+        return db.session.execute(
+            select(
+                Availability.id.label("availability_id"),
+                Availability.start_time,
+                Availability.end_time,
+                Availability.is_booked,
+                Appointment.id.label("appointment_id"),
+                Appointment.status,
+                Appointment.member_id,
+                User.email.label("member_email"),
+            ).outerjoin(
+                Appointment,
+                (Appointment.doctor_id == Availability.doctor_id)
+                & (Appointment.date == Availability.date)
+                & (Appointment.start_time < Availability.end_time)
+                & (Appointment.end_time > Availability.start_time)
+                & (Appointment.status != "CANCELLED")
+            ).outerjoin(
+                User, User.id == Appointment.member_id
+            ).filter(
+                Availability.doctor_id == doctor_id,
+                Availability.date == day
+            ).order_by(Availability.start_time, Appointment.start_time)
+        ).all()
 
-    def find_available_by_doctor_id(self, doctor_id: int) -> list[Availability]:
-        """Find available (not booked) slots for a doctor."""
-        return Availability.query.filter_by(doctor_id=doctor_id, is_booked=False).all()
+    def find_open_slots_for_doctors(self, doctor_ids: list[int], date_from: date,
+                                    date_to: date | None, per_doctor_limit: int) -> list:
+        """
+        Find the earliest open slots of each doctor with UNION ALL queries.
+
+        Every branch is an index range scan on (doctor_id, is_booked, date,
+        start_time) that stops after `per_doctor_limit` rows. Doctors are
+        queried OPEN_SLOTS_BATCH_SIZE at a time, one statement per batch.
+        Rows come back grouped by doctor and ordered by (date, start_time,
+        id) within each.
+        """
+        rows = []
+        for start in range(0, len(doctor_ids), OPEN_SLOTS_BATCH_SIZE):
+            batch = doctor_ids[start:start + OPEN_SLOTS_BATCH_SIZE]
+            params = {"date_from": date_from, "date_to": date_to, "per_doctor_limit": per_doctor_limit}
+            params.update({f"doctor_{i}": doctor_id for i, doctor_id in enumerate(batch)})
+            statement = _open_slots_statement(len(batch), date_to is not None)
+            rows.extend(db.session.execute(statement, params).all())
+        return rows
 
     def get_all(self) -> list[Availability]:
         """Get all availability slots."""
@@ -57,4 +290,54 @@ class AvailabilityRepository:
         return existing is not None
 
 
+def _in_date_order(query, date_from: date | None, date_to: date | None, limit: int | None,
+                   after: tuple | None = None) -> list[Availability]:
+    """
+    Apply an inclusive date range, (date, start_time, id) order and a row limit to a slot query.
+
+    `after` is the (date, start_time, id) key of the last row of the previous page.
+    """
+    if date_from is not None:
+        query = query.filter(Availability.date >= date_from)
+    if date_to is not None:
+        query = query.filter(Availability.date <= date_to)
+    if after:
+        query = query.filter(keyset_after(
+            [Availability.date, Availability.start_time, Availability.id], after
+        ))
+    query = query.order_by(Availability.date, Availability.start_time, Availability.id)
+    if limit is not None:
+        query = query.limit(limit)
+    return query.all()
+
+
+@lru_cache(maxsize=128)
+def _open_slots_statement(doctor_count: int, bounded: bool):
+    """
+    Build the UNION ALL statement for `doctor_count` doctors with bind parameters.
+
+    Constructing dozens of subqueries costs more than running them, so the
+    statement is built once per shape and reused.
+    """
+    slots = Availability.__table__
+    branches = []
+    for i in range(doctor_count):
+        branch = select(
+            slots.c.id, slots.c.doctor_id, slots.c.date, slots.c.start_time, slots.c.end_time
+        ).where(
+            slots.c.doctor_id == bindparam(f"doctor_{i}"),
+            slots.c.is_booked == False,  # noqa: E712 - equality keeps the index usable
+            slots.c.date >= bindparam("date_from")
+        )
+        if bounded:
+            branch = branch.where(slots.c.date <= bindparam("date_to"))
+        branch = branch.order_by(
+            slots.c.date, slots.c.start_time, slots.c.id
+        ).limit(bindparam("per_doctor_limit"))
+        branches.append(select(branch.subquery()))
+
+    merged = union_all(*branches).subquery()
+    return select(merged).order_by(merged.c.doctor_id, merged.c.date, merged.c.start_time, merged.c.id)
+
+
 availability_repository = AvailabilityRepository()
@@ -5,13 +5,24 @@ from marshmallow import ValidationError
 
 from backend.common.rbac import require_roles
 from backend.common.exceptions import AppException
-from backend.availability.schemas import AvailabilityCreateSchema
+from backend.availability.schemas import (
+    AvailabilityCreateSchema,
+    AvailabilityTemplateSchema,
+    AvailabilityImportSchema,
+    AvailabilityRangeQuerySchema,
+    AvailabilitySearchSchema,
+    AvailabilityFreeWindowsQuerySchema
+)
 from backend.availability.service import (
     create_availability,
+    create_availability_from_template,
+    import_availability,
     get_available_slots,
     delete_availability,
     list_all_availability,
-    get_my_availability
+    get_my_availability,
+    search_open_slots,
+    get_free_windows
 )
 
 logger = logging.getLogger(__name__)
@@ -56,69 +67,170 @@ def create_availability_api():
     }, 201
 
 
+@availability_bp.route("/templates", methods=["POST"])
+@require_roles("DOCTOR", "ADMIN")
+def create_availability_template_api():
+    """Create slots from a recurring template (e.g. Mon-Fri 09:00-17:00 in 20-minute slots)."""
+    logger.info("Received request to create availability from template")
+
+    claims = get_jwt()
+    current_user_id = get_jwt_identity()
+    current_user_role = claims.get("role")
+
+    schema = AvailabilityTemplateSchema()
+    try:
+        data = schema.load(request.get_json())
+    except ValidationError as err:
+        logger.warning(f"Validation error: {err.messages}")
+        raise AppException(str(err.messages))
+
+    result = create_availability_from_template(
+        **data,
+        current_user_id=current_user_id,
+        current_user_role=current_user_role
+    )
+
+    return {"doctor_id": data["doctor_id"], **result}, 201
+
+
+@availability_bp.route("/bulk", methods=["POST"])
+@require_roles("DOCTOR", "ADMIN")
+def import_availability_api():
+    """Import many slots for one doctor (e.g. from an external calendar)."""
+    logger.info("Received request to import availability")
+
+    claims = get_jwt()
+    current_user_id = get_jwt_identity()
+    current_user_role = claims.get("role")
+
+    schema = AvailabilityImportSchema()
+    try:
+        data = schema.load(request.get_json())
+    except ValidationError as err:
+        logger.warning(f"Validation error: {err.messages}")
+        raise AppException(str(err.messages))
+
+    result = import_availability(
+        doctor_id=data["doctor_id"],
+        slots=data["slots"],
+        current_user_id=current_user_id,
+        current_user_role=current_user_role
+    )
+
+    return {"doctor_id": data["doctor_id"], **result}, 201
+
+
 @availability_bp.route("/my", methods=["GET"])
 @require_roles("DOCTOR")
 def get_my_availability_api():
-    """Get the logged-in doctor's availability slots."""
+    """Get the logged-in doctor's availability slots (`from` defaults to today)."""
     logger.info("Received request to get own availability")
     
     current_user_id = get_jwt_identity()
-    slots = get_my_availability(current_user_id)
+    try:
+        query = AvailabilityRangeQuerySchema().load(request.args)
+    except ValidationError as err:
+        logger.warning(f"Validation error: {err.messages}")
+        raise AppException(str(err.messages))
+
+    slots, next_cursor = get_my_availability(current_user_id, **query)
     
-    return [
-        {
-            "id": slot.id,
-            "doctor_id": slot.doctor_id,
-            "date": str(slot.date),
-            "start_time": str(slot.start_time),
-            "end_time": str(slot.end_time),
-            "is_booked": slot.is_booked
-        }
-        for slot in slots
-    ]
+    return {
+        "items": [
+            {
+                "id": slot.id,
+                "doctor_id": slot.doctor_id,
+                "date": str(slot.date),
+                "start_time": str(slot.start_time),
+                "end_time": str(slot.end_time),
+                "is_booked": slot.is_booked
+            }
+            for slot in slots
+        ],
+        "next_cursor": next_cursor
+    }
 
 
 @availability_bp.route("/doctor/<int:doctor_id>", methods=["GET"])
 @jwt_required()
 def get_doctor_availability_api(doctor_id):
-    """Get available slots for a specific doctor."""
+    """
+    Get available slots for a specific doctor (`from` defaults to today, `limit` is capped).
+
+    Results are paged by (date, start_time, id): pass the `next_cursor` of
+    the previous page as `cursor`.
+    """
     logger.info(f"Received request to get availability for doctor {doctor_id}")
 
-    slots = get_available_slots(doctor_id)
+    try:
+        query = AvailabilityRangeQuerySchema().load(request.args)
+    except ValidationError as err:
+        logger.warning(f"Validation error: {err.messages}")
+        raise AppException(str(err.messages))
+
+    return get_available_slots(doctor_id, **query)
 
-    return [
-        {
-            "id": slot.id,
-            "doctor_id": slot.doctor_id,
-            "date": str(slot.date),
-            "start_time": str(slot.start_time),
-            "end_time": str(slot.end_time),
-            "is_booked": slot.is_booked
-        }
-        for slot in slots
-    ]
+
+@availability_bp.route("/doctor/<int:doctor_id>/free-windows", methods=["GET"])
+@jwt_required()
+def get_free_windows_api(doctor_id):
+    """Get a doctor's free windows of at least `duration` minutes on `date`, plus utilization."""
+    logger.info(f"Received request to get free windows for doctor {doctor_id}")
+
+    try:
+        query = AvailabilityFreeWindowsQuerySchema().load(request.args)
+    except ValidationError as err:
+        logger.warning(f"Validation error: {err.messages}")
+        raise AppException(str(err.messages))
+
+    return get_free_windows(doctor_id, day=query["date"], duration=query["duration"])
+
+
+@availability_bp.route("/search", methods=["GET"])
+@jwt_required()
+def search_availability_api():
+    """Find the earliest open slots across all doctors in a department."""
+    logger.info("Received request to search open slots")
+
+    schema = AvailabilitySearchSchema()
+    try:
+        query = schema.load(request.args)
+    except ValidationError as err:
+        logger.warning(f"Validation error: {err.messages}")
+        raise AppException(str(err.messages))
+
+    return search_open_slots(**query)
 
 
 @availability_bp.route("", methods=["GET"])
 @require_roles("ADMIN")
 def list_all_availability_api():
-    """List all availability slots (admin only)."""
+    """List availability slots of all doctors (admin only, `from` defaults to today)."""
     logger.info("Received request to list all availability")
 
-    slots = list_all_availability()
-
-    return [
-        {
-            "id": slot.id,
-            "doctor_id": slot.doctor_id,
-            "doctor_name": slot.doctor.name if slot.doctor else None,
-            "date": str(slot.date),
-            "start_time": str(slot.start_time),
-            "end_time": str(slot.end_time),
-            "is_booked": slot.is_booked
-        }
-        for slot in slots
-    ]
+    try:
+        query = AvailabilityRangeQuerySchema().load(request.args)
+    except ValidationError as err:
+        logger.warning(f"Validation error: {err.messages}")
+        raise AppException(str(err.messages))
+
+    slots, next_cursor = list_all_availability(**query)
+
+    return {
+        "items": [
+            {
+                "id": slot.id,
+                "doctor_id": slot.doctor_id,
+                "doctor_name": slot.doctor.name if slot.doctor else None,
+                "date": str(slot.date),
+                "start_time": str(slot.start_time),
+                "end_time": str(slot.end_time),
+                "is_booked": slot.is_booked
+            }
+            for slot in slots
+        ],
+        "next_cursor": next_cursor
+    }
 
 
 @availability_bp.route("/<int:availability_id>", methods=["DELETE"])
@@ -0,0 +1,113 @@
+"""
+Bitset representation of a doctor's day.
+
+A day is split into fixed cells (5 minutes by default, 288 per day) and
+stored as Python ints where bit i is cell i. `open` marks cells covered by
+availability slots, `booked` marks cells taken by bookings. Free time,
+utilization and overlaps then become a handful of bitwise operations
+instead of loops over rows and `time` comparisons.
+"""
+from datetime import time
+
+DEFAULT_CELL_MINUTES = 5
+_DAY_MINUTES = 24 * 60
+
+
+def _minutes(t: time) -> int:
+    return t.hour * 60 + t.minute + (1 if t.second or t.microsecond else 0)
+
+
+class DayGrid:
+    """Open and booked cell masks for one doctor-day."""
+
+    __slots__ = ("open", "booked", "cell_minutes")
+
+    def __init__(self, open_mask: int = 0, booked_mask: int = 0, cell_minutes: int = DEFAULT_CELL_MINUTES):
+        self.open = open_mask
+        self.booked = booked_mask
+        self.cell_minutes = cell_minutes
+
+    @classmethod
+    def from_rows(cls, slots, bookings=(), cell_minutes: int = DEFAULT_CELL_MINUTES) -> "DayGrid":
+        """
+        Build a grid from row tuples.
+
+        Args:
+            slots: (start_time, end_time, is_booked) per availability slot
+            bookings: (start_time, end_time) per scheduled appointment
+        """
+        grid = cls(cell_minutes=cell_minutes)
+        for start, end, is_booked in slots:
+            grid.open |= grid.span(start, end, inner=True)
+            if is_booked:
+                grid.booked |= grid.span(start, end)
+        for start, end in bookings:
+            grid.booked |= grid.span(start, end)
+        return grid
+
+    @property
+    def cells(self) -> int:
+        return _DAY_MINUTES // self.cell_minutes
+
+    def span(self, start: time, end: time, inner: bool = False) -> int:
+        """
+        Mask of the cells covering [start, end).
+
+        With inner=True only cells lying entirely inside the interval are
+        set (for open time); otherwise every cell it touches is (for busy time).
+        """
+        cell = self.cell_minutes
+        if inner:
+            first = -(-_minutes(start) // cell)
+            last = _minutes(end) // cell
+        else:
+            first = _minutes(start) // cell
+            last = -(-_minutes(end) // cell)
+        if last <= first:
+            return 0
+        return ((1 << (last - first)) - 1) << first
+
+    @property
+    def free(self) -> int:
+        """Cells that are open and not booked."""
+        return self.open & ~self.booked
+
+    def free_windows(self, minutes: int) -> list[tuple[time, time]]:
+        """Maximal free windows lasting at least `minutes`, in time order."""
+        free = self.free
+        # Bit i of `fits` is set when cells i .. i+length-1 are all free
+        fits, span, length = free, 1, -(-minutes // self.cell_minutes)
+        while span < length:
+            step = min(span, length - span)
+            fits &= fits >> step
+            span += step
+        starts = fits & free & ~(free << 1)
+        windows = []
+        while starts:
+            first = (starts & -starts).bit_length() - 1
+            run = free >> first
+            end = first + ((run + 1) & ~run).bit_length() - 1
+            windows.append((self._time(first), self._time(end)))
+            starts &= starts - 1
+        return windows
+
+    def utilization(self) -> float:
+        """Share of open cells that are booked, from 0.0 to 1.0."""
+        open_cells = self.open.bit_count()
+        if not open_cells:
+            return 0.0
+        return (self.open & self.booked).bit_count() / open_cells
+
+    def overlaps(self, other: "DayGrid") -> bool:
+        """Check whether any open cell of this grid is also open in `other`."""
+        return bool(self.open & other.open)
+
+    def overlap_windows(self, other: "DayGrid") -> list[tuple[time, time]]:
+        """Windows where both grids are open, e.g. two doctors of a joint procedure."""
+        return DayGrid(self.open & other.open, 0, self.cell_minutes).free_windows(self.cell_minutes)
+
+    def _time(self, cell: int) -> time:
+        minutes = cell * self.cell_minutes
+        if minutes >= _DAY_MINUTES:
+            return time(23, 59, 59)
+        return time(minutes // 60, minutes % 60)
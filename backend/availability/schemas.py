@@ -1,4 +1,5 @@
 from marshmallow import Schema, fields, validate
+from backend.common.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 
 
 class AvailabilityCreateSchema(Schema):
@@ -9,6 +10,57 @@ class AvailabilityCreateSchema(Schema):
     end_time = fields.Time(required=True)
 
 
+class AvailabilityTemplateSchema(Schema):
+    """Schema for a recurring availability template."""
+    doctor_id = fields.Int(required=True)
+    start_date = fields.Date(required=True)
+    end_date = fields.Date(required=True)
+    weekdays = fields.List(
+        fields.Int(validate=validate.Range(min=0, max=6)),  # 0 = Monday
+        required=True,
+        validate=validate.Length(min=1)
+    )
+    start_time = fields.Time(required=True)
+    end_time = fields.Time(required=True)
+    slot_minutes = fields.Int(required=True, validate=validate.Range(min=5, max=480))
+    skip_dates = fields.List(fields.Date(), load_default=list)
+
+
+class AvailabilitySlotSchema(Schema):
+    """Schema for one slot of a bulk import."""
+    date = fields.Date(required=True)
+    start_time = fields.Time(required=True)
+    end_time = fields.Time(required=True)
+
+
+class AvailabilityImportSchema(Schema):
+    """Schema for importing many slots for one doctor."""
+    doctor_id = fields.Int(required=True)
+    slots = fields.List(fields.Nested(AvailabilitySlotSchema), required=True, validate=validate.Length(min=1))
+
+
+class AvailabilityRangeQuerySchema(Schema):
+    """Schema for slot listing query parameters. `from` defaults to today."""
+    date_from = fields.Date(load_default=None, data_key="from")
+    date_to = fields.Date(load_default=None, data_key="to")
+    limit = fields.Int(load_default=DEFAULT_PAGE_SIZE, validate=validate.Range(min=1, max=MAX_PAGE_SIZE))
+    cursor = fields.Str(load_default=None)
+
+
+class AvailabilitySearchSchema(Schema):
+    """Schema for open-slot search query parameters."""
+    department_id = fields.Int(required=True)
+    date_from = fields.Date(load_default=None, data_key="from")
+    date_to = fields.Date(load_default=None, data_key="to")
+    limit = fields.Int(load_default=20, validate=validate.Range(min=1, max=100))
+
+
+class AvailabilityFreeWindowsQuerySchema(Schema):
+    """Schema for free-window query parameters. `duration` is in minutes."""
+    date = fields.Date(required=True)
+    duration = fields.Int(load_default=30, validate=validate.Range(min=5, max=24 * 60))
+
+
 class AvailabilityResponseSchema(Schema):
     """Schema for availability response."""
     id = fields.Int()
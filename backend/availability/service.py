@@ -1,42 +1,165 @@
+import heapq
 import logging
-from datetime import date, time
+from itertools import groupby, islice
+from datetime import date, datetime, time, timedelta
 from backend.availability.models import Availability
 from backend.availability.repository import availability_repository
+from backend.availability.cache import availability_cache
+from backend.availability.interval_index import SlotIntervalIndex
+from backend.availability.schedule_grid import DayGrid
+from backend.appointments.repository import appointment_repository
 from backend.doctors.repository import doctor_repository
+from backend.doctors.directory import doctor_directory
+from backend.holds.repository import slot_hold_repository
+from backend.waitlist.service import drop_expired_holds
 from backend.common.exceptions import AppException, ForbiddenError
+from backend.common.locks import doctor_locks
+from backend.common.pagination import DEFAULT_PAGE_SIZE, decode_cursor, paginate
 from backend.common.db import db
 
 logger = logging.getLogger(__name__)
 
+MAX_TEMPLATE_DAYS = 366
+MAX_BULK_SLOTS = 10000
+
 
 def create_availability(doctor_id: int, date: date, start_time: time, end_time: time, 
                         current_user_id: int, current_user_role: str) -> Availability:
     """Create a new availability slot."""
     logger.info(f"Creating availability for doctor {doctor_id}")
 
-    doctor = doctor_repository.find_by_id(doctor_id)
-    if not doctor:
-        raise AppException("Doctor not found")
-
-    # Doctor can only manage their own availability
-    if current_user_role == "DOCTOR":
-        if doctor.user_id != current_user_id:
-            logger.warning(f"Doctor {current_user_id} tried to modify doctor {doctor_id}'s availability")
-            raise ForbiddenError("You can only manage your own availability")
+    _check_can_manage(doctor_id, current_user_id, current_user_role)
 
     if start_time >= end_time:
         raise AppException("Start time must be before end time")
 
-    if availability_repository.check_overlap(doctor_id, date, start_time, end_time):
-        raise AppException("This time slot overlaps with an existing availability")
+    with doctor_locks.lock(doctor_id):
+        if availability_repository.check_overlap(doctor_id, date, start_time, end_time):
+            raise AppException("This time slot overlaps with an existing availability")
 
-    availability = availability_repository.create(doctor_id, date, start_time, end_time)
-    db.session.commit()
+        availability = availability_repository.create(doctor_id, date, start_time, end_time)
+        db.session.commit()
+        availability_cache.invalidate(doctor_id)
     
     logger.info(f"Availability created with id: {availability.id}")
     return availability
 
 
+def create_availability_from_template(doctor_id: int, start_date: date, end_date: date,
+                                     weekdays: list[int], start_time: time, end_time: time,
+                                     slot_minutes: int, skip_dates: list[date],
+                                     current_user_id: int, current_user_role: str) -> dict:
+    """
+    Create slots from a recurring template in one bulk insert.
+
+    Candidate slots are generated lazily and checked against the doctor's
+    existing slots in memory, loaded with a single range query. Candidates
+    that overlap an existing slot are skipped.
+
+    Returns:
+        {"created": <slots inserted>, "skipped": <overlapping candidates>}
+    """
+    logger.info(f"Creating availability template for doctor {doctor_id} from {start_date} to {end_date}")
+
+    _check_can_manage(doctor_id, current_user_id, current_user_role)
+
+    if start_time >= end_time:
+        raise AppException("Start time must be before end time")
+    if start_date > end_date:
+        raise AppException("Start date must not be after end date")
+    if (end_date - start_date).days >= MAX_TEMPLATE_DAYS:
+        raise AppException(f"A template can span at most {MAX_TEMPLATE_DAYS} days")
+
+    candidates = expand_template(start_date, end_date, weekdays, start_time, end_time,
+                                 slot_minutes, set(skip_dates))
+    result = _bulk_create_slots(doctor_id, start_date, end_date, candidates)
+
+    logger.info(f"Template created {result['created']} slots for doctor {doctor_id}, skipped {result['skipped']}")
+    return result
+
+
+def import_availability(doctor_id: int, slots: list[dict],
+                        current_user_id: int, current_user_role: str) -> dict:
+    """
+    Import a batch of explicit slots in one bulk insert.
+
+    Slots are validated against the doctor's existing slots and against
+    each other; overlapping ones are skipped.
+
+    Returns:
+        {"created": <slots inserted>, "skipped": <overlapping slots>}
+    """
+    logger.info(f"Importing {len(slots)} availability slots for doctor {doctor_id}")
+
+    _check_can_manage(doctor_id, current_user_id, current_user_role)
+
+    if any(slot["start_time"] >= slot["end_time"] for slot in slots):
+        raise AppException("Start time must be before end time")
+    if len(slots) > MAX_BULK_SLOTS:
+        raise AppException(f"An import can create at most {MAX_BULK_SLOTS} slots")
+
+    candidates = sorted((slot["date"], slot["start_time"], slot["end_time"]) for slot in slots)
+    result = _bulk_create_slots(doctor_id, candidates[0][0], candidates[-1][0], candidates)
+
+    logger.info(f"Import created {result['created']} slots for doctor {doctor_id}, skipped {result['skipped']}")
+    return result
+
+
+def _bulk_create_slots(doctor_id: int, date_from: date, date_to: date, candidates) -> dict:
+    """Insert every candidate slot that overlaps neither existing slots nor earlier candidates."""
+    with doctor_locks.lock(doctor_id):
+        index = SlotIntervalIndex.load(doctor_id, date_from, date_to)
+
+        new_slots = []
+        skipped = 0
+        for day, start, end in candidates:
+            if not index.try_add(doctor_id, day, start, end):
+                skipped += 1
+                continue
+            new_slots.append((day, start, end))
+            if len(new_slots) > MAX_BULK_SLOTS:
+                raise AppException(f"A single request can create at most {MAX_BULK_SLOTS} slots")
+
+        created = availability_repository.bulk_create(doctor_id, new_slots)
+        db.session.commit()
+        availability_cache.invalidate(doctor_id)
+
+    return {"created": created, "skipped": skipped}
+
+
+def expand_template(start_date: date, end_date: date, weekdays: list[int], start_time: time,
+                    end_time: time, slot_minutes: int, skip_dates: set[date]):
+    """
+    Lazily yield (date, start_time, end_time) for every slot of a recurring template.
+
+    Weekdays follow date.weekday() (0 = Monday). Slots that would run past
+    end_time are not generated.
+    """
+    step = timedelta(minutes=slot_minutes)
+    day = start_date
+    while day <= end_date:
+        if day.weekday() in weekdays and day not in skip_dates:
+            start = datetime.combine(day, start_time)
+            window_end = datetime.combine(day, end_time)
+            while start + step <= window_end:
+                yield day, start.time(), (start + step).time()
+                start += step
+        day += timedelta(days=1)
+
+
+def _check_can_manage(doctor_id: int, current_user_id: int, current_user_role: str) -> None:
+    """Check a doctor exists and the current user may manage their availability."""
+    # Doctor can only manage their own availability, which needs no query
+    if current_user_role == "DOCTOR":
+        if doctor_directory.doctor_id_for_user(current_user_id) != doctor_id:
+            logger.warning(f"Doctor {current_user_id} tried to modify doctor {doctor_id}'s availability")
+            raise ForbiddenError("You can only manage your own availability")
+        return
+
+    if not doctor_repository.find_by_id(doctor_id):
+        raise AppException("Doctor not found")
+
+
 def get_doctor_availability(doctor_id: int) -> list[Availability]:
     """Get all availability slots for a doctor."""
     logger.info(f"Getting availability for doctor {doctor_id}")
@@ -48,51 +171,176 @@ def get_doctor_availability(doctor_id: int) -> list[Availability]:
     return availability_repository.find_by_doctor_id(doctor_id)
 
 
-def get_available_slots(doctor_id: int) -> list[Availability]:
-    """Get available (not booked) slots for a doctor."""
+def get_available_slots(doctor_id: int, date_from: date | None = None, date_to: date | None = None,
+                        limit: int = DEFAULT_PAGE_SIZE, cursor: str | None = None) -> dict:
+    """
+    Get a page of available (not booked) slots for a doctor, from today onwards by default.
+
+    Returns {"items": [...], "next_cursor": ...}. Served from availability_cache
+    when no worker has changed the doctor's slots since the page was cached.
+    """
     logger.info(f"Getting available slots for doctor {doctor_id}")
-    
+
+    date_from = date_from or date.today()
+    after = _decode_slot_cursor(cursor)
+    cached = availability_cache.get(doctor_id, date_from, date_to, limit, cursor)
+    if cached is not None:
+        return cached
+
+    version = availability_cache.version(doctor_id)
     doctor = doctor_repository.find_by_id(doctor_id)
     if not doctor:
         raise AppException("Doctor not found")
     
-    return availability_repository.find_available_by_doctor_id(doctor_id)
+    rows = availability_repository.find_available_by_doctor_id(doctor_id, date_from, date_to, limit + 1, after)
+    slots, next_cursor = paginate(rows, limit, _slot_sort_key)
+    items = [
+        {
+            "id": slot.id,
+            "doctor_id": slot.doctor_id,
+            "date": str(slot.date),
+            "start_time": str(slot.start_time),
+            "end_time": str(slot.end_time),
+            "is_booked": slot.is_booked
+        }
+        for slot in slots
+    ]
+    payload = {"items": items, "next_cursor": next_cursor}
+    availability_cache.set(doctor_id, date_from, date_to, limit, cursor, version, payload)
+    return payload
+
+
+def _slot_sort_key(slot: Availability) -> tuple:
+    return slot.date, slot.start_time, slot.id
+
+
+def _decode_slot_cursor(cursor: str | None) -> tuple | None:
+    if not cursor:
+        return None
+    return decode_cursor(cursor, date.fromisoformat, time.fromisoformat, int)
+
+
+def get_day_grid(doctor_id: int, day: date) -> DayGrid:
+    """Build the bitset grid of a doctor's day from its slots and non-cancelled appointments."""
+    return DayGrid.from_rows(
+        availability_repository.find_day_rows(doctor_id, day),
+        appointment_repository.find_busy_intervals(doctor_id, day)
+    )
+
+
+def get_free_windows(doctor_id: int, day: date, duration: int) -> dict:
+    """
+    Get a doctor's free windows of at least `duration` minutes on a day.
+
+    Adjacent open slots merge into one window, so a 60-minute window can
+    span two free 30-minute slots.
+    """
+    logger.info(f"Getting free windows of {duration} minutes for doctor {doctor_id} on {day}")
+
+    doctor = doctor_repository.find_by_id(doctor_id)
+    if not doctor:
+        raise AppException("Doctor not found")
+
+    grid = get_day_grid(doctor_id, day)
+    return {
+        "doctor_id": doctor_id,
+        "date": str(day),
+        "utilization": round(grid.utilization(), 4),
+        "free_windows": [
+            {"start_time": str(start), "end_time": str(end)}
+            for start, end in grid.free_windows(duration)
+        ]
+    }
+
+
+def search_open_slots(department_id: int, date_from: date | None = None,
+                      date_to: date | None = None, limit: int = 20) -> list[dict]:
+    """
+    Find the earliest open slots across all doctors of a department.
+
+    Each doctor contributes at most `limit` slots from one indexed query;
+    the per-doctor streams are already sorted, so a heap merge yields the
+    global earliest `limit` without sorting everything.
+    """
+    logger.info(f"Searching open slots in department {department_id}")
+
+    today = date.today()
+    date_from = max(date_from or today, today)
+
+    doctors = {d.id: d.name for d in doctor_repository.find_by_department_id(department_id)}
+    rows = availability_repository.find_open_slots_for_doctors(list(doctors), date_from, date_to, limit)
+
+    streams = [list(group) for _, group in groupby(rows, key=lambda row: row.doctor_id)]
+    earliest = heapq.merge(*streams, key=lambda row: (row.date, row.start_time, row.id))
+
+    return [
+        {
+            "id": row.id,
+            "doctor_id": row.doctor_id,
+            "doctor_name": doctors[row.doctor_id],
+            "date": str(row.date),
+            "start_time": str(row.start_time),
+            "end_time": str(row.end_time),
+            "is_booked": False
+        }
+        for row in islice(earliest, limit)
+    ]
 
 
 def delete_availability(availability_id: int, current_user_id: int, current_user_role: str) -> None:
-    """Delete an availability slot."""
+    """Delete an availability slot that is neither booked nor held."""
     logger.info(f"Deleting availability {availability_id}")
 
     availability = availability_repository.find_by_id(availability_id)
     if not availability:
         raise AppException("Availability slot not found")
 
-    if availability.is_booked:
-        raise AppException("Cannot delete a booked slot")
+    with doctor_locks.lock(availability.doctor_id):
+        availability = availability_repository.find_by_id(availability_id)
+        if not availability:
+            raise AppException("Availability slot not found")
 
-    # Doctor can only delete their own availability
-    if current_user_role == "DOCTOR":
-        doctor = doctor_repository.find_by_id(availability.doctor_id)
-        if not doctor or doctor.user_id != current_user_id:
-            logger.warning(f"Doctor {current_user_id} tried to delete another doctor's availability")
-            raise ForbiddenError("You can only delete your own availability")
+        if availability.is_booked:
+            raise AppException("Cannot delete a booked slot")
+
+        # Doctor can only delete their own availability
+        if current_user_role == "DOCTOR":
+            if availability.doctor_id != doctor_directory.doctor_id_for_user(current_user_id):
+                logger.warning(f"Doctor {current_user_id} tried to delete another doctor's availability")
+                raise ForbiddenError("You can only delete your own availability")
 
-    availability_repository.delete(availability)
-    db.session.commit()
+        # Expired holds go with the slot; a live one keeps it
+        if drop_expired_holds(slot_hold_repository.find_for_slots([availability_id]), datetime.utcnow()):
+            raise AppException("Cannot delete a held slot")
+
+        doctor_id = availability.doctor_id
+        availability_repository.delete(availability)
+        db.session.commit()
+        availability_cache.invalidate(doctor_id)
     
     logger.info(f"Availability {availability_id} deleted")
 
 
-def list_all_availability() -> list[Availability]:
-    """List all availability slots (admin only)."""
+def list_all_availability(date_from: date | None = None, date_to: date | None = None,
+                          limit: int = DEFAULT_PAGE_SIZE,
+                          cursor: str | None = None) -> tuple[list[Availability], str | None]:
+    """List a page of availability slots of all doctors (admin only), from today onwards by default."""
     logger.info("Listing all availability slots")
-    return availability_repository.get_all()
+    rows = availability_repository.find_in_range(
+        date_from or date.today(), date_to, limit + 1, _decode_slot_cursor(cursor)
+    )
+    return paginate(rows, limit, _slot_sort_key)
 
 
-def get_my_availability(user_id: int) -> list[Availability]:
-    """Get availability for the logged-in doctor."""
-    doctor = doctor_repository.find_by_user_id(user_id)
-    if not doctor:
+def get_my_availability(user_id: int, date_from: date | None = None, date_to: date | None = None,
+                        limit: int = DEFAULT_PAGE_SIZE,
+                        cursor: str | None = None) -> tuple[list[Availability], str | None]:
+    """Get a page of availability for the logged-in doctor, from today onwards by default."""
+    doctor_id = doctor_directory.doctor_id_for_user(user_id)
+    if doctor_id is None:
         raise AppException("No doctor profile linked to your account")
     
-    return availability_repository.find_by_doctor_id(doctor.id)
+    rows = availability_repository.find_by_doctor_id(
+        doctor_id, date_from or date.today(), date_to, limit + 1, _decode_slot_cursor(cursor)
+    )
+    return paginate(rows, limit, _slot_sort_key)
@@ -9,3 +9,13 @@ class UnauthorizedError(AppException):
 
 class ForbiddenError(AppException):
     status_code = 403
+
+class ServiceUnavailableError(AppException):
+    status_code = 503
+
+class TooManyRequestsError(AppException):
+    status_code = 429
+
+    def __init__(self, message, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
@@ -0,0 +1,205 @@
+"""
+Application-level per-doctor locks.
+
+SQLite ignores SELECT ... FOR UPDATE, so on backends without row locks the
+booking paths serialize on a doctor lock instead. Doctor ids are striped
+over a fixed number of in-process locks, each paired with a file lock so
+several worker processes on the same host are covered as well.
+"""
+import logging
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+from backend.common.db import db
+from backend.common.metrics import register_metrics
+
+logger = logging.getLogger(__name__)
+
+SLOW_WAIT_SECONDS = 0.5
+
+
+class LockMetrics:
+    """Thread-safe lock wait-time counters."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Reset all counters."""
+        with self._lock:
+            self.acquisitions = 0
+            self.contended = 0
+            self.total_wait = 0.0
+            self.max_wait = 0.0
+
+    def record(self, waited: float, contended: bool) -> None:
+        """Record one acquisition and how long it waited."""
+        with self._lock:
+            self.acquisitions += 1
+            self.contended += int(contended)
+            self.total_wait += waited
+            self.max_wait = max(self.max_wait, waited)
+
+    def snapshot(self) -> dict:
+        """Return the counters as a dict (wait times in milliseconds)."""
+        with self._lock:
+            avg = self.total_wait / self.acquisitions if self.acquisitions else 0.0
+            return {
+                "acquisitions": self.acquisitions,
+                "contended": self.contended,
+                "avg_wait_ms": round(avg * 1000, 3),
+                "max_wait_ms": round(self.max_wait * 1000, 3),
+                "total_wait_ms": round(self.total_wait * 1000, 3),
+            }
+
+
+class NullLockManager:
+    """Lock manager for backends with real row locks: locking is a no-op."""
+
+    enabled = False
+
+    def __init__(self):
+        self.metrics = LockMetrics()
+
+    @contextmanager
+    def lock(self, *doctor_ids: int):
+        yield
+
+
+class StripedLockManager:
+    """Per-doctor locks striped over in-process locks and file locks."""
+
+    enabled = True
+
+    def __init__(self, stripes: int = 64, lock_dir: str | None = None):
+        self.stripes = stripes
+        self.lock_dir = lock_dir
+        self.metrics = LockMetrics()
+        self._locks = [threading.Lock() for _ in range(stripes)]
+        self._held = threading.local()
+        if lock_dir and fcntl is not None:
+            os.makedirs(lock_dir, exist_ok=True)
+
+    def stripe_for(self, doctor_id: int) -> int:
+        """Map a doctor id to its stripe."""
+        return doctor_id % self.stripes
+
+    @contextmanager
+    def lock(self, *doctor_ids: int):
+        """Hold the stripes of all given doctors. Stripes are taken in ascending order."""
+        held = self._held_stripes()
+        stripes = sorted({self.stripe_for(d) for d in doctor_ids} - held)
+
+        started = time.perf_counter()
+        contended = False
+        acquired = []
+        try:
+            for stripe in stripes:
+                stripe_lock = self._locks[stripe]
+                if not stripe_lock.acquire(blocking=False):
+                    contended = True
+                    stripe_lock.acquire()
+                try:
+                    fd = self._acquire_file_lock(stripe)
+                except Exception:
+                    stripe_lock.release()
+                    raise
+                acquired.append((stripe, fd))
+                held.add(stripe)
+
+            waited = time.perf_counter() - started
+            if stripes:
+                self.metrics.record(waited, contended)
+            if waited > SLOW_WAIT_SECONDS:
+                logger.warning(f"Waited {waited * 1000:.1f} ms for doctor lock stripes {stripes}")
+            yield
+        finally:
+            for stripe, fd in reversed(acquired):
+                self._release_file_lock(fd)
+                held.discard(stripe)
+                self._locks[stripe].release()
+
+    def _held_stripes(self) -> set[int]:
+        if not hasattr(self._held, "stripes"):
+            self._held.stripes = set()
+        return self._held.stripes
+
+    def _acquire_file_lock(self, stripe: int) -> int | None:
+        if not self.lock_dir or fcntl is None:
+            return None
+        path = os.path.join(self.lock_dir, f"doctor-stripe-{stripe}.lock")
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        except OSError:
+            os.close(fd)
+            raise
+        return fd
+
+    @staticmethod
+    def _release_file_lock(fd: int | None) -> None:
+        if fd is None:
+            return
+        try:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        finally:
+            os.close(fd)
+
+
+class DoctorLocks:
+    """Pluggable per-doctor lock manager, configured from the app config."""
+
+    def __init__(self):
+        self.manager = NullLockManager()
+
+    def init_app(self, app) -> None:
+        """Pick a lock manager based on DOCTOR_LOCK_MANAGER and the database backend."""
+        mode = app.config.get("DOCTOR_LOCK_MANAGER", "auto")
+        if mode == "auto":
+            uri = app.config.get("SQLALCHEMY_DATABASE_URI") or ""
+            mode = "striped" if uri.startswith("sqlite") else "none"
+
+        if mode == "striped":
+            lock_dir = app.config.get("DOCTOR_LOCK_DIR") or os.path.join(
+                tempfile.gettempdir(), "healthcare-doctor-locks"
+            )
+            self.manager = StripedLockManager(
+                stripes=app.config.get("DOCTOR_LOCK_STRIPES", 64),
+                lock_dir=lock_dir
+            )
+        elif mode == "none":
+            self.manager = NullLockManager()
+        else:
+            raise ValueError(f"Unknown doctor lock manager: {mode}")
+
+        register_metrics("doctor_locks", self.stats)
+        logger.info(f"Doctor lock manager: {type(self.manager).__name__}")
+
+    @property
+    def enabled(self) -> bool:
+        return self.manager.enabled
+
+    @contextmanager
+    def lock(self, *doctor_ids: int):
+        """Hold the locks for the given doctors for the rest of the unit of work."""
+        with self.manager.lock(*doctor_ids):
+            if self.manager.enabled:
+                # Rows read before the lock was taken may be stale
+                db.session.expire_all()
+            yield
+
+    def stats(self) -> dict:
+        """Return lock wait-time metrics."""
+        return {"manager": type(self.manager).__name__, **self.manager.metrics.snapshot()}
+
+
+doctor_locks = DoctorLocks()
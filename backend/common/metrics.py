@@ -0,0 +1,18 @@
+"""Lightweight in-process metrics registry."""
+
+import logging
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+_sources: dict[str, Callable[[], dict]] = {}
+
+
+def register_metrics(name: str, source: Callable[[], dict]) -> None:
+    """Register a callable returning a snapshot dict under the given name."""
+    _sources[name] = source
+
+
+def collect_metrics() -> dict:
+    """Collect snapshots from all registered metric sources."""
+    return {name: source() for name, source in _sources.items()}
@@ -0,0 +1,94 @@
+"""
+Versioned schema migrations.
+
+`db.create_all()` only creates missing tables; it never touches tables that
+already exist. Migrations bring existing databases up to date (indexes,
+new columns) and record each applied version in `schema_migrations`.
+"""
+import logging
+from datetime import datetime
+
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import IntegrityError
+
+from backend.common.db import db
+
+logger = logging.getLogger(__name__)
+
+
+class SchemaMigration(db.Model):
+    """Applied schema migration versions."""
+    __tablename__ = "schema_migrations"
+
+    version = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    name = db.Column(db.String(100), nullable=False)
+    applied_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+def create_index(connection, name: str, table: str, columns: list[str]) -> bool:
+    """Create an index unless it already exists. Returns True if it was created."""
+    existing = {index["name"] for index in inspect(connection).get_indexes(table)}
+    if name in existing:
+        return False
+    connection.execute(text(f"CREATE INDEX {name} ON {table} ({', '.join(columns)})"))
+    logger.info(f"Created index {name} on {table}({', '.join(columns)})")
+    return True
+
+
+def add_column(connection, table: str, name: str, definition: str) -> bool:
+    """Add a column unless it already exists. Returns True if it was added."""
+    existing = {column["name"] for column in inspect(connection).get_columns(table)}
+    if name in existing:
+        return False
+    connection.execute(text(f"ALTER TABLE {table} ADD COLUMN {name} {definition}"))
+    logger.info(f"Added column {table}.{name}")
+    return True
+
+
+def applied_versions() -> set[int]:
+    """Get the versions already recorded in schema_migrations."""
+    return {version for (version,) in db.session.query(SchemaMigration.version)}
+
+
+def run_migrations(migrations: list | None = None) -> list[int]:
+    """
+    Apply pending migrations in version order.
+
+    Args:
+        migrations: Migration modules exposing VERSION, NAME and upgrade(connection).
+                    Defaults to backend.migrations.MIGRATIONS.
+
+    Returns:
+        Versions applied by this call
+    """
+    if migrations is None:
+        from backend.migrations import MIGRATIONS
+        migrations = MIGRATIONS
+
+    SchemaMigration.__table__.create(db.engine, checkfirst=True)
+    done = applied_versions()
+    db.session.remove()
+
+    applied = []
+    for migration in sorted(migrations, key=lambda m: m.VERSION):
+        if migration.VERSION in done:
+            continue
+
+        logger.info(f"Applying migration {migration.VERSION}: {migration.NAME}")
+        try:
+            with db.engine.begin() as connection:
+                migration.upgrade(connection)
+                connection.execute(
+                    SchemaMigration.__table__.insert().values(
+                        version=migration.VERSION,
+                        name=migration.NAME,
+                        applied_at=datetime.utcnow()
+                    )
+                )
+        except IntegrityError:
+            # Another worker applied the same version concurrently
+            logger.info(f"Migration {migration.VERSION} already applied by another process")
+            continue
+        applied.append(migration.VERSION)
+
+    return applied
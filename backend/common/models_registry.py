@@ -1,17 +1,22 @@
 """Model Registry - Import all models for SQLAlchemy."""
 
-from backend.auth.models import User
+from backend.auth.models import User, ClaimsVersionChange
 from backend.departments.models import Department
 from backend.doctors.models import Doctor
 from backend.availability.models import Availability
 from backend.appointments.models import Appointment
 from backend.reimbursements.models import Reimbursement
+from backend.holds.models import SlotHold
+from backend.waitlist.models import WaitlistEntry
 
 ALL_MODELS = [
     User,
+    ClaimsVersionChange,
     Department,
     Doctor,
     Availability,
     Appointment,
     Reimbursement,
+    SlotHold,
+    WaitlistEntry,
 ]
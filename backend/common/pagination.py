@@ -0,0 +1,62 @@
+"""Keyset (cursor) pagination helpers."""
+
+import base64
+import binascii
+import json
+
+from sqlalchemy import and_, or_
+
+from backend.common.exceptions import AppException
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def encode_cursor(*values) -> str:
+    """Encode the sort key of the last row on a page into an opaque cursor."""
+    raw = json.dumps([str(v) for v in values]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, *parsers) -> tuple:
+    """Decode a cursor, converting each value with the matching parser."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded))
+        if len(values) != len(parsers):
+            raise ValueError("cursor length mismatch")
+        return tuple(parse(value) for parse, value in zip(parsers, values))
+    except (ValueError, TypeError, binascii.Error):
+        raise AppException("Invalid cursor")
+
+
+def keyset_after(columns: list, values: tuple):
+    """
+    Build a filter selecting rows strictly after `values` in `columns` order.
+
+    Expands to (a > x) OR (a = x AND b > y) OR ... which every backend can
+    answer with a range scan on a matching composite index.
+    """
+    clauses = []
+    for i, column in enumerate(columns):
+        equal = [columns[j] == values[j] for j in range(i)]
+        clauses.append(and_(*equal, column > values[i]))
+    return or_(*clauses)
+
+
+def paginate(rows: list, limit: int, key) -> tuple[list, str | None]:
+    """
+    Split a `limit + 1` row fetch into a page and the cursor of the next page.
+
+    Args:
+        rows: Rows fetched with LIMIT limit + 1
+        limit: Page size
+        key: Callable returning the sort key tuple of a row
+
+    Returns:
+        (page rows, next cursor or None when this is the last page)
+    """
+    if len(rows) <= limit:
+        return rows, None
+    page = rows[:limit]
+    return page, encode_cursor(*key(page[-1]))
@@ -1,7 +1,219 @@
+"""
+Password hashing off the request thread.
+
+Hashing and verification are CPU-bound by design (scrypt/PBKDF2). They
+run in a bounded process pool, so a login burst does not hold worker
+threads or the GIL needed by other endpoints. When more calls are
+pending than PASSWORD_HASH_MAX_PENDING, new ones are rejected with 503
+instead of queueing without limit. A pool whose worker died is replaced
+on the next call, after answering 503. PASSWORD_HASH_WORKERS = 0 hashes
+inline. Bulk jobs hash in a pool of their own (PASSWORD_HASH_BULK_WORKERS),
+so they never queue in front of logins.
+"""
+import logging
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
 from werkzeug.security import generate_password_hash, check_password_hash
 
+from backend.common.exceptions import ServiceUnavailableError
+from backend.common.metrics import register_metrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_METHOD = "scrypt"
+
+
+class PasswordHasher:
+    """Process-pool password hashing with backpressure and timing counters."""
+
+    def __init__(self):
+        self.method = DEFAULT_METHOD
+        self.workers = 0
+        self.bulk_workers = 0
+        self.max_pending = 0
+        self.timeout = None
+        self._executor = None
+        self._bulk_executor = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._rejected = 0
+        self._timings = {}
+        self._prefixes = {}
+
+    def init_app(self, app) -> None:
+        """Configure the hash method and pool size from the app config."""
+        self.method = app.config.get("PASSWORD_HASH_METHOD", DEFAULT_METHOD)
+        workers = app.config.get("PASSWORD_HASH_WORKERS", 0)
+        self.max_pending = app.config.get("PASSWORD_HASH_MAX_PENDING", 0) or workers * 8
+        self.timeout = app.config.get("PASSWORD_HASH_TIMEOUT_SECONDS", 10)
+
+        bulk_workers = app.config.get("PASSWORD_HASH_BULK_WORKERS", 0)
+
+        # The pools belong to the process, not the app: keep them while their sizes fit
+        if (workers, bulk_workers) != (self.workers, self.bulk_workers):
+            self.shutdown()
+            self.workers = workers
+            self.bulk_workers = bulk_workers
+        with self._lock:
+            self._rejected = 0
+            self._timings = {}
+        register_metrics("password_hashing", self.stats)
+
+    def hash(self, password: str) -> str:
+        """Hash a password with the configured method."""
+        return self._call("hash", generate_password_hash, password, self.method)
+
+    def hash_many(self, passwords: list[str]) -> list[str]:
+        """
+        Hash a batch of passwords across the bulk workers, in order.
+
+        Meant for bulk jobs. The batch is split into one chunk per worker of
+        the bulk pool, which is separate from the pool serving requests, so
+        a large import leaves logins within their pending limit and timeout.
+        """
+        started = time.perf_counter()
+        try:
+            if not self.bulk_workers:
+                return [generate_password_hash(password, self.method) for password in passwords]
+            with self._lock:
+                if self._bulk_executor is None:
+                    self._bulk_executor = ProcessPoolExecutor(
+                        max_workers=self.bulk_workers, mp_context=multiprocessing.get_context("spawn")
+                    )
+                executor = self._bulk_executor
+            chunksize = max(1, -(-len(passwords) // self.bulk_workers))
+            try:
+                return list(executor.map(
+                    generate_password_hash, passwords, [self.method] * len(passwords), chunksize=chunksize
+                ))
+            except BrokenProcessPool:
+                self._discard("_bulk_executor", executor)
+                raise ServiceUnavailableError("Server is busy, please retry shortly")
+        finally:
+            self._record("hash_many", time.perf_counter() - started)
+
+    def verify(self, password: str, hashed: str) -> bool:
+        """Check a password against a stored hash."""
+        return self._call("verify", check_password_hash, hashed, password)
+
+    def needs_rehash(self, hashed: str) -> bool:
+        """Check whether a stored hash was made with other parameters than the configured ones."""
+        return hashed.split("$", 1)[0] != self._prefix(self.method)
+
+    def shutdown(self) -> None:
+        """Stop the worker processes."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        if self._bulk_executor is not None:
+            self._bulk_executor.shutdown(wait=False, cancel_futures=True)
+            self._bulk_executor = None
+
+    def stats(self) -> dict:
+        """Return pool state and per-operation call counts and timings."""
+        with self._lock:
+            return {
+                "method": self.method,
+                "workers": self.workers,
+                "bulk_workers": self.bulk_workers,
+                "pending": self._pending,
+                "max_pending": self.max_pending,
+                "rejected": self._rejected,
+                **{
+                    operation: {
+                        "calls": calls,
+                        "avg_ms": round(total / calls * 1000, 2),
+                        "max_ms": round(longest * 1000, 2),
+                    }
+                    for operation, (calls, total, longest) in self._timings.items()
+                },
+            }
+
+    def _call(self, operation: str, func, *args):
+        if not self.workers:
+            started = time.perf_counter()
+            try:
+                return func(*args)
+            finally:
+                self._record(operation, time.perf_counter() - started)
+
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._rejected += 1
+                logger.warning(f"Password {operation} rejected: {self._pending} calls pending")
+                raise ServiceUnavailableError("Server is busy, please retry shortly")
+            self._pending += 1
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            executor = self._executor
+
+        started = time.perf_counter()
+        try:
+            future = executor.submit(func, *args)
+        except BrokenProcessPool:
+            self._done(None)
+            self._discard("_executor", executor)
+            raise ServiceUnavailableError("Server is busy, please retry shortly")
+        except Exception:
+            self._done(None)
+            raise
+        # A call stays pending until its worker is done with it, even after we gave up waiting
+        future.add_done_callback(self._done)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            logger.error(f"Password {operation} timed out after {self.timeout}s")
+            raise ServiceUnavailableError("Server is busy, please retry shortly")
+        except BrokenProcessPool:
+            self._discard("_executor", executor)
+            raise ServiceUnavailableError("Server is busy, please retry shortly")
+        finally:
+            self._record(operation, time.perf_counter() - started)
+
+    def _discard(self, attribute: str, executor) -> None:
+        """Drop a pool whose worker died, so the next call starts a new one."""
+        with self._lock:
+            if getattr(self, attribute) is not executor:
+                return
+            setattr(self, attribute, None)
+        logger.error("A password hashing worker died, replacing the pool")
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _done(self, future) -> None:
+        with self._lock:
+            self._pending -= 1
+
+    def _record(self, operation: str, elapsed: float) -> None:
+        with self._lock:
+            calls, total, longest = self._timings.get(operation, (0, 0.0, 0.0))
+            self._timings[operation] = (calls + 1, total + elapsed, max(longest, elapsed))
+
+    def _prefix(self, method: str) -> str:
+        """Parameter prefix werkzeug writes for a method, e.g. "scrypt:32768:8:1"."""
+        prefix = self._prefixes.get(method)
+        if prefix is None:
+            prefix = generate_password_hash("", method).split("$", 1)[0]
+            self._prefixes[method] = prefix
+        return prefix
+
+
+password_hasher = PasswordHasher()
+
+
 def hash_password(password: str) -> str:
-    return generate_password_hash(password)
+    return password_hasher.hash(password)
+
 
 def verify_password(password: str, hashed: str) -> bool:
-    return check_password_hash(hashed, password)
+    return password_hasher.verify(password, hashed)
+
+
+def needs_rehash(hashed: str) -> bool:
+    return password_hasher.needs_rehash(hashed)
@@ -0,0 +1,181 @@
+"""
+Token-bucket throttling for expensive endpoints (login, registration).
+
+Each rule is a bucket of `burst` tokens per key (client IP, email),
+refilled at `per_minute` tokens a minute; every attempt takes one token.
+Buckets live in a small SQLite file shared by all workers on the host, so
+a limit holds however requests are spread over workers. Taking a token is
+one short write transaction, far cheaper than the password hash it guards.
+
+A rejected key is remembered in process memory until its next token is
+due, so a burst against one key is turned away without touching the file.
+If the file stays locked past STORE_TIMEOUT_SECONDS the attempt is
+rejected with a short Retry-After rather than let through unthrottled.
+A file found corrupt (e.g. after a crash) is deleted and recreated empty,
+so it cannot keep rejecting every attempt.
+"""
+import logging
+import math
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from backend.common.cache import LRUCache
+from backend.common.exceptions import TooManyRequestsError
+from backend.common.metrics import register_metrics
+
+logger = logging.getLogger(__name__)
+
+# Rows of full buckets are pruned every this many checks per worker
+PRUNE_EVERY = 1000
+# How long to wait for the bucket file's write lock, and the Retry-After when it stays busy
+STORE_TIMEOUT_SECONDS = 1
+STORE_BUSY_RETRY_AFTER = 1
+
+
+class Throttle:
+    """Token buckets shared through a SQLite file, with an in-process reject cache."""
+
+    def __init__(self):
+        self.enabled = False
+        self.path = None
+        self.rules = {}
+        self.blocked = LRUCache(0)
+        self.allowed = 0
+        self.rejected = 0
+        self.rejected_locally = 0
+        self._local = threading.local()
+        self._checks = 0
+        self._generation = 0
+        self._store_lock = threading.Lock()
+
+    def init_app(self, app) -> None:
+        """Read the rules and attach the shared bucket file from the app config."""
+        self.enabled = app.config.get("THROTTLE_ENABLED", True)
+        self.path = app.config.get("THROTTLE_STORE_FILE") or os.path.join(
+            tempfile.gettempdir(), "healthcare-throttle.db"
+        )
+        self.rules = {
+            "login_ip": (app.config.get("LOGIN_IP_PER_MINUTE", 30), app.config.get("LOGIN_IP_BURST", 30)),
+            "login_email": (app.config.get("LOGIN_EMAIL_PER_MINUTE", 5), app.config.get("LOGIN_EMAIL_BURST", 10)),
+            "register_ip": (app.config.get("REGISTER_IP_PER_MINUTE", 5), app.config.get("REGISTER_IP_BURST", 10)),
+        }
+        self.blocked = LRUCache(app.config.get("THROTTLE_CACHE_SIZE", 10000))
+        self.allowed = self.rejected = self.rejected_locally = 0
+        self._local = threading.local()
+        register_metrics("throttle", self.stats)
+
+    def check(self, rule: str, key: str) -> None:
+        """Take a token from the rule's bucket for `key`, or raise TooManyRequestsError."""
+        if not self.enabled:
+            return
+        per_minute, burst = self.rules[rule]
+        bucket = f"{rule}:{key}"
+        now = time.time()
+
+        blocked_until = self.blocked.get(bucket)
+        if blocked_until is not None and now < blocked_until:
+            self.rejected_locally += 1
+            self._reject(rule, blocked_until - now)
+
+        try:
+            wait = self._take_recovering(bucket, per_minute / 60, burst, now)
+        except sqlite3.Error as e:
+            # Fail closed: a store too busy to answer means an attack is under way
+            logger.warning(f"Throttle store unavailable, rejecting {rule} for {key}: {str(e)}")
+            self._reject(rule, STORE_BUSY_RETRY_AFTER)
+        if wait:
+            self.blocked.set(bucket, now + wait)
+            logger.warning(f"Throttled {rule} for {key}")
+            self._reject(rule, wait)
+        self.allowed += 1
+
+    def stats(self) -> dict:
+        """Return allowed and rejected attempts, and rejections served from memory."""
+        return {
+            "allowed": self.allowed,
+            "rejected": self.rejected,
+            "rejected_locally": self.rejected_locally,
+        }
+
+    def _reject(self, rule: str, wait: float):
+        self.rejected += 1
+        raise TooManyRequestsError("Too many attempts, please retry later", math.ceil(wait))
+
+    def _take_recovering(self, bucket: str, rate: float, burst: int, now: float) -> float:
+        """`_take`, recreating the bucket file once if it is corrupt. A busy file is not touched."""
+        try:
+            return self._take(bucket, rate, burst, now)
+        except sqlite3.OperationalError:
+            raise
+        except sqlite3.DatabaseError as e:
+            logger.error(f"Throttle store {self.path} is corrupt, recreating it: {str(e)}")
+            self._recreate()
+            return self._take(bucket, rate, burst, now)
+
+    def _recreate(self) -> None:
+        """Delete the bucket file; every thread reconnects to a new empty one."""
+        with self._store_lock:
+            self._generation += 1
+            for suffix in ("", "-wal", "-shm"):
+                try:
+                    os.remove(self.path + suffix)
+                except FileNotFoundError:
+                    pass
+
+    def _take(self, bucket: str, rate: float, burst: int, now: float) -> float:
+        """Take one token. Returns 0 on success, else the seconds until a token is due."""
+        connection = self._connection()
+        try:
+            # IMMEDIATE takes the write lock up front, so concurrent workers serialise
+            connection.execute("BEGIN IMMEDIATE")
+            row = connection.execute(
+                "SELECT tokens, updated_at FROM buckets WHERE key = ?", (bucket,)
+            ).fetchone()
+            tokens = burst if row is None else min(burst, row[0] + (now - row[1]) * rate)
+            if tokens < 1:
+                connection.execute("ROLLBACK")
+                return (1 - tokens) / rate
+            connection.execute(
+                "INSERT INTO buckets (key, tokens, updated_at, full_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET tokens = excluded.tokens, "
+                "updated_at = excluded.updated_at, full_at = excluded.full_at",
+                (bucket, tokens - 1, now, now + (burst - tokens + 1) / rate)
+            )
+            self._checks += 1
+            if self._checks % PRUNE_EVERY == 0:
+                connection.execute("DELETE FROM buckets WHERE full_at < ?", (now,))
+            connection.execute("COMMIT")
+        except Exception:
+            if connection.in_transaction:
+                connection.execute("ROLLBACK")
+            raise
+        return 0
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is not None and self._local.generation != self._generation:
+            connection.close()
+            connection = None
+        if connection is None:
+            generation = self._generation
+            connection = sqlite3.connect(self.path, timeout=STORE_TIMEOUT_SECONDS, isolation_level=None)
+            try:
+                connection.execute("PRAGMA journal_mode = WAL")
+                # NORMAL is crash-safe in WAL mode, unlike OFF
+                connection.execute("PRAGMA synchronous = NORMAL")
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS buckets ("
+                    "key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL, full_at REAL NOT NULL)"
+                )
+            except sqlite3.Error:
+                connection.close()
+                raise
+            self._local.connection = connection
+            self._local.generation = generation
+        return connection
+
+
+throttle = Throttle()
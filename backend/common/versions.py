@@ -0,0 +1,114 @@
+"""
+Cross-process version counters.
+
+A VersionBoard is a small memory-mapped file of 64-bit counters. Writers
+bump the counter of a key after committing a change; readers compare the
+counter they saw when they cached something with the current one. Every
+worker process on the host maps the same file, so a bump in one worker is
+visible to all the others on their next read, without a round trip.
+
+Keys are striped over a fixed number of counters. Two keys sharing a
+counter only cause extra invalidations, never stale reads.
+
+The file starts with a random `epoch`, drawn when the file is created.
+Counters restart at 0 when the file is lost (reboot, tmp cleaner), so
+anything handed to clients, such as an ETag, must include the epoch.
+"""
+import hashlib
+import mmap
+import os
+import secrets
+import tempfile
+import struct
+import threading
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+_COUNTER = struct.Struct("<Q")
+
+
+class VersionBoard:
+    """Striped 64-bit version counters, optionally shared through a file."""
+
+    def __init__(self, path: str | None = None, stripes: int = 4096):
+        self.path = path
+        self.stripes = stripes
+        self._lock = threading.Lock()
+        self._fd = None
+        # One header counter holding the epoch, then the stripes
+        size = (stripes + 1) * _COUNTER.size
+
+        if path:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+            self._flock(True)
+            try:
+                if os.fstat(self._fd).st_size < size:
+                    os.ftruncate(self._fd, size)
+                self._buffer = mmap.mmap(self._fd, size)
+                if not _COUNTER.unpack_from(self._buffer, 0)[0]:
+                    _COUNTER.pack_into(self._buffer, 0, _new_epoch())
+            finally:
+                self._flock(False)
+        else:
+            self._buffer = bytearray(size)
+            _COUNTER.pack_into(self._buffer, 0, _new_epoch())
+
+    @property
+    def epoch(self) -> int:
+        """Random id of this file's lifetime; changes whenever the counters restart."""
+        return _COUNTER.unpack_from(self._buffer, 0)[0]
+
+    def _offset(self, key: int) -> int:
+        return (key % self.stripes + 1) * _COUNTER.size
+
+    def _flock(self, exclusive: bool) -> None:
+        """Take (or release) the lock on the shared file, serialising workers."""
+        if self._fd is not None and fcntl is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_UN)
+
+    def get(self, key: int) -> int:
+        """Read the current version of a key."""
+        return _COUNTER.unpack_from(self._buffer, self._offset(key))[0]
+
+    def bump(self, key: int) -> int:
+        """Increment the version of a key and return the new value."""
+        offset = self._offset(key)
+        with self._lock:
+            self._flock(True)
+            try:
+                version = _COUNTER.unpack_from(self._buffer, offset)[0] + 1
+                _COUNTER.pack_into(self._buffer, offset, version)
+            finally:
+                self._flock(False)
+        return version
+
+    def close(self) -> None:
+        """Release the mapping and file descriptor."""
+        if self._fd is not None:
+            self._buffer.close()
+            os.close(self._fd)
+            self._fd = None
+
+
+def default_board_path(app, name: str) -> str | None:
+    """
+    Default path of a version file, derived from the app's database URI.
+
+    Apps on different databases get different files, so their counters
+    never mix. In-memory SQLite is private to one process: None, for a
+    board without a file.
+    """
+    uri = app.config.get("SQLALCHEMY_DATABASE_URI") or ""
+    if uri.startswith("sqlite") and (":memory:" in uri or uri.rstrip("/") == "sqlite:"):
+        return None
+    digest = hashlib.sha256(uri.encode()).hexdigest()[:16]
+    return os.path.join(tempfile.gettempdir(), f"healthcare-{name}-{digest}.bin")
+
+
+def _new_epoch() -> int:
+    # Never 0, which marks a header not written yet
+    return secrets.randbits(63) + 1
@@ -14,4 +14,70 @@ class Config:
     
     # Token expiry settings
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(minutes=15)
-    JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=7)
\ No newline at end of file
+    JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=7)
+
+    # Booking strategy: "row_lock" (SELECT ... FOR UPDATE) or
+    # "conditional_update" (single atomic UPDATE ... WHERE is_booked = 0)
+    BOOKING_STRATEGY = os.environ.get("BOOKING_STRATEGY", "row_lock")
+
+    # Per-doctor application locks: "auto" enables them on SQLite, which has no row locks
+    DOCTOR_LOCK_MANAGER = os.environ.get("DOCTOR_LOCK_MANAGER", "auto")
+    DOCTOR_LOCK_STRIPES = int(os.environ.get("DOCTOR_LOCK_STRIPES", "64"))
+    DOCTOR_LOCK_DIR = os.environ.get("DOCTOR_LOCK_DIR")
+
+    # Per-doctor open-slot read cache (0 disables) and the version file shared by workers.
+    # Version files default to a per-database path in the temp dir (see default_board_path)
+    AVAILABILITY_CACHE_SIZE = int(os.environ.get("AVAILABILITY_CACHE_SIZE", "1024"))
+    AVAILABILITY_CACHE_VERSION_FILE = os.environ.get("AVAILABILITY_CACHE_VERSION_FILE")
+
+    # Completion sweeper: background interval (0 disables; use the CLI command),
+    # rows per UPDATE and pause between batches to keep lock time short
+    APPOINTMENT_SWEEP_INTERVAL_SECONDS = int(os.environ.get("APPOINTMENT_SWEEP_INTERVAL_SECONDS", "0"))
+    APPOINTMENT_SWEEP_BATCH_SIZE = int(os.environ.get("APPOINTMENT_SWEEP_BATCH_SIZE", "500"))
+    APPOINTMENT_SWEEP_PAUSE_MS = int(os.environ.get("APPOINTMENT_SWEEP_PAUSE_MS", "0"))
+
+    # Waitlist offers: how long a freed slot is held for the offered member,
+    # and the version file that keeps per-worker waitlist queues in sync
+    WAITLIST_HOLD_TTL_SECONDS = int(os.environ.get("WAITLIST_HOLD_TTL_SECONDS", "900"))
+    WAITLIST_VERSION_FILE = os.environ.get("WAITLIST_VERSION_FILE")
+
+    # Booking holds (POST /holds): how long a slot stays reserved while the member
+    # confirms, and how many unexpired holds one member may have at a time
+    BOOKING_HOLD_TTL_SECONDS = int(os.environ.get("BOOKING_HOLD_TTL_SECONDS", "120"))
+    MAX_ACTIVE_HOLDS = int(os.environ.get("MAX_ACTIVE_HOLDS", "3"))
+
+    # Cached user -> doctor profile links (links are never changed once made)
+    DOCTOR_DIRECTORY_SIZE = int(os.environ.get("DOCTOR_DIRECTORY_SIZE", "4096"))
+
+    # Token claims versions (logout, role changes): the version file that signals changes
+    # to workers on this host, and how often the change feed is read for other hosts
+    CLAIMS_VERSION_FILE = os.environ.get("CLAIMS_VERSION_FILE")
+    CLAIMS_VERSION_POLL_SECONDS = float(os.environ.get("CLAIMS_VERSION_POLL_SECONDS", "1"))
+    # Feed rows are re-read for this long, to catch rows committed out of id order
+    CLAIMS_VERSION_FEED_MARGIN_SECONDS = int(os.environ.get("CLAIMS_VERSION_FEED_MARGIN_SECONDS", "60"))
+
+    # Password hashing: werkzeug method string (e.g. "scrypt", "pbkdf2:sha256:600000"),
+    # process pool size (0 hashes inline), pending calls before 503 (0 = 8 per worker)
+    PASSWORD_HASH_METHOD = os.environ.get("PASSWORD_HASH_METHOD", "scrypt")
+    PASSWORD_HASH_WORKERS = int(os.environ.get("PASSWORD_HASH_WORKERS", "2"))
+    PASSWORD_HASH_MAX_PENDING = int(os.environ.get("PASSWORD_HASH_MAX_PENDING", "0"))
+    PASSWORD_HASH_TIMEOUT_SECONDS = float(os.environ.get("PASSWORD_HASH_TIMEOUT_SECONDS", "10"))
+    # Separate pool for bulk jobs such as user imports (0 hashes them inline)
+    PASSWORD_HASH_BULK_WORKERS = int(os.environ.get("PASSWORD_HASH_BULK_WORKERS", "2"))
+
+    # Login/registration throttling: token buckets (tokens refilled per minute, bucket size)
+    # per client IP and per email, shared by the workers on this host through a SQLite file
+    THROTTLE_ENABLED = os.environ.get("THROTTLE_ENABLED", "true").lower() == "true"
+    THROTTLE_STORE_FILE = os.environ.get("THROTTLE_STORE_FILE")
+    LOGIN_IP_PER_MINUTE = int(os.environ.get("LOGIN_IP_PER_MINUTE", "30"))
+    LOGIN_IP_BURST = int(os.environ.get("LOGIN_IP_BURST", "30"))
+    LOGIN_EMAIL_PER_MINUTE = int(os.environ.get("LOGIN_EMAIL_PER_MINUTE", "5"))
+    LOGIN_EMAIL_BURST = int(os.environ.get("LOGIN_EMAIL_BURST", "10"))
+    REGISTER_IP_PER_MINUTE = int(os.environ.get("REGISTER_IP_PER_MINUTE", "5"))
+    REGISTER_IP_BURST = int(os.environ.get("REGISTER_IP_BURST", "10"))
+
+    # Bulk user import (POST /auth/users/import, `flask import-users`): rows per INSERT,
+    # and rows handled per HTTP request (use the CLI for large files). A scrypt hash takes
+    # ~135 ms, so 300 rows on 2 bulk hashing workers take ~20 s; scale with the workers.
+    USER_IMPORT_CHUNK_SIZE = int(os.environ.get("USER_IMPORT_CHUNK_SIZE", "500"))
+    USER_IMPORT_MAX_ROWS_PER_REQUEST = int(os.environ.get("USER_IMPORT_MAX_ROWS_PER_REQUEST", "300"))
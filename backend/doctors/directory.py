@@ -0,0 +1,58 @@
+"""
+Process-local map from user id to linked doctor id.
+
+A doctor profile is linked to a user account once and never relinked, so
+a cached link can never go stale. Users without a linked profile are not
+cached, as they may be linked later.
+
+Tokens minted at login carry the linked profile as a `doctor_id` claim,
+which is used first; the map serves tokens minted without one.
+"""
+from flask import has_request_context
+from flask_jwt_extended import get_jwt
+
+from backend.common.cache import LRUCache
+from backend.common.metrics import register_metrics
+from backend.doctors.repository import doctor_repository
+
+
+class DoctorDirectory:
+    """Resolves the logged-in doctor's profile id without a query per request."""
+
+    def __init__(self):
+        self.entries = LRUCache(0)
+
+    def init_app(self, app) -> None:
+        """Size the map from the app config and start empty."""
+        self.entries = LRUCache(app.config.get("DOCTOR_DIRECTORY_SIZE", 4096))
+        register_metrics("doctor_directory", self.entries.stats)
+
+    def doctor_id_for_user(self, user_id: int) -> int | None:
+        """Return the id of the doctor profile linked to a user, or None."""
+        doctor_id = self._claimed_doctor_id(user_id)
+        if doctor_id is not None:
+            return doctor_id
+
+        doctor_id = self.entries.get(user_id)
+        if doctor_id is None:
+            doctor_id = doctor_repository.find_id_by_user_id(user_id)
+            if doctor_id is not None:
+                self.entries.set(user_id, doctor_id)
+        return doctor_id
+
+    @staticmethod
+    def _claimed_doctor_id(user_id: int) -> int | None:
+        """The `doctor_id` claim of the current request's token, if it was minted for this user."""
+        if not has_request_context():
+            return None
+        try:
+            claims = get_jwt()
+        except RuntimeError:
+            # No token verified in this request
+            return None
+        if claims.get("sub") != user_id:
+            return None
+        return claims.get("doctor_id")
+
+
+doctor_directory = DoctorDirectory()
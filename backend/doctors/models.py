@@ -19,7 +19,8 @@ class Doctor(db.Model):
     department_id = db.Column(
         db.Integer,
         db.ForeignKey("departments.id"),
-        nullable=True
+        nullable=True,
+        index=True
     )
 
     # Relationships
@@ -27,6 +27,14 @@ class DoctorRepository:
         """Find a doctor by their linked user ID."""
         return Doctor.query.filter_by(user_id=user_id).first()
 
+    def find_id_by_user_id(self, user_id: int) -> int | None:
+        """Find the id of the doctor linked to a user without loading the row."""
+        return db.session.query(Doctor.id).filter_by(user_id=user_id).scalar()
+
+    def find_by_department_id(self, department_id: int) -> list[Doctor]:
+        """Find all doctors in a department."""
+        return Doctor.query.filter_by(department_id=department_id).all()
+
     def get_all(self) -> list[Doctor]:
         """Get all doctors."""
         return Doctor.query.all()
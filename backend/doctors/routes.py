@@ -1,18 +1,29 @@
 import logging
-from flask import Blueprint, request
+from datetime import date
+from flask import Blueprint, jsonify, request
 from flask_jwt_extended import get_jwt_identity
 from marshmallow import ValidationError
 
 from backend.common.rbac import require_roles
 from backend.common.exceptions import AppException
-from backend.doctors.schemas import DoctorCreateSchema, DoctorAssignSchema, DoctorLinkUserSchema
+from backend.doctors.schemas import (
+    DoctorCreateSchema,
+    DoctorAssignSchema,
+    DoctorLinkUserSchema,
+    DoctorCancelDaySchema,
+    DoctorAgendaQuerySchema
+)
 from backend.doctors.service import (
     create_doctor,
     list_doctors,
     assign_doctor_to_department,
     link_doctor_to_user,
-    get_doctor_by_user_id
+    get_doctor_by_id,
+    get_my_doctor_id,
+    get_agenda_etag,
+    get_agenda
 )
+from backend.appointments.service import cancel_doctor_days
 
 logger = logging.getLogger(__name__)
 
@@ -73,7 +84,7 @@ def get_my_doctor_profile():
     """Get the logged-in doctor's profile."""
     user_id = get_jwt_identity()
     
-    doctor = get_doctor_by_user_id(user_id)
+    doctor = get_doctor_by_id(get_my_doctor_id(user_id))
     if not doctor:
         raise AppException("No doctor profile linked to your account")
     
@@ -85,6 +96,34 @@ def get_my_doctor_profile():
     }
 
 
+@doctors_bp.route("/me/agenda", methods=["GET"])
+@require_roles("DOCTOR")
+def get_my_agenda_api():
+    """
+    Get the logged-in doctor's slots for a day with bookings inlined.
+
+    Supports conditional requests: send the previous ETag in If-None-Match
+    and get 304 Not Modified, without a database query, while nothing changed.
+    """
+    user_id = get_jwt_identity()
+
+    try:
+        query = DoctorAgendaQuerySchema().load(request.args)
+    except ValidationError as err:
+        logger.warning(f"Validation error: {err.messages}")
+        raise AppException(str(err.messages))
+
+    day = query["date"] or date.today()
+    doctor_id = get_my_doctor_id(user_id)
+    etag = get_agenda_etag(doctor_id, day)
+    if request.if_none_match.contains(etag):
+        return "", 304, {"ETag": f'"{etag}"'}
+
+    response = jsonify({"doctor_id": doctor_id, "date": str(day), "slots": get_agenda(doctor_id, day)})
+    response.set_etag(etag)
+    return response
+
+
 @doctors_bp.route("/assign", methods=["POST"])
 @require_roles("ADMIN")
 def assign_doctor_api():
@@ -125,3 +164,19 @@ def link_doctor_to_user_api(doctor_id):
         "doctor_id": doctor.id,
         "user_id": doctor.user_id
     }
+
+
+@doctors_bp.route("/<int:doctor_id>/cancel-day", methods=["POST"])
+@require_roles("ADMIN")
+def cancel_doctor_day_api(doctor_id):
+    """Cancel all of a doctor's appointments in a date range (admin only)."""
+    logger.info(f"Received request to cancel appointments of doctor {doctor_id}")
+
+    schema = DoctorCancelDaySchema()
+    try:
+        data = schema.load(request.get_json())
+    except ValidationError as err:
+        logger.warning(f"Validation error: {err.messages}")
+        raise AppException(str(err.messages))
+
+    return cancel_doctor_days(doctor_id, **data)
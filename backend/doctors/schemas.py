@@ -19,6 +19,18 @@ class DoctorLinkUserSchema(Schema):
     user_id = fields.Int(required=True)
 
 
+class DoctorCancelDaySchema(Schema):
+    """Schema for cancelling a doctor's appointments over a date range. `to` defaults to `from`."""
+    date_from = fields.Date(required=True, data_key="from")
+    date_to = fields.Date(load_default=None, data_key="to")
+    slots = fields.Str(load_default="free", validate=validate.OneOf(["free", "delete"]))
+
+
+class DoctorAgendaQuerySchema(Schema):
+    """Schema for agenda query parameters. `date` defaults to today."""
+    date = fields.Date(load_default=None)
+
+
 class DoctorResponseSchema(Schema):
     """Schema for doctor response."""
     id = fields.Int()
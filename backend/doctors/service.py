@@ -1,8 +1,13 @@
 import logging
+from datetime import date
 from backend.doctors.models import Doctor
+from backend.doctors.directory import doctor_directory
 from backend.doctors.repository import doctor_repository
+from backend.availability.cache import availability_cache
+from backend.availability.repository import availability_repository
 from backend.departments.repository import department_repository
 from backend.auth.repository import user_repository
+from backend.auth.claims import claims_versions
 from backend.common.exceptions import AppException
 from backend.common.enums import UserRole
 from backend.common.db import db
@@ -48,6 +53,52 @@ def get_doctor_by_user_id(user_id: int) -> Doctor | None:
     return doctor_repository.find_by_user_id(user_id)
 
 
+def get_my_doctor_id(user_id: int) -> int:
+    """Get the id of the logged-in doctor's profile, cached per worker."""
+    doctor_id = doctor_directory.doctor_id_for_user(user_id)
+    if doctor_id is None:
+        raise AppException("No doctor profile linked to your account")
+    return doctor_id
+
+
+def get_agenda_etag(doctor_id: int, day: date) -> str:
+    """
+    ETag of a doctor's agenda for a day.
+
+    Built from the doctor's schedule version, which every slot, booking and
+    status change bumps, so checking it needs no query. Read it before
+    reading the agenda. The version file's epoch is part of it, so counters
+    restarting from 0 after the file was lost never repeat an old ETag.
+
+    Single host only: the version file is per host, and a change made on
+    one host does not bump the versions seen by the others. Behind a load
+    balancer over several hosts, do not send If-None-Match to this endpoint
+    (or pin doctors to one host).
+    """
+    return (
+        f"agenda-{doctor_id}-{day.isoformat()}-"
+        f"{availability_cache.epoch:x}-{availability_cache.version(doctor_id)}"
+    )
+
+
+def get_agenda(doctor_id: int, day: date) -> list[dict]:
+    """Get every slot of a doctor's day with the booked member and appointment status inlined."""
+    logger.info(f"Getting agenda of doctor {doctor_id} for {day}")
+    return [
+        {
+            "availability_id": row.availability_id,
+            "start_time": str(row.start_time),
+            "end_time": str(row.end_time),
+            "is_booked": row.is_booked,
+            "appointment_id": row.appointment_id,
+            "status": row.status,
+            "member_id": row.member_id,
+            "member_email": row.member_email
+        }
+        for row in availability_repository.find_agenda(doctor_id, day)
+    ]
+
+
 def assign_doctor_to_department(doctor_id: int, department_id: int) -> Doctor:
     """Assign a doctor to a department."""
     logger.info(f"Assigning doctor {doctor_id} to department {department_id}")
@@ -90,7 +141,10 @@ def link_doctor_to_user(doctor_id: int, user_id: int) -> Doctor:
         raise AppException("User is already linked to another doctor profile")
     
     doctor = doctor_repository.link_user(doctor, user_id)
+    # Tokens minted before the link lack the doctor_id claim
+    claims_versions.bump(user)
     db.session.commit()
+    claims_versions.invalidate(user)
     
     logger.info(f"Doctor {doctor_id} linked to user {user_id}")
     return doctor
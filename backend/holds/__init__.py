@@ -0,0 +1 @@
+# Slot holds module package
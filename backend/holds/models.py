@@ -0,0 +1,32 @@
+from datetime import datetime
+from backend.common.db import db
+
+
+class SlotHold(db.Model):
+    """Time-limited reservation of a free slot for one member."""
+    __tablename__ = "slot_holds"
+    __table_args__ = (
+        db.Index("ix_slot_holds_member", "member_id"),
+        db.Index("ix_slot_holds_expires_at", "expires_at"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    availability_id = db.Column(
+        db.Integer,
+        db.ForeignKey("availability.id"),
+        nullable=False,
+        unique=True
+    )
+    member_id = db.Column(
+        db.Integer,
+        db.ForeignKey("users.id"),
+        nullable=False
+    )
+    expires_at = db.Column(db.DateTime, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    # Relationships
+    availability = db.relationship("Availability")
+
+    def __repr__(self):
+        return f"<SlotHold {self.id} - slot {self.availability_id} for member {self.member_id}>"
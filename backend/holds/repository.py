@@ -0,0 +1,110 @@
+import logging
+from datetime import date, datetime
+from sqlalchemy import delete
+from sqlalchemy.exc import IntegrityError
+from backend.holds.models import SlotHold
+from backend.availability.models import Availability
+from backend.common.db import db
+
+logger = logging.getLogger(__name__)
+
+
+class SlotHoldRepository:
+    """Repository for SlotHold database operations."""
+
+    def create(self, availability_id: int, member_id: int, expires_at: datetime,
+               now: datetime) -> SlotHold | None:
+        """
+        Create a hold, replacing an expired hold on the same slot.
+
+        The unique slot column decides between concurrent holds: the insert
+        runs in a savepoint, so losing the race only undoes the insert.
+
+        Returns:
+            The hold, or None if another member holds the slot
+        """
+        logger.debug(f"Holding slot {availability_id} for member {member_id} until {expires_at}")
+        db.session.execute(
+            delete(SlotHold)
+            .filter(SlotHold.availability_id == availability_id, SlotHold.expires_at <= now)
+            .execution_options(synchronize_session=False)
+        )
+        hold = SlotHold(
+            availability_id=availability_id,
+            member_id=member_id,
+            expires_at=expires_at
+        )
+        try:
+            with db.session.begin_nested():
+                db.session.add(hold)
+        except IntegrityError:
+            logger.info(f"Slot {availability_id} is held for another member")
+            return None
+        return hold
+
+    def find_by_id(self, hold_id: int) -> SlotHold | None:
+        """Find hold by ID."""
+        return db.session.get(SlotHold, hold_id)
+
+    def count_active_for_member(self, member_id: int, now: datetime) -> int:
+        """Count a member's unexpired holds."""
+        return SlotHold.query.filter(
+            SlotHold.member_id == member_id,
+            SlotHold.expires_at > now
+        ).count()
+
+    def find_active_for_slots(self, availability_ids: list[int], now: datetime) -> list[SlotHold]:
+        """Find unexpired holds on any of the given slots."""
+        return SlotHold.query.filter(
+            SlotHold.availability_id.in_(availability_ids),
+            SlotHold.expires_at > now
+        ).all()
+
+    def find_for_slots(self, availability_ids: list[int]) -> list[SlotHold]:
+        """Find every hold on the given slots, expired or not."""
+        return SlotHold.query.filter(SlotHold.availability_id.in_(availability_ids)).all()
+
+    def find_in_range(self, doctor_id: int, date_from: date, date_to: date) -> list[SlotHold]:
+        """Find every hold on a doctor's slots in a date range, expired or not."""
+        return SlotHold.query.join(
+            Availability, Availability.id == SlotHold.availability_id
+        ).filter(
+            Availability.doctor_id == doctor_id,
+            Availability.date >= date_from,
+            Availability.date <= date_to
+        ).all()
+
+    def delete_for_slots(self, availability_ids: list[int]) -> int:
+        """Delete every hold on the given slots. Returns rows deleted."""
+        result = db.session.execute(
+            delete(SlotHold)
+            .filter(SlotHold.availability_id.in_(availability_ids))
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount
+
+    def delete(self, hold: SlotHold) -> None:
+        """Delete a hold."""
+        db.session.delete(hold)
+
+    def find_expired(self, now: datetime, limit: int = 500) -> list[tuple]:
+        """Find (id, availability_id, member_id, doctor_id, date) of holds that expired before `now`."""
+        return db.session.query(
+            SlotHold.id, SlotHold.availability_id, SlotHold.member_id, Availability.doctor_id, Availability.date
+        ).join(
+            Availability, Availability.id == SlotHold.availability_id
+        ).filter(
+            SlotHold.expires_at <= now
+        ).order_by(SlotHold.expires_at).limit(limit).all()
+
+    def delete_expired(self, hold_id: int, now: datetime) -> bool:
+        """Delete a hold if it is still expired. Returns False if it was renewed or already deleted."""
+        result = db.session.execute(
+            delete(SlotHold)
+            .filter(SlotHold.id == hold_id, SlotHold.expires_at <= now)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount == 1
+
+
+slot_hold_repository = SlotHoldRepository()
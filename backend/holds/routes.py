@@ -0,0 +1,50 @@
+import logging
+from flask import Blueprint, request
+from flask_jwt_extended import get_jwt_identity
+from marshmallow import ValidationError
+
+from backend.common.rbac import require_roles
+from backend.common.exceptions import AppException
+from backend.holds.schemas import HoldCreateSchema
+from backend.holds.service import create_hold, release_hold
+
+logger = logging.getLogger(__name__)
+
+holds_bp = Blueprint("holds", __name__, url_prefix="/holds")
+
+
+@holds_bp.route("", methods=["POST"])
+@require_roles("MEMBER")
+def create_hold_api():
+    """Hold a slot for a short time. Book it with POST /appointments and its hold_id."""
+    logger.info("Received request to hold a slot")
+
+    member_id = get_jwt_identity()
+
+    schema = HoldCreateSchema()
+    try:
+        data = schema.load(request.get_json())
+    except ValidationError as err:
+        logger.warning(f"Validation error: {err.messages}")
+        raise AppException(str(err.messages))
+
+    hold = create_hold(data["availability_id"], member_id)
+
+    return {
+        "id": hold.id,
+        "availability_id": hold.availability_id,
+        "expires_at": hold.expires_at.isoformat()
+    }, 201
+
+
+@holds_bp.route("/<int:hold_id>", methods=["DELETE"])
+@require_roles("MEMBER")
+def release_hold_api(hold_id):
+    """Release a held slot."""
+    logger.info(f"Received request to release hold {hold_id}")
+
+    member_id = get_jwt_identity()
+
+    release_hold(hold_id, member_id)
+
+    return {"message": "Hold released successfully"}
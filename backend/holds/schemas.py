@@ -0,0 +1,13 @@
+from marshmallow import Schema, fields
+
+
+class HoldCreateSchema(Schema):
+    """Schema for holding a slot while the member confirms the booking."""
+    availability_id = fields.Int(required=True)
+
+
+class HoldResponseSchema(Schema):
+    """Schema for hold response."""
+    id = fields.Int()
+    availability_id = fields.Int()
+    expires_at = fields.DateTime()
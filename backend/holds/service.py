@@ -0,0 +1,111 @@
+import logging
+from datetime import datetime, timedelta
+from flask import current_app
+from backend.holds.models import SlotHold
+from backend.holds.repository import slot_hold_repository
+from backend.availability.repository import availability_repository
+from backend.waitlist.queue import waitlist_queue
+from backend.waitlist.repository import waitlist_repository
+from backend.waitlist.service import expire_slot_offer, offer_slot
+from backend.common.exceptions import AppException, ForbiddenError
+from backend.common.locks import doctor_locks
+from backend.common.db import db
+
+logger = logging.getLogger(__name__)
+
+
+def create_hold(availability_id: int, member_id: int) -> SlotHold:
+    """
+    Reserve a free slot for a member for BOOKING_HOLD_TTL_SECONDS.
+
+    An expired waitlist offer on the slot is passed on first (see
+    `expire_slot_offer`); other slots are left to the sweeper. Holding a
+    slot the member already holds extends that hold in place, keeping its
+    id; it never shortens it, e.g. a longer waitlist offer hold.
+    """
+    logger.info(f"Holding slot {availability_id} for member {member_id}")
+
+    doctor_id = availability_repository.find_doctor_id(availability_id)
+    if doctor_id is None:
+        raise AppException("Availability slot not found")
+
+    with doctor_locks.lock(doctor_id):
+        now = datetime.utcnow()
+
+        availability = availability_repository.find_by_id(availability_id)
+        if not availability:
+            raise AppException("Availability slot not found")
+        if availability.is_booked:
+            raise AppException("This time slot is already booked")
+
+        # The next waiting member comes before this request
+        entry_id = expire_slot_offer(doctor_id, availability_id, availability.date, now)
+        if entry_id is not None:
+            db.session.commit()
+            waitlist_queue.remove(doctor_id, entry_id)
+
+        holds = slot_hold_repository.find_active_for_slots([availability_id], now)
+        if any(hold.member_id != member_id for hold in holds):
+            raise AppException("This time slot is held for another member")
+
+        ttl = current_app.config.get("BOOKING_HOLD_TTL_SECONDS", 120)
+        expires_at = now + timedelta(seconds=ttl)
+        if holds:
+            hold = holds[0]
+            hold.expires_at = max(hold.expires_at, expires_at)
+            db.session.commit()
+            logger.info(f"Hold {hold.id} extended until {hold.expires_at}")
+            return hold
+
+        max_holds = current_app.config.get("MAX_ACTIVE_HOLDS", 3)
+        if slot_hold_repository.count_active_for_member(member_id, now) >= max_holds:
+            raise AppException(f"You can hold at most {max_holds} slots at a time")
+
+        hold = slot_hold_repository.create(availability_id, member_id, expires_at, now)
+        if hold is None:
+            db.session.rollback()
+            raise AppException("This time slot is held for another member")
+        db.session.commit()
+
+    logger.info(f"Hold created: {hold.id} until {hold.expires_at}")
+    return hold
+
+
+def get_active_hold(hold_id: int, member_id: int) -> SlotHold:
+    """Get a member's unexpired hold, or raise if it is missing, foreign or expired."""
+    hold = slot_hold_repository.find_by_id(hold_id)
+    if not hold or hold.expires_at <= datetime.utcnow():
+        raise AppException("Hold not found or expired")
+    if hold.member_id != member_id:
+        raise ForbiddenError("You can only use your own holds")
+    return hold
+
+
+def release_hold(hold_id: int, member_id: int) -> None:
+    """
+    Release a member's hold before it expires.
+
+    Releasing a waitlist offer expires it and offers the slot to the next
+    waiting member straight away.
+    """
+    logger.info(f"Releasing hold {hold_id}")
+
+    hold = slot_hold_repository.find_by_id(hold_id)
+    if not hold:
+        raise AppException("Hold not found")
+    if hold.member_id != member_id:
+        raise ForbiddenError("You can only release your own holds")
+
+    availability = hold.availability
+    with doctor_locks.lock(availability.doctor_id):
+        offer = None
+        slot_hold_repository.delete(hold)
+        if waitlist_repository.expire_offer(member_id, availability.id) and not availability.is_booked:
+            offer = offer_slot(
+                availability.doctor_id, availability.id, availability.date, exclude_member_id=member_id
+            )
+        db.session.commit()
+        if offer:
+            waitlist_queue.remove(availability.doctor_id, offer[0])
+
+    logger.info(f"Hold {hold_id} released")
@@ -4,7 +4,19 @@ from flask_jwt_extended import JWTManager
 
 from backend.config import Config
 from backend.common.db import db
-from backend.common.exceptions import AppException
+from backend.common.exceptions import AppException, TooManyRequestsError
+from backend.common.locks import doctor_locks
+from backend.availability.cache import availability_cache
+from backend.appointments.sweeper import completion_sweeper
+from backend.auth.importer import user_importer
+from backend.waitlist.queue import waitlist_queue
+from backend.doctors.directory import doctor_directory
+from backend.common.metrics import collect_metrics
+from backend.common.migrations import run_migrations
+from backend.common.rbac import require_roles
+from backend.common.security import password_hasher
+from backend.common.throttle import throttle
+from backend.auth.claims import claims_versions
 from backend.common.logging_config import setup_logging
 
 from backend.auth.routes import auth_bp
@@ -13,6 +25,8 @@ from backend.doctors.routes import doctors_bp
 from backend.availability.routes import availability_bp
 from backend.appointments.routes import appointments_bp
 from backend.reimbursements.routes import reimbursements_bp
+from backend.waitlist.routes import waitlist_bp
+from backend.holds.routes import holds_bp
 
 from backend.common import models_registry
 
@@ -29,7 +43,16 @@ def create_app():
     app.config.from_object(Config)
 
     db.init_app(app)
-    JWTManager(app)
+    jwt = JWTManager(app)
+    claims_versions.init_app(app, jwt)
+    password_hasher.init_app(app)
+    throttle.init_app(app)
+    doctor_locks.init_app(app)
+    availability_cache.init_app(app)
+    completion_sweeper.init_app(app)
+    user_importer.init_app(app)
+    waitlist_queue.init_app(app)
+    doctor_directory.init_app(app)
     logger.info("Extensions initialized")
 
     app.register_blueprint(auth_bp)
@@ -38,15 +61,24 @@ def create_app():
     app.register_blueprint(availability_bp)
     app.register_blueprint(appointments_bp)
     app.register_blueprint(reimbursements_bp)
+    app.register_blueprint(waitlist_bp)
+    app.register_blueprint(holds_bp)
     logger.info("Blueprints registered")
 
     @app.route("/health", methods=["GET"])
     def health():
         return {"status": "ok"}
 
+    @app.route("/metrics", methods=["GET"])
+    @require_roles("ADMIN")
+    def metrics():
+        return collect_metrics()
+
     @app.errorhandler(AppException)
     def handle_app_exception(e):
         logger.warning(f"AppException: {e.message}")
+        if isinstance(e, TooManyRequestsError):
+            return {"error": e.message}, e.status_code, {"Retry-After": str(e.retry_after)}
         return {"error": e.message}, e.status_code
 
     @app.errorhandler(Exception)
@@ -57,6 +89,8 @@ def create_app():
     with app.app_context():
         db.create_all()
         logger.info("Database tables created")
+        applied = run_migrations()
+        logger.info(f"Database migrations applied: {applied or 'none pending'}")
 
     logger.info("Flask application created successfully")
     return app
@@ -0,0 +1,17 @@
+"""Schema migrations, applied in VERSION order by backend.common.migrations.run_migrations."""
+
+from backend.migrations import (
+    v001_hot_lookup_indexes,
+    v002_open_slot_search_indexes,
+    v003_availability_date_index,
+    v004_appointment_status_index,
+    v005_user_claims_version,
+)
+
+MIGRATIONS = [
+    v001_hot_lookup_indexes,
+    v002_open_slot_search_indexes,
+    v003_availability_date_index,
+    v004_appointment_status_index,
+    v005_user_claims_version,
+]
@@ -0,0 +1,25 @@
+"""Composite indexes for the columns every repository filters and sorts on."""
+
+from backend.common.migrations import create_index
+
+VERSION = 1
+NAME = "hot_lookup_indexes"
+
+INDEXES = [
+    # AppointmentRepository.find_page / find_by_* (filter, then date order)
+    ("ix_appointments_doctor_date_start", "appointments", ["doctor_id", "date", "start_time"]),
+    ("ix_appointments_member_date_start", "appointments", ["member_id", "date", "start_time"]),
+    ("ix_appointments_date_start", "appointments", ["date", "start_time"]),
+    ("ix_appointments_availability", "appointments", ["availability_id"]),
+    # AvailabilityRepository.check_overlap is answered from the index alone
+    ("ix_availability_doctor_date_start_end", "availability", ["doctor_id", "date", "start_time", "end_time"]),
+    # ReimbursementRepository lookups
+    ("ix_reimbursements_member", "reimbursements", ["member_id"]),
+    ("ix_reimbursements_appointment", "reimbursements", ["appointment_id"]),
+    ("ix_reimbursements_status", "reimbursements", ["status"]),
+]
+
+
+def upgrade(connection):
+    for name, table, columns in INDEXES:
+        create_index(connection, name, table, columns)
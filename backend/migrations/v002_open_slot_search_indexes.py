@@ -0,0 +1,16 @@
+"""Indexes for searching open slots across the doctors of a department."""
+
+from backend.common.migrations import create_index
+
+VERSION = 2
+NAME = "open_slot_search_indexes"
+
+INDEXES = [
+    ("ix_availability_doctor_booked_date_start", "availability", ["doctor_id", "is_booked", "date", "start_time"]),
+    ("ix_doctors_department_id", "doctors", ["department_id"]),
+]
+
+
+def upgrade(connection):
+    for name, table, columns in INDEXES:
+        create_index(connection, name, table, columns)
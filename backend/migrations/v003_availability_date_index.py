@@ -0,0 +1,10 @@
+"""Index for the admin availability listing, which pages all doctors by date."""
+
+from backend.common.migrations import create_index
+
+VERSION = 3
+NAME = "availability_date_index"
+
+
+def upgrade(connection):
+    create_index(connection, "ix_availability_date_start", "availability", ["date", "start_time"])
@@ -0,0 +1,10 @@
+"""Index for the completion sweeper, which scans SCHEDULED appointments by date."""
+
+from backend.common.migrations import create_index
+
+VERSION = 4
+NAME = "appointment_status_index"
+
+
+def upgrade(connection):
+    create_index(connection, "ix_appointments_status_date", "appointments", ["status", "date"])
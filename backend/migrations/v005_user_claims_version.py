@@ -0,0 +1,10 @@
+"""Per-user claims version, bumped when claims minted into a user's tokens change."""
+
+from backend.common.migrations import add_column
+
+VERSION = 5
+NAME = "user_claims_version"
+
+
+def upgrade(connection):
+    add_column(connection, "users", "claims_version", "INTEGER NOT NULL DEFAULT 0")
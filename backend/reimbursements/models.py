@@ -4,6 +4,11 @@ from backend.common.db import db
 
 class Reimbursement(db.Model):
     __tablename__ = "reimbursements"
+    __table_args__ = (
+        db.Index("ix_reimbursements_member", "member_id"),
+        db.Index("ix_reimbursements_appointment", "appointment_id"),
+        db.Index("ix_reimbursements_status", "status"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     member_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
@@ -0,0 +1 @@
+# Waitlist module package
@@ -0,0 +1,28 @@
+from datetime import datetime
+from backend.common.db import db
+
+
+class WaitlistEntry(db.Model):
+    """A member waiting for a slot with a doctor within a date range."""
+    __tablename__ = "waitlist_entries"
+    __table_args__ = (
+        # Queue loads: a doctor's WAITING entries in priority (id) order
+        db.Index("ix_waitlist_doctor_status_id", "doctor_id", "status", "id"),
+        db.Index("ix_waitlist_member", "member_id"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    member_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+    doctor_id = db.Column(db.Integer, db.ForeignKey("doctors.id"), nullable=False)
+    date_from = db.Column(db.Date, nullable=False)
+    date_to = db.Column(db.Date, nullable=False)
+    status = db.Column(db.String(20), default="WAITING")  # WAITING, OFFERED, EXPIRED, CANCELLED
+    offered_availability_id = db.Column(db.Integer, nullable=True)
+    offered_at = db.Column(db.DateTime, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    # Relationships
+    doctor = db.relationship("Doctor")
+
+    def __repr__(self):
+        return f"<WaitlistEntry {self.id} - member {self.member_id} for doctor {self.doctor_id}>"
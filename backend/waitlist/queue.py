@@ -0,0 +1,127 @@
+"""
+In-memory per-doctor waitlist queues.
+
+The waitlist is persisted in `waitlist_entries`; this module keeps each
+doctor's WAITING entries in memory as a list sorted by priority (entry id,
+i.e. first come first served) with an id index for O(log n) removal. A
+queue is tagged with the doctor's version on a shared VersionBoard and is
+reloaded with one index-only query whenever another worker has changed
+that doctor's waitlist since.
+
+The queue only proposes candidates. Each offer is still claimed in the
+database with a conditional UPDATE, so a stale queue can cost a retry but
+never offers a slot twice.
+"""
+import bisect
+import logging
+import threading
+from datetime import date
+
+from backend.common.metrics import register_metrics
+from backend.common.versions import VersionBoard, default_board_path
+from backend.waitlist.repository import waitlist_repository
+
+logger = logging.getLogger(__name__)
+
+
+class _DoctorQueue:
+    """Sorted (id, member_id, date_from, date_to) keys of one doctor's WAITING entries."""
+
+    __slots__ = ("version", "keys", "ids")
+
+    def __init__(self, version: int, keys: list[tuple[int, int, date, date]]):
+        self.version = version
+        self.keys = keys
+        self.ids = [key[0] for key in keys]
+
+    def add(self, key: tuple[int, int, date, date]) -> None:
+        position = bisect.bisect_left(self.ids, key[0])
+        if position < len(self.ids) and self.ids[position] == key[0]:
+            return
+        self.ids.insert(position, key[0])
+        self.keys.insert(position, key)
+
+    def remove(self, entry_id: int) -> None:
+        position = bisect.bisect_left(self.ids, entry_id)
+        if position < len(self.ids) and self.ids[position] == entry_id:
+            del self.ids[position]
+            del self.keys[position]
+
+
+class WaitlistQueue:
+    """Per-doctor priority queues of waiting members, shared-version validated."""
+
+    def __init__(self):
+        self.versions = VersionBoard()
+        self._queues = {}
+        self._lock = threading.Lock()
+        self.loads = 0
+        self.hits = 0
+
+    def init_app(self, app) -> None:
+        """Attach the shared version file from the app config and start with empty queues."""
+        path = app.config.get("WAITLIST_VERSION_FILE") or default_board_path(app, "waitlist-versions")
+        self.versions.close()
+        self.versions = VersionBoard(path)
+        self._queues = {}
+        self.loads = 0
+        self.hits = 0
+        register_metrics("waitlist_queue", self.stats)
+
+    def matches(self, doctor_id: int, day: date) -> list[tuple[int, int]]:
+        """Return (entry_id, member_id) of entries whose range covers `day`, best first."""
+        version = self.versions.get(doctor_id)
+        with self._lock:
+            queue = self._queues.get(doctor_id)
+            if queue is not None and queue.version == version:
+                self.hits += 1
+                keys = list(queue.keys)
+            else:
+                queue = None
+
+        if queue is None:
+            keys = waitlist_repository.find_waiting_keys(doctor_id)
+            with self._lock:
+                self._queues[doctor_id] = _DoctorQueue(version, list(keys))
+                self.loads += 1
+
+        return [(entry_id, member_id) for entry_id, member_id, start, end in keys if start <= day <= end]
+
+    def add(self, doctor_id: int, key: tuple[int, int, date, date]) -> None:
+        """Publish a committed new entry (id, member_id, date_from, date_to)."""
+        self._changed(doctor_id, lambda queue: queue.add(key))
+
+    def remove(self, doctor_id: int, entry_id: int) -> None:
+        """Publish that a committed entry is no longer waiting."""
+        self._changed(doctor_id, lambda queue: queue.remove(entry_id))
+
+    def drop(self, doctor_id: int) -> None:
+        """Forget this worker's copy of a doctor's queue, e.g. after losing an offer race."""
+        with self._lock:
+            self._queues.pop(doctor_id, None)
+
+    def _changed(self, doctor_id: int, apply) -> None:
+        """Bump the doctor's version; keep the local queue only if no other worker changed it meanwhile."""
+        version = self.versions.bump(doctor_id)
+        with self._lock:
+            queue = self._queues.get(doctor_id)
+            if queue is None:
+                return
+            if queue.version == version - 1:
+                apply(queue)
+                queue.version = version
+            else:
+                del self._queues[doctor_id]
+
+    def stats(self) -> dict:
+        """Return cached doctor count and load/hit counters."""
+        with self._lock:
+            return {
+                "doctors": len(self._queues),
+                "entries": sum(len(queue.ids) for queue in self._queues.values()),
+                "loads": self.loads,
+                "hits": self.hits,
+            }
+
+
+waitlist_queue = WaitlistQueue()
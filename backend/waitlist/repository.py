@@ -0,0 +1,78 @@
+import logging
+from datetime import date, datetime
+from sqlalchemy import update
+from backend.waitlist.models import WaitlistEntry
+from backend.common.db import db
+
+logger = logging.getLogger(__name__)
+
+
+class WaitlistRepository:
+    """Repository for WaitlistEntry database operations."""
+
+    def create(self, member_id: int, doctor_id: int, date_from: date, date_to: date) -> WaitlistEntry:
+        """Create a new waitlist entry."""
+        logger.debug(f"Adding member {member_id} to waitlist of doctor {doctor_id}")
+        entry = WaitlistEntry(
+            member_id=member_id,
+            doctor_id=doctor_id,
+            date_from=date_from,
+            date_to=date_to,
+            status="WAITING"
+        )
+        db.session.add(entry)
+        return entry
+
+    def find_by_id(self, entry_id: int) -> WaitlistEntry | None:
+        """Find waitlist entry by ID."""
+        return db.session.get(WaitlistEntry, entry_id)
+
+    def find_by_member_id(self, member_id: int) -> list[WaitlistEntry]:
+        """Find all waitlist entries of a member, newest first."""
+        return WaitlistEntry.query.filter_by(member_id=member_id).order_by(WaitlistEntry.id.desc()).all()
+
+    def find_waiting(self, member_id: int, doctor_id: int) -> WaitlistEntry | None:
+        """Find a member's WAITING entry for a doctor."""
+        return WaitlistEntry.query.filter_by(
+            member_id=member_id, doctor_id=doctor_id, status="WAITING"
+        ).first()
+
+    def find_waiting_keys(self, doctor_id: int) -> list[tuple[int, int, date, date]]:
+        """Find (id, member_id, date_from, date_to) of a doctor's WAITING entries in priority order."""
+        return [
+            tuple(row) for row in db.session.query(
+                WaitlistEntry.id, WaitlistEntry.member_id, WaitlistEntry.date_from, WaitlistEntry.date_to
+            ).filter_by(
+                doctor_id=doctor_id, status="WAITING"
+            ).order_by(WaitlistEntry.id)
+        ]
+
+    def offer(self, entry_id: int, availability_id: int, now: datetime) -> bool:
+        """Atomically move a WAITING entry to OFFERED. Returns False if it was no longer waiting."""
+        result = db.session.execute(
+            update(WaitlistEntry)
+            .filter_by(id=entry_id, status="WAITING")
+            .values(status="OFFERED", offered_availability_id=availability_id, offered_at=now)
+        )
+        return result.rowcount == 1
+
+    def expire_offer(self, member_id: int, availability_id: int) -> bool:
+        """Atomically move the member's OFFERED entry for a slot to EXPIRED. Returns False if there is none."""
+        result = db.session.execute(
+            update(WaitlistEntry)
+            .filter_by(member_id=member_id, offered_availability_id=availability_id, status="OFFERED")
+            .values(status="EXPIRED")
+        )
+        return result.rowcount == 1
+
+    def cancel(self, entry_id: int) -> bool:
+        """Atomically move a WAITING entry to CANCELLED. Returns False if it was no longer waiting."""
+        result = db.session.execute(
+            update(WaitlistEntry)
+            .filter_by(id=entry_id, status="WAITING")
+            .values(status="CANCELLED")
+        )
+        return result.rowcount == 1
+
+
+waitlist_repository = WaitlistRepository()
@@ -0,0 +1,68 @@
+import logging
+from flask import Blueprint, request
+from flask_jwt_extended import get_jwt_identity
+from marshmallow import ValidationError
+
+from backend.common.rbac import require_roles
+from backend.common.exceptions import AppException
+from backend.waitlist.schemas import WaitlistJoinSchema
+from backend.waitlist.service import join_waitlist, leave_waitlist, get_my_waitlist
+
+logger = logging.getLogger(__name__)
+
+waitlist_bp = Blueprint("waitlist", __name__, url_prefix="/waitlist")
+
+
+def _entry_response(entry):
+    return {
+        "id": entry.id,
+        "doctor_id": entry.doctor_id,
+        "date_from": str(entry.date_from),
+        "date_to": str(entry.date_to),
+        "status": entry.status,
+        "offered_availability_id": entry.offered_availability_id
+    }
+
+
+@waitlist_bp.route("", methods=["POST"])
+@require_roles("MEMBER")
+def join_waitlist_api():
+    """Join a doctor's waitlist. A freed matching slot is held for the member."""
+    logger.info("Received request to join waitlist")
+
+    member_id = get_jwt_identity()
+
+    schema = WaitlistJoinSchema()
+    try:
+        data = schema.load(request.get_json())
+    except ValidationError as err:
+        logger.warning(f"Validation error: {err.messages}")
+        raise AppException(str(err.messages))
+
+    entry = join_waitlist(member_id=member_id, **data)
+
+    return _entry_response(entry), 201
+
+
+@waitlist_bp.route("/my", methods=["GET"])
+@require_roles("MEMBER")
+def get_my_waitlist_api():
+    """Get the logged-in member's waitlist entries and offers."""
+    logger.info("Received request to get own waitlist entries")
+
+    member_id = get_jwt_identity()
+
+    return [_entry_response(entry) for entry in get_my_waitlist(member_id)]
+
+
+@waitlist_bp.route("/<int:entry_id>", methods=["DELETE"])
+@require_roles("MEMBER")
+def leave_waitlist_api(entry_id):
+    """Leave a doctor's waitlist."""
+    logger.info(f"Received request to leave waitlist entry {entry_id}")
+
+    member_id = get_jwt_identity()
+
+    leave_waitlist(entry_id, member_id)
+
+    return {"message": "Left waitlist successfully"}
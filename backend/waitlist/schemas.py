@@ -0,0 +1,18 @@
+from marshmallow import Schema, fields
+
+
+class WaitlistJoinSchema(Schema):
+    """Schema for joining a doctor's waitlist."""
+    doctor_id = fields.Int(required=True)
+    date_from = fields.Date(required=True)
+    date_to = fields.Date(required=True)
+
+
+class WaitlistEntryResponseSchema(Schema):
+    """Schema for waitlist entry response."""
+    id = fields.Int()
+    doctor_id = fields.Int()
+    date_from = fields.Date()
+    date_to = fields.Date()
+    status = fields.Str()
+    offered_availability_id = fields.Int(allow_none=True)
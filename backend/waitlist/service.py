@@ -0,0 +1,189 @@
+import logging
+from datetime import date, datetime, timedelta
+from flask import current_app
+from backend.waitlist.models import WaitlistEntry
+from backend.waitlist.queue import waitlist_queue
+from backend.waitlist.repository import waitlist_repository
+from backend.holds.models import SlotHold
+from backend.holds.repository import slot_hold_repository
+from backend.availability.repository import availability_repository
+from backend.doctors.repository import doctor_repository
+from backend.common.exceptions import AppException, ForbiddenError
+from backend.common.locks import doctor_locks
+from backend.common.db import db
+
+logger = logging.getLogger(__name__)
+
+
+def join_waitlist(member_id: int, doctor_id: int, date_from: date, date_to: date) -> WaitlistEntry:
+    """Add a member to a doctor's waitlist for a date range."""
+    logger.info(f"Member {member_id} joining waitlist of doctor {doctor_id}")
+
+    if date_to < date_from:
+        raise AppException("End date must not be before start date")
+    if date_to < date.today():
+        raise AppException("Date range is in the past")
+
+    if not doctor_repository.find_by_id(doctor_id):
+        raise AppException("Doctor not found")
+
+    if waitlist_repository.find_waiting(member_id, doctor_id):
+        raise AppException("You are already on this doctor's waitlist")
+
+    entry = waitlist_repository.create(member_id, doctor_id, date_from, date_to)
+    db.session.commit()
+    waitlist_queue.add(doctor_id, (entry.id, member_id, date_from, date_to))
+
+    logger.info(f"Waitlist entry created: {entry.id}")
+    return entry
+
+
+def leave_waitlist(entry_id: int, member_id: int) -> WaitlistEntry:
+    """Remove a member's WAITING entry from the waitlist."""
+    logger.info(f"Member {member_id} leaving waitlist entry {entry_id}")
+
+    entry = waitlist_repository.find_by_id(entry_id)
+    if not entry:
+        raise AppException("Waitlist entry not found")
+
+    if entry.member_id != member_id:
+        raise ForbiddenError("You can only leave your own waitlist entries")
+
+    if not waitlist_repository.cancel(entry_id):
+        raise AppException("Waitlist entry is no longer waiting")
+
+    db.session.commit()
+    db.session.refresh(entry)
+    waitlist_queue.remove(entry.doctor_id, entry_id)
+
+    logger.info(f"Waitlist entry {entry_id} cancelled")
+    return entry
+
+
+def get_my_waitlist(member_id: int) -> list[WaitlistEntry]:
+    """Get the member's waitlist entries, newest first."""
+    return waitlist_repository.find_by_member_id(member_id)
+
+
+def offer_slot(doctor_id: int, availability_id: int, day: date,
+               exclude_member_id: int | None = None) -> tuple[int, SlotHold] | None:
+    """
+    Offer a freed slot to the best-matching waiting member by placing a hold.
+
+    Must run inside the transaction (and doctor lock) that freed the slot.
+    The entry is claimed with a conditional UPDATE; candidates already
+    claimed elsewhere are skipped. After the caller commits, it must pass
+    the returned entry id to `waitlist_queue.remove`.
+
+    Returns:
+        (entry_id, hold), or None when nobody is waiting for that day
+    """
+    now = datetime.utcnow()
+    for entry_id, member_id in waitlist_queue.matches(doctor_id, day):
+        if member_id == exclude_member_id:
+            continue
+
+        # The offer is only kept together with its hold
+        savepoint = db.session.begin_nested()
+        if not waitlist_repository.offer(entry_id, availability_id, now):
+            savepoint.rollback()
+            # Our copy of the queue was stale: reload it next time
+            waitlist_queue.drop(doctor_id)
+            continue
+
+        ttl = current_app.config.get("WAITLIST_HOLD_TTL_SECONDS", 900)
+        hold = slot_hold_repository.create(availability_id, member_id, now + timedelta(seconds=ttl), now)
+        if hold is None:
+            # Held for a member outside the waitlist: nobody can be offered it
+            savepoint.rollback()
+            return None
+        savepoint.commit()
+        logger.info(f"Slot {availability_id} held for waitlisted member {member_id} until {hold.expires_at}")
+        return entry_id, hold
+    return None
+
+
+def drop_expired_holds(holds: list[SlotHold], now: datetime) -> list[SlotHold]:
+    """
+    Delete the expired holds among `holds`, expiring the waitlist offers they carried.
+
+    For slots about to be deleted or blocked, which are not offered again.
+    Must run inside the caller's transaction and doctor lock.
+
+    Returns:
+        The unexpired holds, which are left alone
+    """
+    live = []
+    for hold in holds:
+        if hold.expires_at > now:
+            live.append(hold)
+            continue
+        if waitlist_repository.expire_offer(hold.member_id, hold.availability_id):
+            logger.info(f"Waitlist offer of slot {hold.availability_id} to member {hold.member_id} expired")
+        slot_hold_repository.delete(hold)
+    return live
+
+
+def expire_offers(now: datetime | None = None) -> int:
+    """
+    Delete expired holds and pass unconverted waitlist offers on.
+
+    An OFFERED entry whose hold expired becomes EXPIRED, and its slot, if
+    still free, is offered to the next matching waiting member. Each
+    doctor's holds are handled in their own transaction under the
+    doctor's lock; a hold renewed meanwhile is left alone.
+
+    Returns:
+        Number of slots offered again
+    """
+    now = now or datetime.utcnow()
+    by_doctor = {}
+    for hold_id, availability_id, member_id, doctor_id, day in slot_hold_repository.find_expired(now):
+        by_doctor.setdefault(doctor_id, []).append((hold_id, availability_id, member_id, day))
+
+    reoffered = 0
+    for doctor_id, holds in by_doctor.items():
+        with doctor_locks.lock(doctor_id):
+            offers = []
+            for hold_id, availability_id, member_id, day in holds:
+                entry_id = _pass_on_expired_hold(doctor_id, hold_id, availability_id, member_id, day, now)
+                if entry_id is not None:
+                    offers.append(entry_id)
+            db.session.commit()
+
+        for entry_id in offers:
+            waitlist_queue.remove(doctor_id, entry_id)
+        reoffered += len(offers)
+    return reoffered
+
+
+def expire_slot_offer(doctor_id: int, availability_id: int, day: date, now: datetime) -> int | None:
+    """
+    Pass on the expired waitlist offer of one slot, as `expire_offers` does for all.
+
+    Must run under the doctor's lock. After the caller commits, it must
+    pass the returned entry id to `waitlist_queue.remove`.
+
+    Returns:
+        The id of the entry the slot was offered to next, or None
+    """
+    for hold in slot_hold_repository.find_for_slots([availability_id]):
+        if hold.expires_at <= now:
+            return _pass_on_expired_hold(doctor_id, hold.id, availability_id, hold.member_id, day, now)
+    return None
+
+
+def _pass_on_expired_hold(doctor_id: int, hold_id: int, availability_id: int, member_id: int,
+                          day: date, now: datetime) -> int | None:
+    """Delete an expired hold; if it was a waitlist offer, expire it and offer the slot to the next member."""
+    if not slot_hold_repository.delete_expired(hold_id, now):
+        return None
+    if not waitlist_repository.expire_offer(member_id, availability_id):
+        return None
+    logger.info(f"Waitlist offer of slot {availability_id} to member {member_id} expired")
+    availability = availability_repository.find_by_id(availability_id)
+    if availability and not availability.is_booked:
+        offer = offer_slot(doctor_id, availability_id, day, exclude_member_id=member_id)
+        if offer:
+            return offer[0]
+    return None
@@ -0,0 +1,146 @@
+"""
+Booking contention benchmark.
+
+Compares the booking strategies in backend.appointments.service by letting
+several threads race for the same pool of availability slots.
+
+Usage:
+    python -m benchmarks.bench_booking [--threads 16] [--slots 200] [--attempts 2000]
+
+DATABASE_URL selects the database (defaults to a temporary SQLite file).
+Row locks are only meaningful on a server database such as MySQL.
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+from datetime import date, time as dt_time, timedelta
+
+if not os.environ.get("DATABASE_URL"):
+    _db_file = os.path.join(tempfile.mkdtemp(), "bench_booking.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{_db_file}"
+os.environ.setdefault("SECRET_KEY", "bench-secret-key")
+os.environ.setdefault("JWT_SECRET_KEY", "bench-jwt-secret-key")
+
+from sqlalchemy import func
+
+from backend.main import create_app
+from backend.common.db import db
+from backend.common.exceptions import AppException
+from backend.auth.models import User
+from backend.doctors.models import Doctor
+from backend.availability.models import Availability
+from backend.appointments.models import Appointment
+from backend.appointments.service import book_appointment, BOOKING_STRATEGIES
+
+
+def seed(slot_count: int) -> tuple[list[int], list[int]]:
+    """Reset tables and create one doctor, a pool of members and free slots."""
+    db.drop_all()
+    db.create_all()
+
+    doctor = Doctor(name="Dr. Bench", email="bench@hospital.com")
+    members = [
+        User(email=f"member{i}@bench.com", password="x", role="MEMBER")
+        for i in range(50)
+    ]
+    db.session.add(doctor)
+    db.session.add_all(members)
+    db.session.flush()
+
+    day = date.today() + timedelta(days=1)
+    slots = []
+    for i in range(slot_count):
+        start_minutes = 8 * 60 + i * 5
+        slot_day = day + timedelta(days=start_minutes // (24 * 60))
+        start_minutes %= 24 * 60
+        start = dt_time(start_minutes // 60, start_minutes % 60)
+        end_minutes = min(start_minutes + 5, 24 * 60 - 1)
+        end = dt_time(end_minutes // 60, end_minutes % 60)
+        slots.append(Availability(doctor_id=doctor.id, date=slot_day,
+                                  start_time=start, end_time=end, is_booked=False))
+    db.session.add_all(slots)
+    db.session.commit()
+    return [s.id for s in slots], [m.id for m in members]
+
+
+def run_strategy(app, strategy: str, threads: int, slot_count: int, attempts: int) -> dict:
+    """Run one contention round and return throughput, latency and correctness numbers."""
+    app.config["BOOKING_STRATEGY"] = strategy
+    with app.app_context():
+        slot_ids, member_ids = seed(slot_count)
+
+    latencies = []
+    outcomes = {"booked": 0, "conflict": 0, "error": 0}
+    guard = threading.Lock()
+    per_thread = attempts // threads
+
+    def worker(seed_value: int):
+        rng = random.Random(seed_value)
+        local_latencies = []
+        local = {"booked": 0, "conflict": 0, "error": 0}
+        with app.app_context():
+            for _ in range(per_thread):
+                started = time.perf_counter()
+                try:
+                    book_appointment(rng.choice(slot_ids), rng.choice(member_ids))
+                    local["booked"] += 1
+                except AppException:
+                    local["conflict"] += 1
+                except Exception:
+                    local["error"] += 1
+                local_latencies.append(time.perf_counter() - started)
+            db.session.remove()
+        with guard:
+            latencies.extend(local_latencies)
+            for key, value in local.items():
+                outcomes[key] += value
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    started = time.perf_counter()
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    with app.app_context():
+        double_booked = db.session.query(Appointment.availability_id).group_by(
+            Appointment.availability_id
+        ).having(func.count(Appointment.id) > 1).count()
+        db.session.remove()
+
+    latencies.sort()
+    return {
+        "strategy": strategy,
+        "attempts": len(latencies),
+        "throughput": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        "double_booked": double_booked,
+        **outcomes,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--slots", type=int, default=200)
+    parser.add_argument("--attempts", type=int, default=2000)
+    args = parser.parse_args()
+
+    app = create_app()
+    print(f"database: {app.config['SQLALCHEMY_DATABASE_URI']}")
+    print(f"{'strategy':<20}{'ops/s':>10}{'p50 ms':>10}{'p99 ms':>10}"
+          f"{'booked':>8}{'conflict':>10}{'error':>8}{'double':>8}")
+    for strategy in BOOKING_STRATEGIES:
+        r = run_strategy(app, strategy, args.threads, args.slots, args.attempts)
+        print(f"{r['strategy']:<20}{r['throughput']:>10.1f}{r['p50_ms']:>10.2f}{r['p99_ms']:>10.2f}"
+              f"{r['booked']:>8}{r['conflict']:>10}{r['error']:>8}{r['double_booked']:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Schedule grid benchmark.
+
+Compares the row-based way of answering "free windows of N minutes",
+"utilization" and "overlaps" (walking sorted slot tuples and comparing
+`time` values) with backend.availability.schedule_grid.DayGrid on
+synthetic doctor-days. No database is involved; both sides start from the
+same row tuples the repository returns.
+
+Usage:
+    python -m benchmarks.bench_schedule_grid [--days 20000] [--duration 60]
+"""
+import argparse
+import random
+import time
+from datetime import time as dt_time
+
+from backend.availability.schedule_grid import DayGrid
+
+
+def _minutes(t: dt_time) -> int:
+    return t.hour * 60 + t.minute
+
+
+def make_days(count: int, seed: int = 42) -> list[list[tuple[dt_time, dt_time, bool]]]:
+    """Doctor-days of 15-60 minute slots between 08:00 and 18:00 with random gaps, ~60% booked."""
+    rng = random.Random(seed)
+    days = []
+    for _ in range(count):
+        rows, minute = [], 8 * 60
+        while minute < 18 * 60:
+            minute += rng.choice((0, 0, 0, 15))
+            length = rng.choice((15, 20, 30, 60))
+            if minute + length > 18 * 60:
+                break
+            rows.append((
+                dt_time(minute // 60, minute % 60),
+                dt_time((minute + length) // 60, (minute + length) % 60),
+                rng.random() < 0.6,
+            ))
+            minute += length
+        days.append(rows)
+    return days
+
+
+def rows_free_windows(rows, minutes: int) -> list[tuple[dt_time, dt_time]]:
+    windows, start, end = [], None, None
+    for slot_start, slot_end, is_booked in sorted(rows):
+        if is_booked:
+            continue
+        if start is not None and slot_start == end:
+            end = slot_end
+            continue
+        if start is not None and _minutes(end) - _minutes(start) >= minutes:
+            windows.append((start, end))
+        start, end = slot_start, slot_end
+    if start is not None and _minutes(end) - _minutes(start) >= minutes:
+        windows.append((start, end))
+    return windows
+
+
+def rows_utilization(rows) -> float:
+    total = booked = 0
+    for start, end, is_booked in rows:
+        length = _minutes(end) - _minutes(start)
+        total += length
+        if is_booked:
+            booked += length
+    return booked / total if total else 0.0
+
+
+def rows_overlaps(rows, other) -> bool:
+    left, right = sorted(rows), sorted(other)
+    i = j = 0
+    while i < len(left) and j < len(right):
+        if left[i][0] < right[j][1] and right[j][0] < left[i][1]:
+            return True
+        if left[i][1] <= right[j][1]:
+            i += 1
+        else:
+            j += 1
+    return False
+
+
+def timed(label: str, func, days) -> None:
+    started = time.perf_counter()
+    func(days)
+    elapsed = time.perf_counter() - started
+    print(f"{label:<28} {elapsed * 1000:9.1f} ms  {elapsed / len(days) * 1e6:7.2f} us/day")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, default=20000)
+    parser.add_argument("--duration", type=int, default=60)
+    args = parser.parse_args()
+
+    days = make_days(args.days)
+    pairs = list(zip(days, days[1:]))
+    grids = [DayGrid.from_rows(rows) for rows in days]
+    grid_pairs = list(zip(grids, grids[1:]))
+
+    timed("build grids", lambda ds: [DayGrid.from_rows(rows) for rows in ds], days)
+    print()
+    timed("rows: free windows", lambda ds: [rows_free_windows(rows, args.duration) for rows in ds], days)
+    timed("grid: free windows", lambda gs: [grid.free_windows(args.duration) for grid in gs], grids)
+    timed("rows: utilization", lambda ds: [rows_utilization(rows) for rows in ds], days)
+    timed("grid: utilization", lambda gs: [grid.utilization() for grid in gs], grids)
+    timed("rows: overlaps", lambda ps: [rows_overlaps(a, b) for a, b in ps], pairs)
+    timed("grid: overlaps", lambda ps: [a.overlaps(b) for a, b in ps], grid_pairs)
+
+    mismatches = sum(
+        rows_free_windows(rows, args.duration) != grid.free_windows(args.duration)
+        for rows, grid in zip(days, grids)
+    )
+    print(f"\nfree-window mismatches between approaches: {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Open-slot search benchmark.
+
+Seeds a department with many doctors and a large availability table, then
+times backend.availability.service.search_open_slots.
+
+Usage:
+    python -m benchmarks.bench_slot_search [--slots 1000000] [--doctors 50] [--runs 200]
+
+DATABASE_URL selects the database (defaults to a temporary SQLite file).
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import date, time as dt_time, timedelta
+
+if not os.environ.get("DATABASE_URL"):
+    _db_file = os.path.join(tempfile.mkdtemp(), "bench_slot_search.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{_db_file}"
+os.environ.setdefault("SECRET_KEY", "bench-secret-key")
+os.environ.setdefault("JWT_SECRET_KEY", "bench-jwt-secret-key")
+
+from sqlalchemy import insert
+
+from backend.main import create_app
+from backend.common.db import db
+from backend.departments.models import Department
+from backend.doctors.models import Doctor
+from backend.availability.models import Availability
+from backend.availability.service import search_open_slots
+
+CHUNK = 50000
+
+
+def seed(slot_count: int, doctor_count: int) -> int:
+    """Create one department whose doctors share `slot_count` slots, ~80% booked, half in the past."""
+    db.drop_all()
+    db.create_all()
+
+    department = Department(name="Bench")
+    db.session.add(department)
+    db.session.flush()
+    doctors = [
+        Doctor(name=f"Dr. {i}", email=f"dr{i}@bench.com", department_id=department.id)
+        for i in range(doctor_count)
+    ]
+    db.session.add_all(doctors)
+    db.session.commit()
+
+    rng = random.Random(42)
+    slots_per_doctor = slot_count // doctor_count
+    first_day = date.today() - timedelta(days=slots_per_doctor // 32)
+    rows = []
+    for doctor in doctors:
+        for i in range(slots_per_doctor):
+            day = first_day + timedelta(days=i // 16)
+            start = 8 * 60 + (i % 16) * 30
+            rows.append({
+                "doctor_id": doctor.id,
+                "date": day,
+                "start_time": dt_time(start // 60, start % 60),
+                "end_time": dt_time((start + 30) // 60, (start + 30) % 60),
+                "is_booked": rng.random() < 0.8,
+            })
+            if len(rows) >= CHUNK:
+                db.session.execute(insert(Availability), rows)
+                rows = []
+    if rows:
+        db.session.execute(insert(Availability), rows)
+    db.session.commit()
+    return department.id
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--slots", type=int, default=1_000_000)
+    parser.add_argument("--doctors", type=int, default=50)
+    parser.add_argument("--runs", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        started = time.perf_counter()
+        department_id = seed(args.slots, args.doctors)
+        print(f"seeded {args.slots} slots in {time.perf_counter() - started:.1f}s")
+
+        timings = []
+        for _ in range(args.runs):
+            started = time.perf_counter()
+            results = search_open_slots(department_id, limit=args.limit)
+            timings.append(time.perf_counter() - started)
+            db.session.remove()
+
+        timings.sort()
+        print(f"results per search: {len(results)}")
+        print(f"p50 {statistics.median(timings) * 1000:.2f} ms, "
+              f"p99 {timings[int(len(timings) * 0.99) - 1] * 1000:.2f} ms, "
+              f"max {timings[-1] * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
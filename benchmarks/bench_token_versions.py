@@ -0,0 +1,132 @@
+"""
+Token version check benchmark.
+
+Measures what backend.auth.claims.ClaimsVersions adds to every
+authenticated request. The check runs once per token, in flask-jwt-extended's
+blocklist callback. For comparison, the same check is done as a
+primary-key query per request, the way a DB denylist would work.
+
+Users are seeded with bumped claims versions. While checks run, a share
+of them are revoked through the change feed (--bump-every), so the timings
+include the feed reads those revocations cause.
+
+Usage:
+    python -m benchmarks.bench_token_versions [--users 100000] [--checks 200000] [--bump-every 5000]
+
+Exits with status 1 if the p99 of the in-process check is 50 us or more.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+if not os.environ.get("DATABASE_URL"):
+    _db_file = os.path.join(tempfile.mkdtemp(), "bench_token_versions.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{_db_file}"
+os.environ.setdefault("SECRET_KEY", "bench-secret-key")
+os.environ.setdefault("JWT_SECRET_KEY", "bench-jwt-secret-key")
+
+from sqlalchemy import insert
+
+from backend.main import create_app
+from backend.common.db import db
+from backend.auth.claims import claims_versions
+from backend.auth.models import User
+from backend.auth.repository import user_repository
+
+P99_BUDGET_US = 50
+
+
+def seed(user_count: int) -> None:
+    """Reset tables and create users, a tenth of them with bumped claims versions."""
+    db.drop_all()
+    db.create_all()
+    db.session.execute(insert(User), [
+        {"email": f"user{i}@bench.com", "password": "x", "role": "MEMBER",
+         "claims_version": 1 if i % 10 == 0 else 0}
+        for i in range(user_count)
+    ])
+    db.session.commit()
+
+
+def percentiles(samples_ns: list[int]) -> dict:
+    samples = sorted(samples_ns)
+    return {
+        "p50": samples[len(samples) // 2] / 1000,
+        "p99": samples[int(len(samples) * 0.99)] / 1000,
+        "max": samples[-1] / 1000,
+        "mean": statistics.fmean(samples) / 1000,
+    }
+
+
+def report(label: str, stats: dict) -> None:
+    print(f"{label:<28} p50 {stats['p50']:7.2f} us  p99 {stats['p99']:7.2f} us  "
+          f"max {stats['max']:8.2f} us  mean {stats['mean']:6.2f} us")
+
+
+def bench_in_process(payloads: list[dict], bump_every: int) -> list[int]:
+    samples = []
+    for number, payload in enumerate(payloads, start=1):
+        if bump_every and number % bump_every == 0:
+            user = db.session.get(User, payload["sub"])
+            claims_versions.bump(user)
+            db.session.commit()
+            # Signal only, as another worker would, so the next check reads the feed
+            claims_versions.board.bump(0)
+
+        started = time.perf_counter_ns()
+        claims_versions.is_stale({}, payload)
+        samples.append(time.perf_counter_ns() - started)
+    return samples
+
+
+def bench_db_lookup(payloads: list[dict]) -> list[int]:
+    samples = []
+    for payload in payloads:
+        started = time.perf_counter_ns()
+        version = db.session.query(User.claims_version).filter_by(id=payload["sub"]).scalar()
+        _ = payload["cv"] < version
+        samples.append(time.perf_counter_ns() - started)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=100000)
+    parser.add_argument("--checks", type=int, default=200000)
+    parser.add_argument("--bump-every", type=int, default=5000)
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        seed(args.users)
+        rng = random.Random(42)
+        user_ids = [user_id for (user_id,) in db.session.query(User.id)]
+        payloads = [
+            {"sub": user_id, "type": "access", "cv": 1}
+            for user_id in (rng.choice(user_ids) for _ in range(args.checks))
+        ]
+
+        # The first check loads the versions of all users; workers pay this once
+        started = time.perf_counter()
+        claims_versions.current(user_ids[0])
+        print(f"initial load of {len(claims_versions.versions)} versions: "
+              f"{(time.perf_counter() - started) * 1000:.1f} ms\n")
+
+        in_process = percentiles(bench_in_process(payloads, args.bump_every))
+        report("in-process check", in_process)
+        report("DB lookup per request", percentiles(bench_db_lookup(payloads[:20000])))
+        print(f"\nfeed reads: {claims_versions.polls}, rejected tokens: {claims_versions.rejected}, "
+              f"feed rows: {user_repository.find_last_claims_change_id()}")
+
+    if in_process["p99"] >= P99_BUDGET_US:
+        print(f"FAIL: p99 {in_process['p99']:.2f} us is over the {P99_BUDGET_US} us budget")
+        sys.exit(1)
+    print(f"OK: p99 {in_process['p99']:.2f} us is within the {P99_BUDGET_US} us budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -11,6 +11,7 @@ os.environ["SECRET_KEY"] = "test-secret-key"
 os.environ["JWT_SECRET_KEY"] = "test-jwt-secret-key"
 
 from backend.main import create_app
+from backend.config import Config
 from backend.common.db import db
 from backend.auth.models import User
 from backend.doctors.models import Doctor
@@ -18,8 +19,13 @@ from backend.common.security import hash_password
 
 
 @pytest.fixture
-def app():
+def app(tmp_path, monkeypatch):
     """Create test application with in-memory SQLite database."""
+    # Every test starts with full login/registration buckets and fresh versions, in files of its own
+    monkeypatch.setattr(Config, "THROTTLE_STORE_FILE", str(tmp_path / "throttle.db"))
+    monkeypatch.setattr(Config, "AVAILABILITY_CACHE_VERSION_FILE", str(tmp_path / "availability-versions.bin"))
+    monkeypatch.setattr(Config, "WAITLIST_VERSION_FILE", str(tmp_path / "waitlist-versions.bin"))
+    monkeypatch.setattr(Config, "CLAIMS_VERSION_FILE", str(tmp_path / "claims-versions.bin"))
     app = create_app()
     
     # Ensure test config
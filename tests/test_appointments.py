@@ -78,3 +78,401 @@ def test_prevent_double_booking(client, auth_headers, member_headers):
     )
     assert second_booking.status_code == 400
     assert "already booked" in second_booking.json["error"]
+
+
+def test_book_appointment_conditional_update(app, client, auth_headers, member_headers):
+    """Test the conditional-UPDATE booking strategy books once and rejects a second claim."""
+    app.config["BOOKING_STRATEGY"] = "conditional_update"
+
+    doctor_response = client.post(
+        "/doctors",
+        json={"name": "Dr. Green", "email": "green@hospital.com"},
+        headers=auth_headers
+    )
+    doctor_id = doctor_response.json["id"]
+
+    availability_response = client.post(
+        "/availability",
+        json={
+            "doctor_id": doctor_id,
+            "date": "2026-02-21",
+            "start_time": "09:00:00",
+            "end_time": "09:30:00"
+        },
+        headers=auth_headers
+    )
+    availability_id = availability_response.json["id"]
+
+    first_booking = client.post(
+        "/appointments",
+        json={"availability_id": availability_id},
+        headers=member_headers
+    )
+    assert first_booking.status_code == 201
+    assert first_booking.json["doctor_id"] == doctor_id
+
+    second_booking = client.post(
+        "/appointments",
+        json={"availability_id": availability_id},
+        headers=member_headers
+    )
+    assert second_booking.status_code == 400
+    assert "already booked" in second_booking.json["error"]
+
+    missing = client.post(
+        "/appointments",
+        json={"availability_id": 9999},
+        headers=member_headers
+    )
+    assert missing.status_code == 400
+    assert "not found" in missing.json["error"]
+
+
+def _book_slots(client, auth_headers, member_headers, count, date="2026-03-10"):
+    """Create a doctor with `count` slots on one day and book all of them."""
+    doctor_response = client.post(
+        "/doctors",
+        json={"name": "Dr. Page", "email": "page@hospital.com"},
+        headers=auth_headers
+    )
+    doctor_id = doctor_response.json["id"]
+
+    for i in range(count):
+        slot = client.post(
+            "/availability",
+            json={
+                "doctor_id": doctor_id,
+                "date": date,
+                "start_time": f"{9 + i:02d}:00:00",
+                "end_time": f"{9 + i:02d}:30:00"
+            },
+            headers=auth_headers
+        )
+        client.post(
+            "/appointments",
+            json={"availability_id": slot.json["id"]},
+            headers=member_headers
+        )
+    return doctor_id
+
+
+def test_list_appointments_keyset_pagination(app, client, auth_headers, member_headers):
+    """Test paging through appointments with limit/cursor at a constant query count."""
+    from sqlalchemy import event
+    from backend.common.db import db
+
+    _book_slots(client, auth_headers, member_headers, 5)
+
+    statements = []
+
+    def count_query(*args):
+        statements.append(1)
+
+    event.listen(db.engine, "before_cursor_execute", count_query)
+    try:
+        first_page = client.get("/appointments?limit=2", headers=auth_headers)
+        first_page_queries = len(statements)
+    finally:
+        event.remove(db.engine, "before_cursor_execute", count_query)
+
+    assert first_page.status_code == 200
+    assert [a["start_time"] for a in first_page.json["items"]] == ["09:00:00", "10:00:00"]
+    assert first_page.json["items"][0]["member_email"] == "member@test.com"
+    assert first_page.json["items"][0]["doctor_name"] == "Dr. Page"
+    assert first_page_queries == 1
+
+    second_page = client.get(
+        f"/appointments?limit=2&cursor={first_page.json['next_cursor']}",
+        headers=auth_headers
+    )
+    last_page = client.get(
+        f"/appointments?limit=2&cursor={second_page.json['next_cursor']}",
+        headers=member_headers
+    )
+
+    assert [a["start_time"] for a in second_page.json["items"]] == ["11:00:00", "12:00:00"]
+    assert [a["start_time"] for a in last_page.json["items"]] == ["13:00:00"]
+    assert last_page.json["next_cursor"] is None
+
+    bad_cursor = client.get("/appointments?cursor=not-a-cursor", headers=auth_headers)
+    assert bad_cursor.status_code == 400
+
+
+def test_doctor_lists_own_appointments(app, client, auth_headers, member_headers,
+                                       doctor_headers, doctor_with_profile):
+    """Test a doctor pages through their own appointments with a date range."""
+    doctor_id = doctor_with_profile["doctor_id"]
+    other_doctor_id = _book_slots(client, auth_headers, member_headers, 1)
+
+    for day in ("2026-04-01", "2026-04-02", "2026-04-03"):
+        slot = client.post(
+            "/availability",
+            json={
+                "doctor_id": doctor_id,
+                "date": day,
+                "start_time": "09:00:00",
+                "end_time": "09:30:00"
+            },
+            headers=auth_headers
+        )
+        client.post(
+            "/appointments",
+            json={"availability_id": slot.json["id"]},
+            headers=member_headers
+        )
+
+    response = client.get(
+        "/appointments?from=2026-04-02&to=2026-04-03&limit=1",
+        headers=doctor_headers
+    )
+
+    assert response.status_code == 200
+    assert [a["date"] for a in response.json["items"]] == ["2026-04-02"]
+    assert response.json["items"][0]["doctor_id"] == doctor_id
+    assert response.json["items"][0]["doctor_id"] != other_doctor_id
+
+    next_page = client.get(
+        f"/appointments?from=2026-04-02&to=2026-04-03&limit=1&cursor={response.json['next_cursor']}",
+        headers=doctor_headers
+    )
+    assert [a["date"] for a in next_page.json["items"]] == ["2026-04-03"]
+    assert next_page.json["next_cursor"] is None
+
+
+def test_book_contiguous_block(client, auth_headers, member_headers):
+    """Test a block booking claims back-to-back slots at once and cancelling frees them all."""
+    doctor_id = client.post(
+        "/doctors",
+        json={"name": "Dr. Block", "email": "block@hospital.com"},
+        headers=auth_headers
+    ).json["id"]
+    for start, end in [("09:00:00", "09:30:00"), ("09:30:00", "10:00:00"),
+                       ("10:00:00", "10:30:00"), ("11:00:00", "11:30:00")]:
+        client.post(
+            "/availability",
+            json={"doctor_id": doctor_id, "date": "2099-06-01", "start_time": start, "end_time": end},
+            headers=auth_headers
+        )
+
+    response = client.post(
+        "/appointments/block",
+        json={"doctor_id": doctor_id, "date": "2099-06-01", "duration_minutes": 60},
+        headers=member_headers
+    )
+
+    assert response.status_code == 201
+    assert response.json["start_time"] == "09:00:00"
+    assert response.json["end_time"] == "10:00:00"
+
+    slots = client.get(f"/availability/doctor/{doctor_id}?from=2099-06-01", headers=member_headers).json["items"]
+    assert [slot["start_time"] for slot in slots] == ["10:00:00", "11:00:00"]
+
+    # 10:00-10:30 and 11:00-11:30 are free but not back to back
+    no_block = client.post(
+        "/appointments/block",
+        json={"doctor_id": doctor_id, "date": "2099-06-01", "duration_minutes": 60},
+        headers=member_headers
+    )
+    assert no_block.status_code == 400
+
+    cancel = client.patch(f"/appointments/{response.json['id']}/cancel", headers=member_headers)
+    assert cancel.status_code == 200
+
+    slots = client.get(f"/availability/doctor/{doctor_id}?from=2099-06-01", headers=member_headers).json["items"]
+    assert len(slots) == 4
+
+    at_start = client.post(
+        "/appointments/block",
+        json={"doctor_id": doctor_id, "date": "2099-06-01", "duration_minutes": 45,
+              "start_time": "09:30:00"},
+        headers=member_headers
+    )
+    assert at_start.status_code == 201
+    assert at_start.json["start_time"] == "09:30:00"
+    assert at_start.json["end_time"] == "10:30:00"
+
+
+def test_sweeper_completes_past_appointments(app, client, auth_headers, member_headers):
+    """Test the sweeper completes only past SCHEDULED appointments, in batches, and is idempotent."""
+    _book_slots(client, auth_headers, member_headers, 5, date="2026-03-10")
+    doctor_id = client.post(
+        "/doctors",
+        json={"name": "Dr. Future", "email": "future@hospital.com"},
+        headers=auth_headers
+    ).json["id"]
+    slot_id = client.post(
+        "/availability",
+        json={"doctor_id": doctor_id, "date": "2099-01-05", "start_time": "09:00:00", "end_time": "09:30:00"},
+        headers=auth_headers
+    ).json["id"]
+    client.post("/appointments", json={"availability_id": slot_id}, headers=member_headers)
+
+    runner = app.test_cli_runner()
+    result = runner.invoke(args=["complete-appointments", "--batch-size", "2"])
+    assert "Completed 5 appointments in 3 batches" in result.output
+
+    items = client.get("/appointments", headers=member_headers).json["items"]
+    assert [item["status"] for item in items] == ["COMPLETED"] * 5 + ["SCHEDULED"]
+
+    rerun = runner.invoke(args=["complete-appointments"])
+    assert "Completed 0 appointments" in rerun.output
+
+
+def test_reschedule_appointment(client, auth_headers, member_headers):
+    """Test rescheduling moves the booking atomically and keeps the old slot if the new one is taken."""
+    doctor_id = client.post(
+        "/doctors",
+        json={"name": "Dr. Move", "email": "move@hospital.com"},
+        headers=auth_headers
+    ).json["id"]
+    slot_ids = [
+        client.post(
+            "/availability",
+            json={"doctor_id": doctor_id, "date": "2099-06-02",
+                  "start_time": f"{9 + i:02d}:00:00", "end_time": f"{9 + i:02d}:30:00"},
+            headers=auth_headers
+        ).json["id"]
+        for i in range(3)
+    ]
+    appointment_id = client.post(
+        "/appointments", json={"availability_id": slot_ids[0]}, headers=member_headers
+    ).json["id"]
+    client.post("/appointments", json={"availability_id": slot_ids[2]}, headers=member_headers)
+
+    taken = client.patch(
+        f"/appointments/{appointment_id}/reschedule",
+        json={"availability_id": slot_ids[2]},
+        headers=member_headers
+    )
+    assert taken.status_code == 400
+
+    moved = client.patch(
+        f"/appointments/{appointment_id}/reschedule",
+        json={"availability_id": slot_ids[1]},
+        headers=member_headers
+    )
+    assert moved.status_code == 200
+    assert moved.json["start_time"] == "10:00:00"
+
+    free = client.get(f"/availability/doctor/{doctor_id}?from=2099-06-02", headers=member_headers).json["items"]
+    assert [slot["id"] for slot in free] == [slot_ids[0]]
+
+    # Admins may reschedule any appointment
+    moved_back = client.patch(
+        f"/appointments/{appointment_id}/reschedule",
+        json={"availability_id": slot_ids[0]},
+        headers=auth_headers
+    )
+    assert moved_back.status_code == 200
+    assert moved_back.json["start_time"] == "09:00:00"
+
+
+def test_member_cannot_double_book_same_time(client, auth_headers, member_headers):
+    """Test a member cannot hold overlapping appointments with different doctors."""
+    slot_ids = []
+    for i, (start, end) in enumerate([("09:00:00", "09:30:00"), ("09:15:00", "09:45:00"),
+                                      ("09:30:00", "10:00:00")]):
+        doctor_id = client.post(
+            "/doctors",
+            json={"name": f"Dr. Overlap {i}", "email": f"overlap{i}@hospital.com"},
+            headers=auth_headers
+        ).json["id"]
+        slot_ids.append(client.post(
+            "/availability",
+            json={"doctor_id": doctor_id, "date": "2099-06-03", "start_time": start, "end_time": end},
+            headers=auth_headers
+        ).json["id"])
+
+    first = client.post("/appointments", json={"availability_id": slot_ids[0]}, headers=member_headers)
+    assert first.status_code == 201
+
+    overlapping = client.post("/appointments", json={"availability_id": slot_ids[1]}, headers=member_headers)
+    assert overlapping.status_code == 400
+    assert overlapping.json["error"] == "You already have an appointment at this time"
+
+    adjacent = client.post("/appointments", json={"availability_id": slot_ids[2]}, headers=member_headers)
+    assert adjacent.status_code == 201
+
+    client.patch(f"/appointments/{first.json['id']}/cancel", headers=member_headers)
+    after_cancel = client.post("/appointments", json={"availability_id": slot_ids[1]}, headers=member_headers)
+    assert after_cancel.status_code == 400
+
+    client.patch(f"/appointments/{adjacent.json['id']}/cancel", headers=member_headers)
+    after_both = client.post("/appointments", json={"availability_id": slot_ids[1]}, headers=member_headers)
+    assert after_both.status_code == 201
+
+
+def test_export_appointments_streams_ndjson_and_csv(client, auth_headers, member_headers):
+    """Test the admin export streams joined rows as NDJSON or CSV within a date range."""
+    import csv
+    import io
+    import json
+
+    _book_slots(client, auth_headers, member_headers, 3, date="2099-04-01")
+
+    ndjson = client.get("/appointments/export?from=2099-04-01", headers=auth_headers)
+    assert ndjson.status_code == 200
+    assert ndjson.is_streamed
+    assert ndjson.mimetype == "application/x-ndjson"
+    rows = [json.loads(line) for line in ndjson.get_data(as_text=True).splitlines()]
+    assert [row["start_time"] for row in rows] == ["09:00:00", "10:00:00", "11:00:00"]
+    assert rows[0]["member_email"] == "member@test.com"
+    assert rows[0]["doctor_name"] == "Dr. Page"
+    assert rows[0]["status"] == "SCHEDULED"
+
+    exported = client.get("/appointments/export?format=csv&to=2099-03-31", headers=auth_headers)
+    assert exported.mimetype == "text/csv"
+    assert list(csv.reader(io.StringIO(exported.get_data(as_text=True)))) == [
+        ["id", "date", "start_time", "end_time", "status",
+         "member_id", "member_email", "doctor_id", "doctor_name"]
+    ]
+
+    assert client.get("/appointments/export?format=xml", headers=auth_headers).status_code == 400
+    assert client.get("/appointments/export", headers=member_headers).status_code == 403
+
+
+def test_concurrent_reschedules_leave_no_orphan_slot(client, auth_headers, member_headers, monkeypatch):
+    """Test the second of two racing reschedules fails without leaving a booked slot behind."""
+    from types import SimpleNamespace
+    from backend.appointments.models import Appointment
+    from backend.appointments.repository import appointment_repository
+    from backend.availability.models import Availability
+
+    doctor_id = client.post(
+        "/doctors",
+        json={"name": "Dr. Race", "email": "race@hospital.com"},
+        headers=auth_headers
+    ).json["id"]
+    slot_ids = [
+        client.post(
+            "/availability",
+            json={"doctor_id": doctor_id, "date": "2099-06-03",
+                  "start_time": f"{9 + i:02d}:00:00", "end_time": f"{9 + i:02d}:30:00"},
+            headers=auth_headers
+        ).json["id"]
+        for i in range(3)
+    ]
+    appointment_id = client.post(
+        "/appointments", json={"availability_id": slot_ids[0]}, headers=member_headers
+    ).json["id"]
+
+    # Both requests read the appointment before either commits
+    row = appointment_repository.find_by_id(appointment_id)
+    stale = SimpleNamespace(**{column: getattr(row, column) for column in (
+        "id", "member_id", "doctor_id", "availability_id", "date", "start_time", "end_time", "status"
+    )})
+
+    responses = []
+    for slot_id in slot_ids[1:]:
+        responses.append(client.patch(
+            f"/appointments/{appointment_id}/reschedule",
+            json={"availability_id": slot_id},
+            headers=member_headers
+        ))
+        monkeypatch.setattr(appointment_repository, "find_by_id", lambda _: stale)
+
+    assert [r.status_code for r in responses] == [200, 400]
+
+    booked = {slot.id for slot in Availability.query.filter_by(is_booked=True)}
+    held = {a.availability_id for a in Appointment.query.filter_by(status="SCHEDULED")}
+    assert booked == held == {slot_ids[1]}
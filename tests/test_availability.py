@@ -45,7 +45,7 @@ def test_get_doctor_availability(client, auth_headers):
         "/availability",
         json={
             "doctor_id": doctor_id,
-            "date": "2026-02-01",
+            "date": "2099-02-01",
             "start_time": "10:00:00",
             "end_time": "10:30:00"
         },
@@ -59,5 +59,414 @@ def test_get_doctor_availability(client, auth_headers):
     )
 
     assert response.status_code == 200
-    assert len(response.json) == 1
-    assert response.json[0]["doctor_id"] == doctor_id
+    assert len(response.json["items"]) == 1
+    assert response.json["items"][0]["doctor_id"] == doctor_id
+    assert response.json["next_cursor"] is None
+
+
+def test_create_availability_from_template(client, auth_headers):
+    """Test expanding a recurring template into slots, skipping holidays and overlaps."""
+    doctor_response = client.post(
+        "/doctors",
+        json={"name": "Dr. Template", "email": "template@hospital.com"},
+        headers=auth_headers
+    )
+    doctor_id = doctor_response.json["id"]
+
+    # Existing slot that overlaps the first template slot on Monday 2030-03-04
+    client.post(
+        "/availability",
+        json={
+            "doctor_id": doctor_id,
+            "date": "2030-03-04",
+            "start_time": "09:10:00",
+            "end_time": "09:30:00"
+        },
+        headers=auth_headers
+    )
+
+    # Mon-Fri 09:00-10:00 in 20-minute slots for one week, skipping Wednesday
+    response = client.post(
+        "/availability/templates",
+        json={
+            "doctor_id": doctor_id,
+            "start_date": "2030-03-04",
+            "end_date": "2030-03-10",
+            "weekdays": [0, 1, 2, 3, 4],
+            "start_time": "09:00:00",
+            "end_time": "10:00:00",
+            "slot_minutes": 20,
+            "skip_dates": ["2030-03-06"]
+        },
+        headers=auth_headers
+    )
+
+    assert response.status_code == 201
+    assert response.json["created"] == 4 * 3 - 2
+    assert response.json["skipped"] == 2
+
+    slots = client.get(f"/availability/doctor/{doctor_id}?from=2030-03-04", headers=auth_headers)
+    assert len(slots.json["items"]) == 11
+    assert "2030-03-06" not in {s["date"] for s in slots.json["items"]}
+
+
+def test_slot_interval_index():
+    """Test the interval index detects overlaps with bisect and accepts adjacent slots."""
+    from datetime import date, time
+    from backend.availability.interval_index import SlotIntervalIndex
+
+    index = SlotIntervalIndex()
+    day = date(2030, 1, 7)
+    index.add(1, day, time(9, 0), time(9, 30))
+    index.add(1, day, time(11, 0), time(11, 30))
+
+    assert index.overlaps(1, day, time(9, 15), time(9, 45))
+    assert index.overlaps(1, day, time(8, 0), time(12, 0))
+    assert not index.overlaps(1, day, time(9, 30), time(11, 0))
+    assert not index.overlaps(2, day, time(9, 0), time(9, 30))
+    assert index.try_add(1, day, time(10, 0), time(10, 30))
+    assert not index.try_add(1, day, time(10, 15), time(10, 45))
+    assert len(index) == 3
+
+
+def test_bulk_import_availability(client, auth_headers):
+    """Test importing slots validates them against existing slots and each other."""
+    doctor_response = client.post(
+        "/doctors",
+        json={"name": "Dr. Import", "email": "import@hospital.com"},
+        headers=auth_headers
+    )
+    doctor_id = doctor_response.json["id"]
+
+    client.post(
+        "/availability",
+        json={
+            "doctor_id": doctor_id,
+            "date": "2030-05-01",
+            "start_time": "09:00:00",
+            "end_time": "09:30:00"
+        },
+        headers=auth_headers
+    )
+
+    response = client.post(
+        "/availability/bulk",
+        json={
+            "doctor_id": doctor_id,
+            "slots": [
+                {"date": "2030-05-01", "start_time": "09:15:00", "end_time": "09:45:00"},
+                {"date": "2030-05-01", "start_time": "10:00:00", "end_time": "10:30:00"},
+                {"date": "2030-05-01", "start_time": "10:15:00", "end_time": "10:45:00"},
+                {"date": "2030-05-02", "start_time": "10:15:00", "end_time": "10:45:00"}
+            ]
+        },
+        headers=auth_headers
+    )
+
+    assert response.status_code == 201
+    assert response.json["created"] == 2
+    assert response.json["skipped"] == 2
+
+
+def test_search_open_slots_across_department(client, auth_headers, member_headers):
+    """Test searching the earliest open slots across a department's doctors."""
+    from datetime import date, timedelta
+
+    department_id = client.post(
+        "/departments", json={"name": "Dermatology"}, headers=auth_headers
+    ).json["id"]
+
+    doctor_ids = []
+    for name in ("Dr. Early", "Dr. Late"):
+        doctor_id = client.post(
+            "/doctors",
+            json={"name": name, "email": f"{name[4:].lower()}@hospital.com"},
+            headers=auth_headers
+        ).json["id"]
+        client.post(
+            "/doctors/assign",
+            json={"doctor_id": doctor_id, "department_id": department_id},
+            headers=auth_headers
+        )
+        doctor_ids.append(doctor_id)
+
+    tomorrow = str(date.today() + timedelta(days=1))
+    yesterday = str(date.today() - timedelta(days=1))
+    slot_ids = {}
+    for doctor_id, day, start in [
+        (doctor_ids[0], yesterday, "08:00"),
+        (doctor_ids[0], tomorrow, "09:00"),
+        (doctor_ids[0], tomorrow, "11:00"),
+        (doctor_ids[1], tomorrow, "08:00"),
+        (doctor_ids[1], tomorrow, "10:00"),
+        (doctor_ids[1], tomorrow, "12:00"),
+    ]:
+        slot_ids[(doctor_id, day, start)] = client.post(
+            "/availability",
+            json={"doctor_id": doctor_id, "date": day,
+                  "start_time": f"{start}:00", "end_time": f"{start[:2]}:30:00"},
+            headers=auth_headers
+        ).json["id"]
+
+    client.post(
+        "/appointments",
+        json={"availability_id": slot_ids[(doctor_ids[1], tomorrow, "08:00")]},
+        headers=member_headers
+    )
+
+    response = client.get(
+        f"/availability/search?department_id={department_id}&limit=3",
+        headers=member_headers
+    )
+
+    assert response.status_code == 200
+    assert [(s["doctor_name"], s["start_time"]) for s in response.json] == [
+        ("Dr. Early", "09:00:00"),
+        ("Dr. Late", "10:00:00"),
+        ("Dr. Early", "11:00:00"),
+    ]
+
+
+def test_search_open_slots_in_large_department(client, auth_headers, member_headers):
+    """Test a department with more doctors than one UNION ALL statement can hold."""
+    from datetime import date, time, timedelta
+    from sqlalchemy import insert
+    from backend.availability.models import Availability
+    from backend.common.db import db
+    from backend.doctors.models import Doctor
+
+    department_id = client.post(
+        "/departments", json={"name": "General Practice"}, headers=auth_headers
+    ).json["id"]
+    db.session.execute(insert(Doctor), [
+        {"name": f"Dr. {i}", "email": f"gp{i}@hospital.com", "department_id": department_id}
+        for i in range(600)
+    ])
+    doctor_ids = [doctor.id for doctor in Doctor.query.order_by(Doctor.id)]
+
+    # Only the last doctor, in the last batch, has an early slot
+    day = date.today() + timedelta(days=1)
+    db.session.execute(insert(Availability), [
+        {"doctor_id": doctor_id, "date": day, "start_time": time(hour), "end_time": time(hour, 30),
+         "is_booked": False}
+        for doctor_id, hour in [(doctor_id, 9) for doctor_id in doctor_ids[:-1]] + [(doctor_ids[-1], 7)]
+    ])
+    db.session.commit()
+
+    response = client.get(f"/availability/search?department_id={department_id}&limit=3", headers=member_headers)
+
+    assert response.status_code == 200
+    assert [(s["doctor_id"], s["start_time"]) for s in response.json] == [
+        (doctor_ids[-1], "07:00:00"),
+        (doctor_ids[0], "09:00:00"),
+        (doctor_ids[1], "09:00:00"),
+    ]
+
+
+def test_doctor_availability_date_range(client, auth_headers):
+    """Test past slots are excluded by default, from/to/limit narrow the listing and capped pages carry a cursor."""
+    from datetime import date, timedelta
+
+    doctor_id = client.post(
+        "/doctors",
+        json={"name": "Dr. Range", "email": "range@hospital.com"},
+        headers=auth_headers
+    ).json["id"]
+
+    days = [date.today() + timedelta(days=offset) for offset in (-3, 1, 2, 3)]
+    for day in days:
+        client.post(
+            "/availability",
+            json={"doctor_id": doctor_id, "date": str(day),
+                  "start_time": "09:00:00", "end_time": "09:30:00"},
+            headers=auth_headers
+        )
+
+    default = client.get(f"/availability/doctor/{doctor_id}", headers=auth_headers)
+    assert [s["date"] for s in default.json["items"]] == [str(d) for d in days[1:]]
+    assert default.json["next_cursor"] is None
+
+    window = client.get(
+        f"/availability/doctor/{doctor_id}?from={days[0]}&to={days[2]}&limit=2",
+        headers=auth_headers
+    )
+    assert [s["date"] for s in window.json["items"]] == [str(days[0]), str(days[1])]
+    assert window.json["next_cursor"] is not None
+
+    # The capped page hands out a cursor to the rest of the window
+    rest = client.get(
+        f"/availability/doctor/{doctor_id}?from={days[0]}&to={days[2]}&limit=2"
+        f"&cursor={window.json['next_cursor']}",
+        headers=auth_headers
+    )
+    assert [s["date"] for s in rest.json["items"]] == [str(days[2])]
+    assert rest.json["next_cursor"] is None
+
+    admin_list = client.get("/availability?limit=2", headers=auth_headers)
+    assert [s["date"] for s in admin_list.json["items"]] == [str(days[1]), str(days[2])]
+    assert admin_list.json["items"][0]["doctor_name"] == "Dr. Range"
+    admin_rest = client.get(f"/availability?limit=2&cursor={admin_list.json['next_cursor']}",
+                            headers=auth_headers)
+    assert [s["date"] for s in admin_rest.json["items"]] == [str(days[3])]
+    assert admin_rest.json["next_cursor"] is None
+
+    bad_cursor = client.get(f"/availability/doctor/{doctor_id}?cursor=garbage", headers=auth_headers)
+    assert bad_cursor.status_code == 400
+
+    too_many = client.get(f"/availability/doctor/{doctor_id}?limit=100000", headers=auth_headers)
+    assert too_many.status_code == 400
+
+
+def test_available_slots_cache_invalidated_on_booking(client, auth_headers, member_headers):
+    """Test repeated reads are cache hits and a booking evicts the doctor's cached windows."""
+    from datetime import date, timedelta
+    from backend.availability.cache import availability_cache
+
+    doctor_id = client.post(
+        "/doctors",
+        json={"name": "Dr. Cache", "email": "cache@hospital.com"},
+        headers=auth_headers
+    ).json["id"]
+    slot_id = client.post(
+        "/availability",
+        json={"doctor_id": doctor_id, "date": str(date.today() + timedelta(days=1)),
+              "start_time": "09:00:00", "end_time": "09:30:00"},
+        headers=auth_headers
+    ).json["id"]
+
+    first = client.get(f"/availability/doctor/{doctor_id}", headers=member_headers)
+    second = client.get(f"/availability/doctor/{doctor_id}", headers=member_headers)
+    assert first.json == second.json
+    assert len(first.json["items"]) == 1
+    assert availability_cache.stats()["hits"] == 1
+
+    client.post("/appointments", json={"availability_id": slot_id}, headers=member_headers)
+
+    after_booking = client.get(f"/availability/doctor/{doctor_id}", headers=member_headers)
+    assert after_booking.json == {"items": [], "next_cursor": None}
+
+    stats = client.get("/metrics", headers=auth_headers).json["availability_cache"]
+    assert stats["hits"] == 1
+    assert stats["stale"] == 1
+    assert stats["invalidations"] == 2
+
+
+def test_version_board_shared_between_workers(tmp_path):
+    """Test a bump through one mapping of the version file is seen by another."""
+    from backend.common.versions import VersionBoard
+
+    path = str(tmp_path / "versions.bin")
+    worker_a = VersionBoard(path, stripes=16)
+    worker_b = VersionBoard(path, stripes=16)
+
+    assert worker_b.get(7) == 0
+    worker_a.bump(7)
+    assert worker_b.get(7) == 1
+    assert worker_b.get(8) == 0
+
+    worker_a.close()
+    worker_b.close()
+
+
+def test_version_board_epoch_changes_with_a_new_file(tmp_path):
+    """Test the epoch is kept by every mapping of a file and redrawn when the file is recreated."""
+    import os
+    from backend.common.versions import VersionBoard
+
+    path = str(tmp_path / "versions.bin")
+    first = VersionBoard(path, stripes=16)
+    again = VersionBoard(path, stripes=16)
+    epoch = first.epoch
+    assert again.epoch == epoch != 0
+    first.close()
+    again.close()
+
+    os.remove(path)
+    recreated = VersionBoard(path, stripes=16)
+    assert recreated.epoch != epoch
+    assert recreated.get(7) == 0
+    recreated.close()
+
+
+def test_lru_cache_evicts_least_recently_used():
+    """Test the LRU keeps recently read keys and counts evictions."""
+    from backend.common.cache import LRUCache
+
+    cache = LRUCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.stats()["evictions"] == 1
+
+
+def test_day_grid_free_windows_and_utilization():
+    """Test the bitset grid merges adjacent free slots and ignores partly covered cells."""
+    from datetime import time
+    from backend.availability.schedule_grid import DayGrid
+
+    grid = DayGrid.from_rows([
+        (time(9, 0), time(9, 30), False),
+        (time(9, 30), time(10, 0), False),
+        (time(10, 0), time(10, 30), True),
+        (time(11, 2), time(11, 30), False),
+    ])
+
+    assert grid.free_windows(60) == [(time(9, 0), time(10, 0))]
+    assert grid.free_windows(25) == [(time(9, 0), time(10, 0)), (time(11, 5), time(11, 30))]
+    assert grid.free_windows(61) == []
+    assert grid.utilization() == 6 / 23
+
+    other = DayGrid.from_rows([(time(9, 45), time(10, 15), False)])
+    assert grid.overlaps(other)
+    assert grid.overlap_windows(other) == [(time(9, 45), time(10, 15))]
+    assert not grid.overlaps(DayGrid.from_rows([(time(12, 0), time(13, 0), False)]))
+
+
+def test_get_free_windows(client, auth_headers, member_headers):
+    """Test the free-window endpoint excludes booked slots and reports utilization."""
+    doctor_id = client.post(
+        "/doctors",
+        json={"name": "Dr. Grid", "email": "grid@hospital.com"},
+        headers=auth_headers
+    ).json["id"]
+    slot_ids = [
+        client.post(
+            "/availability",
+            json={"doctor_id": doctor_id, "date": "2099-05-04",
+                  "start_time": start, "end_time": end},
+            headers=auth_headers
+        ).json["id"]
+        for start, end in [("09:00:00", "09:30:00"), ("09:30:00", "10:00:00"), ("10:00:00", "10:30:00")]
+    ]
+    client.post("/appointments", json={"availability_id": slot_ids[2]}, headers=member_headers)
+
+    response = client.get(
+        f"/availability/doctor/{doctor_id}/free-windows?date=2099-05-04&duration=45",
+        headers=member_headers
+    )
+
+    assert response.status_code == 200
+    assert response.json["free_windows"] == [{"start_time": "09:00:00", "end_time": "10:00:00"}]
+    assert response.json["utilization"] == round(1 / 3, 4)
+
+    missing_date = client.get(f"/availability/doctor/{doctor_id}/free-windows", headers=member_headers)
+    assert missing_date.status_code == 400
+
+
+def test_default_version_file_follows_the_database(app):
+    """Test apps on different databases never share a version file, and in-memory ones use none."""
+    from backend.common.versions import default_board_path
+
+    app.config["SQLALCHEMY_DATABASE_URI"] = "mysql+pymysql://app@db1/healthcare"
+    first = default_board_path(app, "availability-versions")
+    app.config["SQLALCHEMY_DATABASE_URI"] = "mysql+pymysql://app@db2/healthcare"
+    second = default_board_path(app, "availability-versions")
+    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///:memory:"
+
+    assert first != second
+    assert "availability-versions" in first
+    assert default_board_path(app, "availability-versions") is None
@@ -50,3 +50,185 @@ def test_assign_doctor_to_department(client, auth_headers):
     # Verify assignment
     list_response = client.get("/doctors", headers=auth_headers)
     assert list_response.json[0]["department"] == "Cardiology"
+
+
+def test_cancel_doctor_day(client, auth_headers, member_headers, member_user):
+    """Test cancelling a doctor's day frees its slots and reports members, at a constant query count."""
+    from sqlalchemy import event
+    from backend.common.db import db
+    from backend.appointments.models import Appointment
+
+    doctor_id = client.post(
+        "/doctors",
+        json={"name": "Dr. Sick", "email": "sick@hospital.com"},
+        headers=auth_headers
+    ).json["id"]
+    slot_ids = [
+        client.post(
+            "/availability",
+            json={"doctor_id": doctor_id, "date": day, "start_time": start, "end_time": end},
+            headers=auth_headers
+        ).json["id"]
+        for day, start, end in [
+            ("2099-07-01", "09:00:00", "09:30:00"),
+            ("2099-07-01", "09:30:00", "10:00:00"),
+            ("2099-07-01", "10:00:00", "10:30:00"),
+            ("2099-07-02", "09:00:00", "09:30:00"),
+            ("2099-07-02", "09:30:00", "10:00:00"),
+        ]
+    ]
+    for slot_id in slot_ids[:3] + slot_ids[3:4]:
+        client.post("/appointments", json={"availability_id": slot_id}, headers=member_headers)
+
+    # An appointment that already took place keeps its slot
+    completed = Appointment.query.filter_by(availability_id=slot_ids[2]).one()
+    completed.status = "COMPLETED"
+    db.session.commit()
+
+    statements = []
+
+    def count_query(*args):
+        statements.append(1)
+
+    event.listen(db.engine, "before_cursor_execute", count_query)
+    try:
+        response = client.post(
+            f"/doctors/{doctor_id}/cancel-day",
+            json={"from": "2099-07-01"},
+            headers=auth_headers
+        )
+    finally:
+        event.remove(db.engine, "before_cursor_execute", count_query)
+
+    assert response.status_code == 200
+    assert response.json["cancelled"] == 2
+    assert response.json["slots_freed"] == 2
+    assert response.json["member_ids"] == [member_user["id"]]
+    # Four statements, plus one load of the doctor's (empty) waitlist queue
+    assert len(statements) == 5
+
+    slots = client.get(f"/availability/doctor/{doctor_id}?from=2099-07-01&to=2099-07-01",
+                       headers=member_headers).json["items"]
+    assert [slot["id"] for slot in slots] == slot_ids[:2]
+
+    deleted = client.post(
+        f"/doctors/{doctor_id}/cancel-day",
+        json={"from": "2099-07-02", "slots": "delete"},
+        headers=auth_headers
+    )
+    assert deleted.json["cancelled"] == 1
+    assert deleted.json["slots_deleted"] == 1
+
+    # The slot behind the cancelled appointment is kept but not bookable
+    slots = client.get(f"/availability/doctor/{doctor_id}?from=2099-07-02", headers=member_headers).json["items"]
+    assert slots == []
+
+    past = client.post(f"/doctors/{doctor_id}/cancel-day", json={"from": "2020-01-01"}, headers=auth_headers)
+    assert past.status_code == 400
+
+
+def test_my_agenda_with_etag(client, auth_headers, member_headers, doctor_headers, doctor_with_profile):
+    """Test the agenda inlines bookings in one query and answers unchanged refreshes with 304."""
+    from sqlalchemy import event
+    from backend.common.db import db
+
+    doctor_id = doctor_with_profile["doctor_id"]
+    slot_ids = [
+        client.post(
+            "/availability",
+            json={"doctor_id": doctor_id, "date": "2099-07-06", "start_time": start, "end_time": end},
+            headers=auth_headers
+        ).json["id"]
+        for start, end in [("10:00:00", "10:30:00"), ("09:00:00", "09:30:00")]
+    ]
+    appointment_id = client.post(
+        "/appointments", json={"availability_id": slot_ids[0]}, headers=member_headers
+    ).json["id"]
+
+    first = client.get("/doctors/me/agenda?date=2099-07-06", headers=doctor_headers)
+    assert first.status_code == 200
+    assert [slot["start_time"] for slot in first.json["slots"]] == ["09:00:00", "10:00:00"]
+    assert first.json["slots"][0]["appointment_id"] is None
+    assert first.json["slots"][1]["appointment_id"] == appointment_id
+    assert first.json["slots"][1]["member_email"] == "member@test.com"
+    assert first.json["slots"][1]["status"] == "SCHEDULED"
+
+    statements = []
+
+    def count_query(*args):
+        statements.append(1)
+
+    event.listen(db.engine, "before_cursor_execute", count_query)
+    try:
+        unchanged = client.get(
+            "/doctors/me/agenda?date=2099-07-06",
+            headers={**doctor_headers, "If-None-Match": first.headers["ETag"]}
+        )
+    finally:
+        event.remove(db.engine, "before_cursor_execute", count_query)
+
+    assert unchanged.status_code == 304
+    assert statements == []
+
+    client.patch(f"/appointments/{appointment_id}/cancel", headers=member_headers)
+
+    event.listen(db.engine, "before_cursor_execute", count_query)
+    try:
+        changed = client.get(
+            "/doctors/me/agenda?date=2099-07-06",
+            headers={**doctor_headers, "If-None-Match": first.headers["ETag"]}
+        )
+    finally:
+        event.remove(db.engine, "before_cursor_execute", count_query)
+
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != first.headers["ETag"]
+    assert changed.json["slots"][1]["appointment_id"] is None
+    assert len(statements) == 1
+
+
+def test_doctor_id_claim_after_link(app, client, auth_headers, doctor_user):
+    """Linking a profile rejects older tokens; new ones carry doctor_id and need no identity lookup."""
+    from sqlalchemy import event
+    from backend.common.db import db
+
+    credentials = {"email": "doctor@test.com", "password": "password123"}
+    before = client.post("/auth/login", json=credentials).json
+    old_headers = {"Authorization": f"Bearer {before['access_token']}"}
+    assert client.get("/auth/me", headers=old_headers).status_code == 200
+
+    doctor_id = client.post(
+        "/doctors",
+        json={"name": "Dr. Claim", "email": "claim@hospital.com"},
+        headers=auth_headers
+    ).json["id"]
+    linked = client.post(f"/doctors/{doctor_id}/link-user",
+                         json={"user_id": doctor_user["id"]}, headers=auth_headers)
+    assert linked.status_code == 200
+
+    assert client.get("/auth/me", headers=old_headers).status_code == 401
+
+    assert client.post("/auth/refresh",
+                       headers={"Authorization": f"Bearer {before['refresh_token']}"}).status_code == 401
+
+    after = client.post("/auth/login", json=credentials).json
+    headers = {"Authorization": f"Bearer {after['access_token']}"}
+
+    client.get("/availability/my", headers=headers)
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", capture)
+    try:
+        response = client.get("/availability/my", headers=headers)
+        me = client.get("/doctors/me", headers=headers)
+    finally:
+        event.remove(db.engine, "before_cursor_execute", capture)
+
+    assert response.status_code == 200
+    assert me.json["id"] == doctor_id
+    assert not [s for s in statements if "FROM users" in s]
+    # Only /doctors/me reads the profile itself
+    assert len([s for s in statements if "FROM doctors" in s]) == 1
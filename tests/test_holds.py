@@ -0,0 +1,165 @@
+"""
+Tests for slot hold API.
+"""
+from datetime import datetime
+
+import pytest
+from flask_jwt_extended import create_access_token
+
+from backend.common.db import db
+from backend.auth.models import User
+from backend.common.security import hash_password
+
+
+@pytest.fixture
+def other_member_headers(app):
+    """Return headers for a second member competing for the same slots."""
+    with app.app_context():
+        user = User(email="other@test.com", password=hash_password("password123"), role="MEMBER")
+        db.session.add(user)
+        db.session.commit()
+        token = create_access_token(identity=user.id, additional_claims={"role": "MEMBER"})
+    return {"Authorization": f"Bearer {token}"}
+
+
+def _create_slots(client, auth_headers, count=1):
+    doctor_id = client.post(
+        "/doctors",
+        json={"name": "Dr. Hold", "email": "hold@hospital.com"},
+        headers=auth_headers
+    ).json["id"]
+    return [
+        client.post(
+            "/availability",
+            json={"doctor_id": doctor_id, "date": "2099-10-05",
+                  "start_time": f"{9 + i:02d}:00:00", "end_time": f"{9 + i:02d}:30:00"},
+            headers=auth_headers
+        ).json["id"]
+        for i in range(count)
+    ]
+
+
+def test_hold_then_book(client, auth_headers, member_headers, other_member_headers):
+    """Test a held slot can only be booked by its holder, who converts the hold."""
+    slot_id, other_slot_id = _create_slots(client, auth_headers, 2)
+
+    hold = client.post("/holds", json={"availability_id": slot_id}, headers=member_headers)
+    assert hold.status_code == 201
+    assert "expires_at" in hold.json
+
+    assert client.post("/holds", json={"availability_id": slot_id},
+                       headers=other_member_headers).status_code == 400
+    assert client.post("/appointments", json={"availability_id": slot_id},
+                       headers=other_member_headers).status_code == 400
+
+    wrong_slot = client.post(
+        "/appointments",
+        json={"availability_id": other_slot_id, "hold_id": hold.json["id"]},
+        headers=member_headers
+    )
+    assert wrong_slot.status_code == 400
+
+    booked = client.post(
+        "/appointments",
+        json={"availability_id": slot_id, "hold_id": hold.json["id"]},
+        headers=member_headers
+    )
+    assert booked.status_code == 201
+
+    # The hold was converted into the appointment
+    assert client.delete(f"/holds/{hold.json['id']}", headers=member_headers).status_code == 400
+
+
+def test_expired_hold_is_ignored_and_swept(app, client, auth_headers, member_headers, other_member_headers):
+    """Test an expired hold no longer blocks others and is deleted by the next hold."""
+    from backend.holds.models import SlotHold
+
+    slot_id, = _create_slots(client, auth_headers)
+
+    app.config["BOOKING_HOLD_TTL_SECONDS"] = 0
+    expired = client.post("/holds", json={"availability_id": slot_id}, headers=member_headers)
+    app.config["BOOKING_HOLD_TTL_SECONDS"] = 120
+
+    expired_booking = client.post(
+        "/appointments",
+        json={"availability_id": slot_id, "hold_id": expired.json["id"]},
+        headers=member_headers
+    )
+    assert expired_booking.status_code == 400
+
+    taken = client.post("/holds", json={"availability_id": slot_id}, headers=other_member_headers)
+    assert taken.status_code == 201
+    assert SlotHold.query.count() == 1
+
+    assert client.delete(f"/holds/{taken.json['id']}", headers=member_headers).status_code == 403
+    assert client.delete(f"/holds/{taken.json['id']}", headers=other_member_headers).status_code == 200
+    assert SlotHold.query.count() == 0
+
+
+def test_active_holds_per_member_are_capped(app, client, auth_headers, member_headers):
+    """Test a member cannot hold more than MAX_ACTIVE_HOLDS slots at once."""
+    slot_ids = _create_slots(client, auth_headers, 3)
+    app.config["MAX_ACTIVE_HOLDS"] = 2
+
+    responses = [
+        client.post("/holds", json={"availability_id": slot_id}, headers=member_headers)
+        for slot_id in slot_ids
+    ]
+
+    assert [r.status_code for r in responses] == [201, 201, 400]
+
+    # Re-holding a slot already held extends it instead of counting twice
+    again = client.post("/holds", json={"availability_id": slot_ids[0]}, headers=member_headers)
+    assert again.status_code == 201
+    assert again.json["id"] == responses[0].json["id"]
+
+
+def test_rehold_extends_in_place(app, client, auth_headers, member_headers):
+    """Test re-holding keeps the hold id and never shortens a longer hold."""
+    slot_id, = _create_slots(client, auth_headers)
+
+    app.config["BOOKING_HOLD_TTL_SECONDS"] = 900
+    first = client.post("/holds", json={"availability_id": slot_id}, headers=member_headers)
+    app.config["BOOKING_HOLD_TTL_SECONDS"] = 120
+    again = client.post("/holds", json={"availability_id": slot_id}, headers=member_headers)
+
+    assert again.status_code == 201
+    assert again.json == first.json
+    assert client.delete(f"/holds/{first.json['id']}", headers=member_headers).status_code == 200
+
+
+def test_concurrent_hold_loses_cleanly(client, auth_headers, member_headers, other_member_headers, monkeypatch):
+    """Test a hold that raced past the check neither errors nor wipes the live hold."""
+    from backend.holds.models import SlotHold
+    from backend.holds.repository import slot_hold_repository
+
+    slot_id, = _create_slots(client, auth_headers)
+    first = client.post("/holds", json={"availability_id": slot_id}, headers=member_headers)
+
+    # As if both requests had read the slot before either hold was written
+    monkeypatch.setattr(slot_hold_repository, "find_active_for_slots", lambda ids, now: [])
+    second = client.post("/holds", json={"availability_id": slot_id}, headers=other_member_headers)
+
+    assert second.status_code == 400
+    assert second.json["error"] == "This time slot is held for another member"
+    assert [hold.id for hold in SlotHold.query.all()] == [first.json["id"]]
+
+
+def test_held_slot_cannot_be_deleted(app, client, auth_headers, member_headers):
+    """Test a live hold keeps its slot, and an expired one is deleted with it."""
+    from backend.holds.models import SlotHold
+
+    slot_id, = _create_slots(client, auth_headers)
+    hold = client.post("/holds", json={"availability_id": slot_id}, headers=member_headers)
+    assert hold.status_code == 201
+
+    refused = client.delete(f"/availability/{slot_id}", headers=auth_headers)
+    assert refused.status_code == 400
+    assert refused.json["error"] == "Cannot delete a held slot"
+
+    # As if the hold had run out
+    db.session.get(SlotHold, hold.json["id"]).expires_at = datetime(2000, 1, 1)
+    db.session.commit()
+
+    assert client.delete(f"/availability/{slot_id}", headers=auth_headers).status_code == 200
+    assert SlotHold.query.count() == 0
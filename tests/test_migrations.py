@@ -0,0 +1,128 @@
+"""
+Tests for schema migrations and index usage of repository queries.
+"""
+from datetime import date, datetime, time
+
+import pytest
+from sqlalchemy import event, inspect, text
+
+from backend.common.db import db
+from backend.common.migrations import SchemaMigration, applied_versions, run_migrations
+from backend.migrations import MIGRATIONS
+from backend.appointments.repository import appointment_repository
+from backend.auth.repository import user_repository
+from backend.availability.repository import availability_repository
+from backend.doctors.repository import doctor_repository
+from backend.reimbursements.repository import reimbursement_repository
+from backend.holds.repository import slot_hold_repository
+from backend.waitlist.repository import waitlist_repository
+
+
+def test_migrations_recorded_and_idempotent(app):
+    """All migrations are recorded at startup and a second run applies nothing."""
+    assert applied_versions() == {m.VERSION for m in MIGRATIONS}
+    assert run_migrations() == []
+
+
+def test_migration_adds_indexes_to_existing_database(app):
+    """A database created before the indexes existed is upgraded in place."""
+    db.session.execute(text("DROP INDEX ix_availability_doctor_date_start_end"))
+    db.session.query(SchemaMigration).delete()
+    db.session.commit()
+
+    assert run_migrations() == [m.VERSION for m in MIGRATIONS]
+
+    names = {i["name"] for i in inspect(db.engine).get_indexes("availability")}
+    assert "ix_availability_doctor_date_start_end" in names
+
+
+REPOSITORY_QUERIES = [
+    lambda: appointment_repository.find_by_member_id(1),
+    lambda: appointment_repository.find_by_doctor_id(1),
+    lambda: appointment_repository.find_by_availability_id(1),
+    lambda: appointment_repository.find_page(10),
+    lambda: appointment_repository.find_page(10, after=(date(2026, 1, 1), time(9, 0), 5), member_id=1),
+    lambda: appointment_repository.find_page(10, doctor_id=1, date_from=date(2026, 1, 1)),
+    lambda: appointment_repository.has_member_conflict(1, date(2026, 1, 1), time(9, 0), time(9, 30)),
+    lambda: appointment_repository.has_member_conflict(1, date(2026, 1, 1), time(9, 0), time(9, 30), 5),
+    lambda: list(appointment_repository.iter_export_rows(date(2026, 1, 1), date(2026, 2, 1))),
+    lambda: appointment_repository.find_busy_intervals(1, date(2026, 1, 1)),
+    lambda: appointment_repository.find_past_scheduled_keys(datetime(2026, 1, 1, 12), None, 500),
+    lambda: appointment_repository.find_past_scheduled_keys(datetime(2026, 1, 1, 12), (date(2025, 12, 1), 7), 500),
+    lambda: appointment_repository.complete([1, 2, 3], datetime(2026, 1, 1, 12)),
+    lambda: appointment_repository.find_scheduled_in_range(1, date(2026, 1, 1), date(2026, 1, 2)),
+    lambda: appointment_repository.cancel_in_range(1, date(2026, 1, 1), date(2026, 1, 2)),
+    lambda: availability_repository.find_by_id_with_lock(1),
+    lambda: availability_repository.find_doctor_id(1),
+    lambda: availability_repository.find_by_doctor_id(1),
+    lambda: availability_repository.find_available_by_doctor_id(1),
+    lambda: availability_repository.find_available_by_doctor_id(1, date(2026, 1, 1), date(2026, 2, 1), 50),
+    lambda: availability_repository.find_by_doctor_id(1, date(2026, 1, 1), None, 50),
+    lambda: availability_repository.find_in_range(date(2026, 1, 1), None, 50),
+    lambda: availability_repository.find_available_by_doctor_id(1, date(2026, 1, 1), None, 50,
+                                                                 (date(2026, 1, 2), time(9, 0), 7)),
+    lambda: availability_repository.find_in_range(date(2026, 1, 1), None, 50, (date(2026, 1, 2), time(9, 0), 7)),
+    lambda: availability_repository.check_overlap(1, date(2026, 1, 1), time(9, 0), time(9, 30)),
+    lambda: availability_repository.claim(1),
+    lambda: availability_repository.claim_many([1, 2, 3]),
+    lambda: availability_repository.release(1),
+    lambda: availability_repository.release_range(1, date(2026, 1, 1), time(9, 0), time(10, 0)),
+    lambda: availability_repository.set_booked_in_range(1, date(2026, 1, 1), date(2026, 1, 2), False),
+    lambda: availability_repository.release_for_appointments(1, date(2026, 1, 1), date(2026, 1, 2), [1, 2]),
+    lambda: availability_repository.delete_unreferenced_in_range(1, date(2026, 1, 1), date(2026, 1, 2)),
+    lambda: availability_repository.find_free_day_slots(1, date(2026, 1, 1)),
+    lambda: availability_repository.find_agenda(1, date(2026, 1, 1)),
+    lambda: availability_repository.find_day_rows(1, date(2026, 1, 1)),
+    lambda: availability_repository.find_open_slots_for_doctors([1, 2], date(2026, 1, 1), None, 20),
+    lambda: reimbursement_repository.find_by_member_id(1),
+    lambda: reimbursement_repository.find_by_appointment_id(1),
+    lambda: reimbursement_repository.get_pending(),
+    lambda: slot_hold_repository.find_active_for_slots([1, 2], datetime(2026, 1, 1, 12)),
+    lambda: slot_hold_repository.find_for_slots([1, 2]),
+    lambda: slot_hold_repository.find_in_range(1, date(2026, 1, 1), date(2026, 1, 2)),
+    lambda: slot_hold_repository.delete_for_slots([1, 2]),
+    lambda: slot_hold_repository.count_active_for_member(1, datetime(2026, 1, 1, 12)),
+    lambda: slot_hold_repository.find_expired(datetime(2026, 1, 1, 12)),
+    lambda: slot_hold_repository.delete_expired(1, datetime(2026, 1, 1, 12)),
+    lambda: waitlist_repository.expire_offer(1, 1),
+    lambda: waitlist_repository.find_by_member_id(1),
+    lambda: waitlist_repository.find_waiting(1, 1),
+    lambda: waitlist_repository.find_waiting_keys(1),
+    lambda: waitlist_repository.offer(1, 1, datetime(2026, 1, 1, 12)),
+    lambda: user_repository.find_by_email("member@test.com"),
+    lambda: user_repository.find_existing_emails(["member@test.com", "other@test.com"]),
+    lambda: user_repository.find_claims_changes(datetime(2026, 1, 1, 12)),
+    lambda: user_repository.delete_claims_changes_before(datetime(2026, 1, 1, 12)),
+    lambda: doctor_repository.find_by_user_id(1),
+    lambda: doctor_repository.find_by_email("drtest@hospital.com"),
+    lambda: doctor_repository.find_by_department_id(1),
+    lambda: doctor_repository.find_id_by_user_id(1),
+]
+
+
+@pytest.mark.parametrize("query", REPOSITORY_QUERIES)
+def test_repository_query_uses_index(app, query):
+    """EXPLAIN every repository lookup and fail on any full table scan."""
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        captured.append((statement, parameters))
+
+    event.listen(db.engine, "before_cursor_execute", capture)
+    try:
+        query()
+    finally:
+        event.remove(db.engine, "before_cursor_execute", capture)
+        db.session.rollback()
+
+    assert captured
+    for statement, parameters in captured:
+        plan = db.session.connection().exec_driver_sql(
+            "EXPLAIN QUERY PLAN " + statement, parameters
+        ).fetchall()
+        for row in plan:
+            detail = row[-1]
+            words = detail.split()
+            # Scans of subquery results (anon_N) are fine; base tables must use an index
+            if words[0] == "SCAN" and words[1] in db.metadata.tables:
+                assert "USING" in detail, f"Full table scan: {detail}\n{statement}"
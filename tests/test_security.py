@@ -217,3 +217,378 @@ class TestUnauthorizedAccess:
             headers=member_headers
         )
         assert response.status_code == 403
+
+
+class TestPasswordHashing:
+    """Tests for pooled password hashing."""
+
+    def test_login_rehashes_outdated_hash(self, app, client):
+        """A hash made with old parameters is replaced on successful login."""
+        from werkzeug.security import generate_password_hash
+        from backend.auth.models import User
+        from backend.common.db import db
+
+        user = User(
+            email="legacy@test.com",
+            password=generate_password_hash("password123", "pbkdf2:sha256:1000"),
+            role="MEMBER"
+        )
+        db.session.add(user)
+        db.session.commit()
+
+        response = client.post("/auth/login", json={"email": "legacy@test.com", "password": "password123"})
+        assert response.status_code == 200
+
+        db.session.refresh(user)
+        assert user.password.startswith("scrypt:")
+
+        again = client.post("/auth/login", json={"email": "legacy@test.com", "password": "password123"})
+        assert again.status_code == 200
+
+    def test_hashing_backpressure_and_metrics(self, app, client, auth_headers):
+        """Calls beyond the pending limit get 503; completed calls are timed."""
+        from backend.common.security import password_hasher
+
+        client.post("/auth/register", json={"email": "busy@test.com", "password": "password123"})
+
+        max_pending = password_hasher.max_pending
+        password_hasher.max_pending = 0
+        try:
+            response = client.post("/auth/login", json={"email": "busy@test.com", "password": "password123"})
+        finally:
+            password_hasher.max_pending = max_pending
+
+        assert response.status_code == 503
+
+        stats = client.get("/metrics", headers=auth_headers).json["password_hashing"]
+        assert stats["rejected"] == 1
+        assert stats["hash"]["calls"] >= 1
+        assert stats["pending"] == 0
+
+    def test_timed_out_call_stays_pending_until_its_worker_is_done(self, app, monkeypatch):
+        """A call that timed out keeps counting against the pending limit while it still runs."""
+        import threading
+        import pytest
+        from concurrent.futures import ThreadPoolExecutor
+        from backend.common.exceptions import ServiceUnavailableError
+        from backend.common.security import password_hasher
+
+        gate = threading.Event()
+        executor = ThreadPoolExecutor(1)
+        monkeypatch.setattr(password_hasher, "_executor", executor)
+        monkeypatch.setattr(password_hasher, "timeout", 0.05)
+
+        with pytest.raises(ServiceUnavailableError):
+            password_hasher._call("verify", gate.wait)
+        assert password_hasher.stats()["pending"] == 1
+
+        gate.set()
+        executor.shutdown(wait=True)
+        assert password_hasher.stats()["pending"] == 0
+
+    def test_broken_pool_is_replaced(self, app, monkeypatch):
+        """A pool whose worker died answers 503 once; the next call gets a new pool."""
+        import os
+        import pytest
+        from concurrent.futures import ProcessPoolExecutor
+        from backend.common.exceptions import ServiceUnavailableError
+        from backend.common.security import password_hasher
+
+        broken = ProcessPoolExecutor(1)
+        monkeypatch.setattr(password_hasher, "_executor", broken)
+
+        with pytest.raises(ServiceUnavailableError):
+            password_hasher._call("verify", os._exit, 1)
+        assert password_hasher._executor is None
+
+        try:
+            assert password_hasher._call("verify", abs, -3) == 3
+        finally:
+            password_hasher._executor.shutdown()
+        assert password_hasher.stats()["pending"] == 0
+
+
+class TestUserImport:
+    """Tests for bulk user import."""
+
+    CSV = (
+        "email,password\n"
+        "new1@test.com,password123\n"
+        "member@test.com,password123\n"
+        "not-an-email,password123\n"
+        "new2@test.com,password123\n"
+        "new1@test.com,otherpass123\n"
+        "new3@test.com,password123\n"
+    )
+
+    def test_import_dedupes_and_batches(self, app, client, auth_headers, member_user):
+        """Existing and repeated emails are skipped, invalid rows counted, one INSERT per chunk."""
+        from sqlalchemy import event
+        from backend.auth.importer import user_importer
+        from backend.common.db import db
+
+        inserts = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            if statement.startswith("INSERT INTO users"):
+                inserts.append(statement)
+
+        chunk_size, user_importer.chunk_size = user_importer.chunk_size, 3
+        event.listen(db.engine, "before_cursor_execute", capture)
+        try:
+            response = client.post("/auth/users/import", data=self.CSV,
+                                   content_type="text/csv", headers=auth_headers)
+        finally:
+            event.remove(db.engine, "before_cursor_execute", capture)
+            user_importer.chunk_size = chunk_size
+
+        assert response.status_code == 200
+        assert {k: response.json[k] for k in ("rows", "created", "existing", "invalid", "chunks")} == {
+            "rows": 6, "created": 3, "existing": 2, "invalid": 1, "chunks": 2
+        }
+        assert len(inserts) == 2
+
+        login = client.post("/auth/login", json={"email": "new3@test.com", "password": "password123"})
+        assert login.status_code == 200
+        me = client.get("/auth/me", headers={"Authorization": f"Bearer {login.json['access_token']}"})
+        assert me.json["role"] == "MEMBER"
+
+        # Resuming after the first chunk imports nothing twice
+        resumed = client.post("/auth/users/import?skip=3", data=self.CSV,
+                              content_type="text/csv", headers=auth_headers)
+        assert resumed.json["created"] == 0
+        assert resumed.json["rows"] == 6
+
+    def test_import_request_is_bounded(self, app, client, auth_headers, member_user):
+        """An HTTP import stops after USER_IMPORT_MAX_ROWS_PER_REQUEST rows and continues with skip."""
+        app.config["USER_IMPORT_MAX_ROWS_PER_REQUEST"] = 4
+
+        first = client.post("/auth/users/import", data=self.CSV, content_type="text/csv", headers=auth_headers)
+        assert (first.json["rows"], first.json["created"], first.json["complete"]) == (4, 2, False)
+
+        rest = client.post(f"/auth/users/import?skip={first.json['rows']}", data=self.CSV,
+                           content_type="text/csv", headers=auth_headers)
+        assert (rest.json["rows"], rest.json["created"], rest.json["complete"]) == (6, 1, True)
+
+    def test_import_skips_emails_registered_meanwhile(self, client, auth_headers, member_user, monkeypatch):
+        """An email registered between the lookup and the INSERT is skipped instead of failing the chunk."""
+        from backend.auth.repository import user_repository
+
+        lookup = user_repository.find_existing_emails
+        calls = []
+
+        def stale_first_lookup(emails):
+            calls.append(emails)
+            # As if member@test.com had registered after the first lookup
+            return lookup(emails) - {"member@test.com"} if len(calls) == 1 else lookup(emails)
+
+        monkeypatch.setattr(user_repository, "find_existing_emails", stale_first_lookup)
+        response = client.post("/auth/users/import", data=self.CSV, content_type="text/csv", headers=auth_headers)
+
+        assert response.status_code == 200
+        assert (response.json["created"], response.json["existing"]) == (3, 2)
+        assert len(calls) == 2
+
+    def test_import_is_admin_only_and_checks_columns(self, client, auth_headers, member_headers):
+        """Members cannot import; a CSV without the required columns is rejected."""
+        assert client.post("/auth/users/import", data=self.CSV, content_type="text/csv",
+                           headers=member_headers).status_code == 403
+
+        response = client.post("/auth/users/import", data="mail,pass\na@test.com,password123\n",
+                               content_type="text/csv", headers=auth_headers)
+        assert response.status_code == 400
+
+    def test_import_cli_resumes_from_checkpoint(self, app, tmp_path):
+        """The CLI skips rows recorded in its checkpoint and removes it when done."""
+        import json
+        from backend.auth.models import User
+
+        source = tmp_path / "users.csv"
+        source.write_text(self.CSV)
+        checkpoint = tmp_path / "users.ckpt"
+        checkpoint.write_text(json.dumps({"source": str(source), "rows": 4}))
+
+        result = app.test_cli_runner().invoke(
+            args=["import-users", str(source), "--checkpoint", str(checkpoint)]
+        )
+
+        assert result.exit_code == 0, result.output
+        assert "Resuming after row 4" in result.output
+        assert {u.email for u in User.query.all()} == {"new1@test.com", "new3@test.com"}
+        assert not checkpoint.exists()
+
+
+class TestTokenRevocation:
+    """Tests for logout and role-change token invalidation."""
+
+    def _login(self, client, email="member@test.com"):
+        tokens = client.post("/auth/login", json={"email": email, "password": "password123"}).json
+        return (
+            {"Authorization": f"Bearer {tokens['access_token']}"},
+            {"Authorization": f"Bearer {tokens['refresh_token']}"},
+        )
+
+    def test_logout_revokes_access_and_refresh_tokens(self, client, member_user):
+        """After logout, neither token works; a new login does."""
+        access, refresh = self._login(client)
+        assert client.get("/auth/me", headers=access).status_code == 200
+
+        assert client.post("/auth/logout", headers=access).status_code == 200
+
+        assert client.get("/auth/me", headers=access).status_code == 401
+        assert client.post("/auth/refresh", headers=refresh).status_code == 401
+
+        access, _ = self._login(client)
+        assert client.get("/auth/me", headers=access).status_code == 200
+
+    def test_role_change_takes_effect_immediately(self, client, auth_headers, member_user):
+        """A demoted user's existing token is rejected instead of keeping its old role."""
+        client.patch(f"/auth/users/{member_user['id']}/role", json={"role": "ADMIN"}, headers=auth_headers)
+        admin_access, _ = self._login(client)
+        assert client.get("/metrics", headers=admin_access).status_code == 200
+
+        client.patch(f"/auth/users/{member_user['id']}/role", json={"role": "MEMBER"}, headers=auth_headers)
+
+        assert client.get("/metrics", headers=admin_access).status_code == 401
+        member_access, _ = self._login(client)
+        assert client.get("/metrics", headers=member_access).status_code == 403
+
+    def test_other_workers_follow_the_change_feed(self, client, member_user):
+        """A worker sharing the version file sees changes made by another without waiting for a poll."""
+        from backend.auth.claims import ClaimsVersions, claims_versions
+        from backend.common.versions import VersionBoard
+
+        other = ClaimsVersions()
+        other.board = VersionBoard(claims_versions.board.path, stripes=1)
+        other.poll_interval = 3600
+        try:
+            assert other.current(member_user["id"]) == 0
+
+            access, _ = self._login(client)
+            client.post("/auth/logout", headers=access)
+
+            assert other.current(member_user["id"]) == 1
+            assert other.stats()["reloads"] == 1
+            assert other.stats()["polls"] == 2
+        finally:
+            other.board.close()
+
+    def test_feed_rows_committed_out_of_id_order_are_applied(self, client, admin_user, member_user):
+        """A change whose lower id commits after a higher one is still picked up."""
+        from backend.auth.claims import ClaimsVersions, claims_versions
+        from backend.auth.models import ClaimsVersionChange
+        from backend.common.db import db
+        from backend.common.versions import VersionBoard
+
+        other = ClaimsVersions()
+        other.board = VersionBoard(claims_versions.board.path, stripes=1)
+        other.poll_interval = 3600
+        try:
+            assert other.current(admin_user["id"]) == 0
+
+            # Transaction B took id 11 and commits first; the worker reads it
+            db.session.add(ClaimsVersionChange(id=11, user_id=admin_user["id"], claims_version=1))
+            db.session.commit()
+            other.board.bump(0)
+            assert other.current(admin_user["id"]) == 1
+
+            # Transaction A, with the lower id 10, commits afterwards
+            db.session.add(ClaimsVersionChange(id=10, user_id=member_user["id"], claims_version=1))
+            db.session.commit()
+            other.board.bump(0)
+            assert other.current(member_user["id"]) == 1
+            assert other.current(admin_user["id"]) == 1
+        finally:
+            other.board.close()
+
+
+class TestLoginThrottling:
+    """Tests for login and registration token buckets."""
+
+    def test_login_throttled_per_email(self, client, member_user):
+        """Attempts beyond the email bucket get 429 with Retry-After, even with the right password."""
+        from backend.common.throttle import throttle
+
+        rule = throttle.rules["login_email"]
+        throttle.rules["login_email"] = (1, 3)
+        try:
+            codes = [
+                client.post("/auth/login", json={"email": "MEMBER@test.com", "password": "wrong-pass"}).status_code
+                for _ in range(3)
+            ]
+            blocked = client.post("/auth/login", json={"email": "member@test.com", "password": "password123"})
+            again = client.post("/auth/login", json={"email": "member@test.com", "password": "password123"})
+            other = client.post("/auth/login", json={"email": "other@test.com", "password": "password123"})
+        finally:
+            throttle.rules["login_email"] = rule
+
+        assert codes == [401, 401, 401]
+        assert blocked.status_code == 429
+        assert 1 <= int(blocked.headers["Retry-After"]) <= 60
+        assert again.status_code == 429
+        assert other.status_code == 401
+        assert throttle.stats()["rejected_locally"] == 1
+
+    def test_register_throttled_per_ip(self, client):
+        """Registrations from one address are limited by the IP bucket."""
+        from backend.common.throttle import throttle
+
+        rule = throttle.rules["register_ip"]
+        throttle.rules["register_ip"] = (1, 2)
+        try:
+            codes = [
+                client.post("/auth/register", json={"email": f"user{i}@test.com", "password": "password123"},
+                            environ_base={"REMOTE_ADDR": "10.0.0.1"}).status_code
+                for i in range(3)
+            ]
+            elsewhere = client.post("/auth/register", json={"email": "user9@test.com", "password": "password123"},
+                                    environ_base={"REMOTE_ADDR": "10.0.0.2"})
+        finally:
+            throttle.rules["register_ip"] = rule
+
+        assert codes == [201, 201, 429]
+        assert elsewhere.status_code == 201
+
+
+    def test_login_rejected_while_store_locked(self, client, member_user):
+        """A throttle store that stays locked turns logins away with 429, not 500."""
+        import sqlite3
+
+        from backend.common.throttle import STORE_BUSY_RETRY_AFTER, STORE_TIMEOUT_SECONDS, throttle
+
+        connection = throttle._connection()
+        connection.execute("PRAGMA busy_timeout = 0")
+        holder = sqlite3.connect(throttle.path, isolation_level=None)
+        holder.execute("BEGIN IMMEDIATE")
+        try:
+            locked = client.post("/auth/login", json={"email": "member@test.com", "password": "password123"})
+        finally:
+            holder.execute("ROLLBACK")
+            holder.close()
+            connection.execute(f"PRAGMA busy_timeout = {STORE_TIMEOUT_SECONDS * 1000}")
+        unlocked = client.post("/auth/login", json={"email": "member@test.com", "password": "password123"})
+
+        assert locked.status_code == 429
+        assert locked.headers["Retry-After"] == str(STORE_BUSY_RETRY_AFTER)
+        assert not connection.in_transaction
+        assert unlocked.status_code == 200
+
+    def test_corrupt_store_is_recreated(self, app, client, member_user):
+        """A bucket file damaged by a crash is replaced instead of rejecting every login."""
+        import os
+        from backend.common.throttle import throttle
+
+        client.post("/auth/login", json={"email": "member@test.com", "password": "password123"})
+        for suffix in ("-wal", "-shm"):
+            if os.path.exists(throttle.path + suffix):
+                os.remove(throttle.path + suffix)
+        with open(throttle.path, "wb") as f:
+            f.write(b"not a database" * 512)
+
+        # As in a worker started after the crash
+        throttle.init_app(app)
+        response = client.post("/auth/login", json={"email": "member@test.com", "password": "password123"})
+
+        assert response.status_code == 200
+        with open(throttle.path, "rb") as f:
+            assert f.read(16) == b"SQLite format 3\x00"
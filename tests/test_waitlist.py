@@ -0,0 +1,256 @@
+"""
+Tests for Waitlist API.
+"""
+from datetime import date
+
+import pytest
+from flask_jwt_extended import create_access_token
+
+from backend.common.db import db
+from backend.auth.models import User
+from backend.common.security import hash_password
+
+
+@pytest.fixture
+def second_member_headers(app):
+    """Return headers for a second member, who waits for slots."""
+    with app.app_context():
+        user = User(email="waiting@test.com", password=hash_password("password123"), role="MEMBER")
+        db.session.add(user)
+        db.session.commit()
+        token = create_access_token(identity=user.id, additional_claims={"role": "MEMBER"})
+    return {"Authorization": f"Bearer {token}"}
+
+
+def _doctor_with_slot(client, auth_headers, day="2099-08-03"):
+    doctor_id = client.post(
+        "/doctors",
+        json={"name": "Dr. Busy", "email": "busy@hospital.com"},
+        headers=auth_headers
+    ).json["id"]
+    slot_id = client.post(
+        "/availability",
+        json={"doctor_id": doctor_id, "date": day, "start_time": "09:00:00", "end_time": "09:30:00"},
+        headers=auth_headers
+    ).json["id"]
+    return doctor_id, slot_id
+
+
+def test_cancellation_offers_slot_to_waitlisted_member(client, auth_headers, member_headers,
+                                                       second_member_headers):
+    """Test a cancelled slot is held for the first matching waitlisted member only."""
+    doctor_id, slot_id = _doctor_with_slot(client, auth_headers)
+    appointment_id = client.post(
+        "/appointments", json={"availability_id": slot_id}, headers=member_headers
+    ).json["id"]
+
+    # A range that does not cover the slot's day is skipped
+    client.post(
+        "/waitlist",
+        json={"doctor_id": doctor_id, "date_from": "2099-09-01", "date_to": "2099-09-30"},
+        headers=member_headers
+    )
+    joined = client.post(
+        "/waitlist",
+        json={"doctor_id": doctor_id, "date_from": "2099-08-01", "date_to": "2099-08-31"},
+        headers=second_member_headers
+    )
+    assert joined.status_code == 201
+    assert joined.json["status"] == "WAITING"
+
+    client.patch(f"/appointments/{appointment_id}/cancel", headers=member_headers)
+
+    entries = client.get("/waitlist/my", headers=second_member_headers).json
+    assert entries[0]["status"] == "OFFERED"
+    assert entries[0]["offered_availability_id"] == slot_id
+
+    taken = client.post("/appointments", json={"availability_id": slot_id}, headers=member_headers)
+    assert taken.status_code == 400
+    assert taken.json["error"] == "This time slot is held for another member"
+
+    booked = client.post("/appointments", json={"availability_id": slot_id}, headers=second_member_headers)
+    assert booked.status_code == 201
+
+
+def test_leave_waitlist(client, auth_headers, member_headers, second_member_headers):
+    """Test a member can leave the waitlist once and is not offered slots afterwards."""
+    doctor_id, slot_id = _doctor_with_slot(client, auth_headers)
+    appointment_id = client.post(
+        "/appointments", json={"availability_id": slot_id}, headers=member_headers
+    ).json["id"]
+    entry_id = client.post(
+        "/waitlist",
+        json={"doctor_id": doctor_id, "date_from": "2099-08-01", "date_to": "2099-08-31"},
+        headers=second_member_headers
+    ).json["id"]
+
+    duplicate = client.post(
+        "/waitlist",
+        json={"doctor_id": doctor_id, "date_from": "2099-08-01", "date_to": "2099-08-31"},
+        headers=second_member_headers
+    )
+    assert duplicate.status_code == 400
+
+    assert client.delete(f"/waitlist/{entry_id}", headers=member_headers).status_code == 403
+    assert client.delete(f"/waitlist/{entry_id}", headers=second_member_headers).status_code == 200
+    assert client.delete(f"/waitlist/{entry_id}", headers=second_member_headers).status_code == 400
+
+    client.patch(f"/appointments/{appointment_id}/cancel", headers=member_headers)
+
+    rebooked = client.post("/appointments", json={"availability_id": slot_id}, headers=member_headers)
+    assert rebooked.status_code == 201
+
+
+def test_waitlist_queue_reloads_after_other_worker_change(app, client, auth_headers, member_headers):
+    """Test the in-memory queue is kept in place for local changes and reloaded after foreign ones."""
+    from backend.waitlist.queue import waitlist_queue
+    from backend.waitlist.repository import waitlist_repository
+
+    doctor_id, _ = _doctor_with_slot(client, auth_headers)
+    day = date(2099, 8, 3)
+
+    assert waitlist_queue.matches(doctor_id, day) == []
+    entry_id = client.post(
+        "/waitlist",
+        json={"doctor_id": doctor_id, "date_from": "2099-08-01", "date_to": "2099-08-31"},
+        headers=member_headers
+    ).json["id"]
+
+    member_id = waitlist_repository.find_by_id(entry_id).member_id
+    assert waitlist_queue.matches(doctor_id, day) == [(entry_id, member_id)]
+    assert waitlist_queue.stats()["loads"] == 1
+
+    # Another worker changed the waitlist: the next read goes back to the database
+    waitlist_queue.versions.bump(doctor_id)
+    assert waitlist_queue.matches(doctor_id, day) == [(entry_id, member_id)]
+    assert waitlist_queue.stats()["loads"] == 2
+
+
+def test_expired_offer_passes_to_next_member(app, client, auth_headers, member_headers, second_member_headers):
+    """Test an unconverted waitlist hold expires and the slot is offered to the next waiting member."""
+    with app.app_context():
+        user = User(email="third@test.com", password=hash_password("password123"), role="MEMBER")
+        db.session.add(user)
+        db.session.commit()
+        third_headers = {"Authorization": f"Bearer {create_access_token(identity=user.id, additional_claims={'role': 'MEMBER'})}"}
+
+    doctor_id, slot_id = _doctor_with_slot(client, auth_headers)
+    appointment_id = client.post(
+        "/appointments", json={"availability_id": slot_id}, headers=member_headers
+    ).json["id"]
+    for headers in (second_member_headers, third_headers):
+        client.post(
+            "/waitlist",
+            json={"doctor_id": doctor_id, "date_from": "2099-08-01", "date_to": "2099-08-31"},
+            headers=headers
+        )
+
+    app.config["WAITLIST_HOLD_TTL_SECONDS"] = 0
+    client.patch(f"/appointments/{appointment_id}/cancel", headers=member_headers)
+    app.config["WAITLIST_HOLD_TTL_SECONDS"] = 900
+
+    assert client.get("/waitlist/my", headers=second_member_headers).json[0]["status"] == "OFFERED"
+
+    # Holding another slot leaves the sweep to the sweeper
+    other_slot_id = client.post(
+        "/availability",
+        json={"doctor_id": doctor_id, "date": "2099-08-04", "start_time": "09:00:00", "end_time": "09:30:00"},
+        headers=auth_headers
+    ).json["id"]
+    assert client.post("/holds", json={"availability_id": other_slot_id}, headers=member_headers).status_code == 201
+    assert client.get("/waitlist/my", headers=second_member_headers).json[0]["status"] == "OFFERED"
+
+    # Holding the slot itself passes the expired offer on first
+    held = client.post("/holds", json={"availability_id": slot_id}, headers=member_headers)
+    assert held.status_code == 400
+    assert held.json["error"] == "This time slot is held for another member"
+
+    assert client.get("/waitlist/my", headers=second_member_headers).json[0]["status"] == "EXPIRED"
+    offered = client.get("/waitlist/my", headers=third_headers).json[0]
+    assert offered["status"] == "OFFERED"
+    assert offered["offered_availability_id"] == slot_id
+
+    assert client.post("/appointments", json={"availability_id": slot_id},
+                       headers=second_member_headers).status_code == 400
+    assert client.post("/appointments", json={"availability_id": slot_id},
+                       headers=third_headers).status_code == 201
+
+
+def test_cancelled_doctor_day_offers_slots(client, auth_headers, member_headers, second_member_headers):
+    """Test slots freed by a doctor's day cancellation are offered to the waitlist."""
+    doctor_id, slot_id = _doctor_with_slot(client, auth_headers)
+    client.post("/appointments", json={"availability_id": slot_id}, headers=member_headers)
+    client.post(
+        "/waitlist",
+        json={"doctor_id": doctor_id, "date_from": "2099-08-01", "date_to": "2099-08-31"},
+        headers=second_member_headers
+    )
+
+    cancelled = client.post(f"/doctors/{doctor_id}/cancel-day", json={"from": "2099-08-03"}, headers=auth_headers)
+    assert cancelled.json["cancelled"] == 1
+
+    entry = client.get("/waitlist/my", headers=second_member_headers).json[0]
+    assert entry["status"] == "OFFERED"
+    assert entry["offered_availability_id"] == slot_id
+    assert client.post("/appointments", json={"availability_id": slot_id},
+                       headers=member_headers).status_code == 400
+    assert client.post("/appointments", json={"availability_id": slot_id},
+                       headers=second_member_headers).status_code == 201
+
+
+def test_sweep_expires_unconverted_offers(app, client, auth_headers, member_headers, second_member_headers):
+    """Test the sweeper's expire_offers expires an offer nobody else touches."""
+    from backend.waitlist.service import expire_offers
+
+    doctor_id, slot_id = _doctor_with_slot(client, auth_headers)
+    appointment_id = client.post(
+        "/appointments", json={"availability_id": slot_id}, headers=member_headers
+    ).json["id"]
+    client.post(
+        "/waitlist",
+        json={"doctor_id": doctor_id, "date_from": "2099-08-01", "date_to": "2099-08-31"},
+        headers=second_member_headers
+    )
+
+    app.config["WAITLIST_HOLD_TTL_SECONDS"] = 0
+    client.patch(f"/appointments/{appointment_id}/cancel", headers=member_headers)
+    app.config["WAITLIST_HOLD_TTL_SECONDS"] = 900
+
+    # Nobody else is waiting, so the slot is simply free again
+    assert expire_offers() == 0
+    assert client.get("/waitlist/my", headers=second_member_headers).json[0]["status"] == "EXPIRED"
+    assert client.post("/appointments", json={"availability_id": slot_id},
+                       headers=member_headers).status_code == 201
+
+
+def test_released_offer_passes_to_next_member(app, client, auth_headers, member_headers, second_member_headers):
+    """Test releasing a waitlist hold expires the offer and offers the slot to the next member at once."""
+    from backend.holds.models import SlotHold
+
+    with app.app_context():
+        user = User(email="third@test.com", password=hash_password("password123"), role="MEMBER")
+        db.session.add(user)
+        db.session.commit()
+        third_headers = {"Authorization": f"Bearer {create_access_token(identity=user.id, additional_claims={'role': 'MEMBER'})}"}
+
+    doctor_id, slot_id = _doctor_with_slot(client, auth_headers)
+    appointment_id = client.post(
+        "/appointments", json={"availability_id": slot_id}, headers=member_headers
+    ).json["id"]
+    for headers in (second_member_headers, third_headers):
+        client.post(
+            "/waitlist",
+            json={"doctor_id": doctor_id, "date_from": "2099-08-01", "date_to": "2099-08-31"},
+            headers=headers
+        )
+    client.patch(f"/appointments/{appointment_id}/cancel", headers=member_headers)
+
+    hold_id = SlotHold.query.filter_by(availability_id=slot_id).one().id
+    assert client.delete(f"/holds/{hold_id}", headers=second_member_headers).status_code == 200
+
+    assert client.get("/waitlist/my", headers=second_member_headers).json[0]["status"] == "EXPIRED"
+    offered = client.get("/waitlist/my", headers=third_headers).json[0]
+    assert offered["status"] == "OFFERED"
+    assert offered["offered_availability_id"] == slot_id
+    assert client.post("/appointments", json={"availability_id": slot_id},
+                       headers=third_headers).status_code == 201